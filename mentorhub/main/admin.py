@@ -1,7 +1,13 @@
 from django.contrib import admin
 from django import forms
-from .models import PasswordResetToken, Skill, MentorProfile, MenteeProfile, Session
+from .models import PasswordResetToken, Skill, MentorProfile, MenteeProfile, Session, SlotHold, Job, OutboxEmail
 from .models import Category, Question, Option
+from .search import refresh_search_documents
+from .skill_index import sync_mentor_postings
+from .jobs import enqueue, requeue_dead_jobs
+from .metrics import invalidate_counters
+from .slots import invalidate_mentor_slots
+from django.utils import timezone
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
@@ -11,10 +17,10 @@ class SkillAdmin(admin.ModelAdmin):
 
 @admin.register(MentorProfile)
 class MentorProfileAdmin(admin.ModelAdmin):
-    list_display = ['full_name', 'headline', 'application_status', 'is_approved', 'years_of_experience', 'hourly_rate', 'created_at']
+    list_display = ['full_name', 'headline', 'application_status', 'is_approved', 'years_of_experience', 'hourly_rate', 'rating_avg', 'rating_count', 'created_at']
     list_filter = ['application_status', 'is_approved', 'years_of_experience', 'created_at']
     search_fields = ['full_name', 'headline', 'bio', 'user__username', 'user__email']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['rating_avg', 'rating_count', 'rating_histogram', 'created_at', 'updated_at']
     autocomplete_fields = ['skills']
     
     fieldsets = (
@@ -27,6 +33,10 @@ class MentorProfileAdmin(admin.ModelAdmin):
         ('Application Status', {
             'fields': ('application_status', 'is_approved', 'admin_notes')
         }),
+        ('Ratings', {
+            'fields': ('rating_avg', 'rating_count', 'rating_histogram'),
+            'classes': ('collapse',)
+        }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -56,20 +66,34 @@ class MentorProfileAdmin(admin.ModelAdmin):
         }
 
     def approve_mentors(self, request, queryset):
-        # Iterate so we can auto-fill availability when missing
-        approved_count = 0
-        for mentor in queryset:
+        now = timezone.now()
+        mentors = list(queryset.only('id', 'availability'))
+        for mentor in mentors:
+            # Auto-fill availability when missing
             if not mentor.availability:
                 mentor.availability = self._default_availability()
             mentor.application_status = 'approved'
             mentor.is_approved = True
-            mentor.save()
-            approved_count += 1
-        self.message_user(request, f'{approved_count} mentor(s) approved successfully.')
+            mentor.updated_at = now
+        # One UPDATE for the whole selection; bulk_update() skips post_save, so the
+        # indexes, cached slots and admin counters are refreshed here
+        MentorProfile.objects.bulk_update(mentors, ['availability', 'application_status', 'is_approved', 'updated_at'])
+        mentor_ids = [mentor.id for mentor in mentors]
+        refresh_search_documents(mentor_ids)
+        sync_mentor_postings(mentor_ids)
+        for mentor_id in mentor_ids:
+            invalidate_mentor_slots(mentor_id)
+        invalidate_counters()
+        self.message_user(request, f'{len(mentors)} mentor(s) approved successfully.')
     approve_mentors.short_description = "Approve selected mentors"
     
     def reject_mentors(self, request, queryset):
-        updated = queryset.update(application_status='rejected', is_approved=False)
+        mentor_ids = list(queryset.values_list('id', flat=True))
+        updated = queryset.update(application_status='rejected', is_approved=False, updated_at=timezone.now())
+        # queryset.update() skips post_save, so drop the rejected mentors from search and the skill index here
+        refresh_search_documents(mentor_ids)
+        sync_mentor_postings(mentor_ids)
+        invalidate_counters()
         self.message_user(request, f'{updated} mentor(s) rejected.')
     reject_mentors.short_description = "Reject selected mentors"
 
@@ -113,7 +137,7 @@ class SessionAdmin(admin.ModelAdmin):
     list_display = ['mentor', 'mentee', 'session_date', 'session_time', 'status', 'amount_paid']
     list_filter = ['status', 'session_date', 'created_at']
     search_fields = ['mentor__full_name', 'mentee__username', 'mentee__email']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['created_at', 'updated_at', 'calendar_event_id', 'calendar_provider', 'calendar_synced_at', 'calendar_event_generation']
     
     fieldsets = (
         ('Session Details', {
@@ -122,6 +146,10 @@ class SessionAdmin(admin.ModelAdmin):
         ('Meeting Info', {
             'fields': ('meeting_link', 'meeting_notes')
         }),
+        ('Calendar Event', {
+            'fields': ('calendar_event_id', 'calendar_provider', 'calendar_synced_at', 'calendar_event_generation'),
+            'classes': ('collapse',)
+        }),
         ('Payment', {
             'fields': ('amount_paid', 'payment_status')
         }),
@@ -131,6 +159,45 @@ class SessionAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not (change and obj.calendar_event_id):
+            return
+        # Keep the attendees' calendar in step with edits made here
+        if obj.status == 'cancelled' and 'status' in form.changed_data:
+            enqueue('cancel_calendar_event', session_id=obj.id)
+        elif {'session_date', 'session_time', 'duration_minutes'} & set(form.changed_data):
+            enqueue('update_calendar_event', session_id=obj.id)
+
+
+@admin.register(SlotHold)
+class SlotHoldAdmin(admin.ModelAdmin):
+    list_display = ['mentor', 'mentee', 'session_date', 'session_time', 'duration_minutes', 'expires_at']
+    list_filter = ['session_date']
+    search_fields = ['mentor__full_name', 'mentee__username']
+    readonly_fields = ['created_at']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task', 'status', 'attempts', 'max_attempts', 'run_at', 'updated_at']
+    list_filter = ['status', 'task']
+    readonly_fields = ['created_at', 'updated_at', 'locked_at', 'locked_by', 'last_error']
+    actions = ['requeue_jobs']
+
+    def requeue_jobs(self, request, queryset):
+        updated = requeue_dead_jobs(queryset.values_list('id', flat=True))
+        self.message_user(request, f"{updated} dead job(s) requeued.")
+    requeue_jobs.short_description = "Requeue selected dead jobs"
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['subject', 'recipients']
+    readonly_fields = ['dedup_key', 'created_at', 'sent_at', 'locked_at', 'last_error']
+
 
 class OptionInline(admin.TabularInline):
     model = Option
@@ -144,7 +211,7 @@ class QuestionInline(admin.TabularInline):
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'description', 'created_at']
+    list_display = ['name', 'description', 'sample_size', 'created_at']
     search_fields = ['name']
     inlines = [QuestionInline]
 
@@ -0,0 +1,103 @@
+"""
+Answer Keys Module
+Compiled, cached answer keys for quiz categories, used to render and grade tests.
+
+A category's AnswerKey holds, per question id, its marks and the frozenset of
+correct option ids, the option ids in display order, and the question payload the
+take-test page renders (text, marks, options without their correctness flags). It
+is built with two flat queries and kept in the cache framework, so a test page and
+a submission read no Question or Option rows at all.
+
+Compiled keys are cached under the category's answer_key_version, a database column
+that invalidate_answer_key() bumps with an UPDATE, which orphans the compiled key.
+The version lives in the database rather than in the cache so every process agrees
+on it whatever the cache backend (a per-process LocMemCache included), and a bump
+made inside a transaction only takes effect for other requests once it commits.
+main/signals.py bumps it on every Question or Option save and delete, which covers
+the admin forms and the option formsets; code that writes questions with
+bulk_create or queryset.update() must call invalidate_answer_key() itself.
+"""
+
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from .models import Category, Option, Question
+
+
+def _cache_timeout():
+    return getattr(settings, 'ANSWER_KEY_CACHE_TIMEOUT', 3600)
+
+
+class AnswerKey(namedtuple('AnswerKey', ['category_id', 'version', 'key', 'option_ids', 'questions', 'total_marks'])):
+    """Compiled answer key of one category.
+
+    key:        {question id: (marks, frozenset of correct option ids)}
+    option_ids: {question id: tuple of option ids in display order}
+    questions:  [{'id', 'text', 'marks', 'options': [{'id', 'text'}, ...]}, ...]
+    """
+    __slots__ = ()
+
+    @property
+    def question_ids(self):
+        return list(self.key)
+
+
+def compile_answer_key(category_id, version=None):
+    """Build a category's AnswerKey from the database (two queries)."""
+    questions = {}
+    payload = []
+    for question_id, text, marks in (
+        Question.objects.filter(category_id=category_id).order_by('id').values_list('id', 'text', 'marks')
+    ):
+        questions[question_id] = {'id': question_id, 'text': text, 'marks': marks, 'options': []}
+        payload.append(questions[question_id])
+
+    correct = {question_id: set() for question_id in questions}
+    for option_id, question_id, text, is_correct in (
+        Option.objects.filter(question__category_id=category_id).order_by('id')
+        .values_list('id', 'question_id', 'text', 'is_correct')
+    ):
+        questions[question_id]['options'].append({'id': option_id, 'text': text})
+        if is_correct:
+            correct[question_id].add(option_id)
+
+    return AnswerKey(
+        category_id=category_id,
+        version=version,
+        key={question_id: (q['marks'], frozenset(correct[question_id])) for question_id, q in questions.items()},
+        option_ids={question_id: tuple(o['id'] for o in q['options']) for question_id, q in questions.items()},
+        questions=payload,
+        total_marks=sum(q['marks'] for q in payload),
+    )
+
+
+# -----------------------------
+# Cache versioning
+# -----------------------------
+
+def _answer_key_key(category_id, version):
+    return f'answer_key:{category_id}:{version}'
+
+
+def get_answer_key(category_id, version=None):
+    """The category's AnswerKey, from the cache or freshly compiled.
+
+    Pass the category's answer_key_version when the row is already loaded; otherwise
+    it is read from the database.
+    """
+    if version is None:
+        version = Category.objects.filter(id=category_id).values_list('answer_key_version', flat=True).first()
+    cache_key = _answer_key_key(category_id, version)
+    answer_key = cache.get(cache_key)
+    if answer_key is None:
+        answer_key = compile_answer_key(category_id, version)
+        cache.set(cache_key, answer_key, _cache_timeout())
+    return answer_key
+
+
+def invalidate_answer_key(category_id):
+    """Drop a category's compiled key (any change to its questions or options)."""
+    Category.objects.filter(id=category_id).update(answer_key_version=F('answer_key_version') + 1)
@@ -0,0 +1,155 @@
+"""
+Booking Module
+Transactional path for booking a mentor's time so concurrent mentees can't
+double-book a mentor.
+
+1. Serialize bookings per mentor: a transaction-scoped advisory lock keyed on the
+   mentor id on PostgreSQL, SELECT ... FOR UPDATE on the mentor row elsewhere, and
+   an early write on SQLite (which has no row locks) to take its write lock up front.
+2. Re-check availability and interval overlap while holding the lock.
+3. Insert. On PostgreSQL the main_session_no_overlap exclusion constraint (migration
+   0016) rejects overlapping active sessions even if something bypasses this path.
+
+Bookings go through a SlotHold: create_hold() reserves the time for
+SLOT_HOLD_TTL_MINUTES while the mentee pays, and confirm_hold() turns it into a paid
+Session. Live holds count as busy time; expired ones are ignored everywhere and
+removed in batches by `manage.py expire_slot_holds`.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction, IntegrityError, OperationalError
+from django.db.models import F
+from django.utils import timezone
+
+from .models import MentorProfile, Session, SlotHold
+from .slots import is_time_free, fits_availability
+
+# Namespace for pg_advisory_xact_lock(int, int) so our keys can't collide with other users
+ADVISORY_LOCK_NAMESPACE = 4210
+
+# How long a booking waits for another booking on the same mentor before giving up
+LOCK_TIMEOUT_MS = 3000
+
+
+class BookingError(Exception):
+    """Base class for booking failures; str(error) is safe to show to the user."""
+
+
+class SlotUnavailable(BookingError):
+    pass
+
+
+class BookingBusy(BookingError):
+    pass
+
+
+class HoldExpired(BookingError):
+    pass
+
+
+def hold_ttl():
+    return timedelta(minutes=getattr(settings, 'SLOT_HOLD_TTL_MINUTES', 10))
+
+
+def lock_mentor_for_booking(mentor_id):
+    """Block other bookings for this mentor until the current transaction ends."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f"SET LOCAL lock_timeout = '{int(LOCK_TIMEOUT_MS)}ms'")
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", [ADVISORY_LOCK_NAMESPACE, mentor_id])
+    elif connection.features.has_select_for_update:
+        list(MentorProfile.objects.select_for_update().filter(pk=mentor_id).values_list('pk', flat=True))
+    else:
+        # No-op write so SQLite takes its RESERVED lock now rather than at the INSERT,
+        # which would let two transactions both pass the overlap check first.
+        MentorProfile.objects.filter(pk=mentor_id).update(session_duration=F('session_duration'))
+
+
+def session_price(mentor, duration_minutes):
+    return (mentor.hourly_rate * (Decimal(duration_minutes) / Decimal('60'))).quantize(Decimal('0.01'))
+
+
+def create_hold(mentor, mentee, session_date, session_time, duration_minutes, notes=''):
+    """Reserve a time for `mentee` while they pay, or raise a BookingError.
+
+    Raises SlotUnavailable when the time is outside the mentor's availability or
+    overlaps another hold or pending/confirmed session, and BookingBusy when the
+    mentor's booking lock can't be acquired in time. The mentee's own earlier holds
+    on this mentor are released first so going back and picking another slot doesn't
+    leave the old one blocked until it expires.
+    """
+    if not fits_availability(mentor, session_date, session_time, duration_minutes):
+        raise SlotUnavailable("The mentor isn't available at that time. Please pick one of the open slots.")
+
+    try:
+        with transaction.atomic():
+            lock_mentor_for_booking(mentor.id)
+            SlotHold.objects.filter(mentor=mentor, mentee=mentee).delete()
+            if not is_time_free(mentor, session_date, session_time, duration_minutes):
+                raise SlotUnavailable("This time slot is already booked. Please choose another time.")
+            return SlotHold.objects.create(
+                mentor=mentor,
+                mentee=mentee,
+                session_date=session_date,
+                session_time=session_time,
+                duration_minutes=duration_minutes,
+                meeting_notes=notes,
+                amount_paid=session_price(mentor, duration_minutes),
+                expires_at=timezone.now() + hold_ttl(),
+            )
+    except OperationalError:
+        raise BookingBusy("We're processing another booking for this mentor. Please try again in a moment.")
+
+
+def confirm_hold(hold):
+    """Turn a hold into a paid, pending Session and release the hold.
+
+    A hold that has lapsed can still be confirmed if nobody else has taken the time
+    in the meantime; otherwise HoldExpired is raised.
+    """
+    try:
+        with transaction.atomic():
+            lock_mentor_for_booking(hold.mentor_id)
+            if not SlotHold.objects.filter(pk=hold.pk).exists():
+                raise HoldExpired("Your reservation has expired. Please book the session again.")
+            if not hold.is_live and not is_time_free(
+                hold.mentor, hold.session_date, hold.session_time, hold.duration_minutes, exclude_hold_id=hold.pk
+            ):
+                raise HoldExpired("Your reservation expired and the time has been booked by someone else.")
+            # Delete first so the hold doesn't count against its own session
+            SlotHold.objects.filter(pk=hold.pk).delete()
+            return Session.objects.create(
+                mentor_id=hold.mentor_id,
+                mentee_id=hold.mentee_id,
+                session_date=hold.session_date,
+                session_time=hold.session_time,
+                duration_minutes=hold.duration_minutes,
+                meeting_notes=hold.meeting_notes,
+                amount_paid=hold.amount_paid,
+                payment_status='completed'
+            )
+    except IntegrityError:
+        raise SlotUnavailable("This time slot was just booked by someone else. Please choose another time.")
+    except OperationalError:
+        raise BookingBusy("We're processing another booking for this mentor. Please try again in a moment.")
+
+
+def expire_holds(batch_size=1000):
+    """Delete lapsed holds in batches of primary keys. Returns the number deleted.
+
+    Expired holds are already ignored by every availability check, so this only
+    keeps the table small; it can run as often or as rarely as convenient.
+    """
+    deleted = 0
+    while True:
+        ids = list(
+            SlotHold.objects.filter(expires_at__lte=timezone.now())
+            .order_by('expires_at').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += SlotHold.objects.filter(id__in=ids).delete()[0]
+
@@ -0,0 +1,102 @@
+"""
+Dashboard Sessions Module
+Loads everything the mentee and mentor dashboards list in one query per user.
+
+Each of the user's sessions is put in a bucket with a CASE expression (upcoming,
+past, cancelled), numbered within its bucket by a ROW_NUMBER() window in that
+bucket's display order, and only the first `limit + 1` rows of each bucket are
+fetched, with the other party joined in. The query and the number of rows it
+returns stay the same however long the user's history grows; older sessions are
+browsed page by page through session_history().
+"""
+
+from django.db.models import Case, F, IntegerField, Q, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import Session
+from .pagination import CursorPaginator
+
+UPCOMING, PAST, CANCELLED = 0, 1, 2
+
+BUCKETS = {
+    'upcoming': UPCOMING,
+    'past': PAST,
+    'cancelled': CANCELLED,
+}
+
+# Rows shown per bucket on the dashboard
+DASHBOARD_LIMITS = {
+    'upcoming': 20,
+    'past': 10,
+    'cancelled': 10,
+}
+
+# History page size and the statuses a history page can list
+HISTORY_PAGE_SIZE = 20
+HISTORY_STATUSES = {'past': 'completed', 'cancelled': 'cancelled'}
+HISTORY_ORDERING = ('-session_date', '-session_time')
+
+
+def _bucket(today):
+    return Case(
+        When(status__in=['confirmed', 'pending'], session_date__gte=today, then=Value(UPCOMING)),
+        When(status='completed', then=Value(PAST)),
+        When(status='cancelled', then=Value(CANCELLED)),
+        default=None,
+        output_field=IntegerField(),
+    )
+
+
+def _in_bucket(bucket, field):
+    return Case(When(dash_bucket=bucket, then=F(field)), default=None)
+
+
+def dashboard_sessions(user_filter, related, limits=None):
+    """Return {'upcoming': [...], 'past': [...], 'cancelled': [...]} plus '<bucket>_more' flags.
+
+    `user_filter` selects the user's sessions (e.g. {'mentee': user}) and `related`
+    is the foreign key to join for the cards. Upcoming sessions come soonest first,
+    past and cancelled ones most recent first.
+    """
+    limits = dict(DASHBOARD_LIMITS, **(limits or {}))
+    today = timezone.now().date()
+
+    # The upcoming-only keys are null in the other buckets, so this one window
+    # ordering is soonest-first for upcoming sessions and most-recent-first elsewhere
+    ordering = [
+        _in_bucket(UPCOMING, 'session_date').asc(),
+        _in_bucket(UPCOMING, 'session_time').asc(),
+        F('session_date').desc(),
+        F('session_time').desc(),
+        F('id').desc(),
+    ]
+    per_bucket = Q()
+    for name, bucket in BUCKETS.items():
+        per_bucket |= Q(dash_bucket=bucket, dash_row__lte=limits[name] + 1)
+
+    rows = (
+        Session.objects.filter(**user_filter)
+        .select_related(related)
+        .annotate(dash_bucket=_bucket(today))
+        .filter(dash_bucket__isnull=False)
+        .annotate(dash_row=Window(RowNumber(), partition_by=[F('dash_bucket')], order_by=ordering))
+        .filter(per_bucket)
+        .order_by('dash_bucket', 'dash_row')
+    )
+
+    result = {name: [] for name in BUCKETS}
+    names = {bucket: name for name, bucket in BUCKETS.items()}
+    for session in rows:
+        result[names[session.dash_bucket]].append(session)
+    for name in BUCKETS:
+        # The extra row fetched per bucket only tells whether there is more
+        result[f'{name}_more'] = len(result[name]) > limits[name]
+        del result[name][limits[name]:]
+    return result
+
+
+def session_history(request, user_filter, related, kind):
+    """One keyset-paginated page of the user's completed or cancelled sessions."""
+    queryset = Session.objects.filter(status=HISTORY_STATUSES[kind], **user_filter).select_related(related)
+    return CursorPaginator(queryset, HISTORY_PAGE_SIZE, HISTORY_ORDERING, count=None).get_page(request.GET.get('page'))
@@ -0,0 +1,345 @@
+"""
+Transactional Email Module
+Builds the notification emails as (subject, message, recipient_list) tuples and
+delivers them through an outbox.
+
+queue_emails() writes OutboxEmail rows in the caller's transaction, so an email
+exists if and only if the change it describes was committed, and schedules a
+dispatch job. dispatch_outbox() drains due rows in batches over one pooled SMTP
+connection instead of a fresh TLS handshake per send_mail() call, recording
+attempts per message and retrying failures with backoff.
+"""
+
+import hashlib
+import logging
+import queue
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .jobs import enqueue, backoff_delay
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# Rows left 'sending' by a dispatcher that died are retried after this long
+SENDING_STALE_SECONDS = 10 * 60
+
+
+def _mentee_name(session):
+    return session.mentee.first_name or session.mentee.username
+
+
+def _mentor_email(session):
+    if getattr(session.mentor, 'user', None) and session.mentor.user and session.mentor.user.email:
+        return session.mentor.user.email
+    return None
+
+
+def password_reset_email(user, reset_url):
+    return (
+        'Password Reset Request - CodeMentorHub',
+        f'Hello {user.first_name or user.username},\n\n'
+        f'You requested a password reset for your CodeMentorHub account.\n\n'
+        f'Click the following link to reset your password:\n{reset_url}\n\n'
+        f'This link will expire in 1 hour.\n\n'
+        f'If you did not request this password reset, please ignore this email.\n\n'
+        f'Best regards,\nCodeMentorHub Team',
+        [user.email],
+    )
+
+
+def session_confirmation_emails(session):
+    """Confirmation emails to the mentee and mentor when a mentor accepts a session."""
+    emails = [(
+        'Session Booked Successfully - CodeMentorHub',
+        f'Hello {_mentee_name(session)},\n\n'
+        f'Your session with {session.mentor.full_name} has been confirmed!\n\n'
+        f'Session Details:\n'
+        f'Date: {session.session_date}\n'
+        f'Time: {session.session_time}\n'
+        f'Duration: {session.duration_minutes} minutes\n'
+        f'Meeting Link: {session.meeting_link}\n\n'
+        f'Please join the meeting 5 minutes before the scheduled time.\n\n'
+        f'Best regards,\nCodeMentorHub Team',
+        [session.mentee.email],
+    )]
+
+    mentor_email = _mentor_email(session)
+    if mentor_email:
+        emails.append((
+            'New Session Booked - CodeMentorHub',
+            f'Hello {session.mentor.full_name},\n\n'
+            f'You have a new session booked with {_mentee_name(session)}!\n\n'
+            f'Session Details:\n'
+            f'Date: {session.session_date}\n'
+            f'Time: {session.session_time}\n'
+            f'Duration: {session.duration_minutes} minutes\n'
+            f'Meeting Link: {session.meeting_link}\n\n'
+            f'Please be ready 5 minutes before the scheduled time.\n\n'
+            f'Best regards,\nCodeMentorHub Team',
+            [mentor_email],
+        ))
+    return emails
+
+
+def mentor_status_emails(session):
+    """Email to the mentee when their mentor completes or cancels a session."""
+    subject = f'Session {session.get_status_display()} - CodeMentorHub'
+    if session.status == 'cancelled':
+        message = (
+            f'Hello {_mentee_name(session)},\n\n'
+            f'We’re sorry to inform you that your session with {session.mentor.full_name} on {session.session_date} at {session.session_time} was cancelled by the mentor.\n\n'
+            f'A refund will be credited to your original payment method within 3 business days.\n\n'
+            f'If you have any questions, please contact support.\n\n'
+            f'Best,\nCodeMentorHub Team'
+        )
+    else:
+        message = (
+            f'Hello {_mentee_name(session)},\n\n'
+            f'Your session with {session.mentor.full_name} scheduled on {session.session_date} at {session.session_time} has been marked as {session.get_status_display().lower()}.\n\n'
+            f'If you have any questions, please contact the mentor or support.\n\n'
+            f'Best,\nCodeMentorHub Team'
+        )
+    return [(subject, message, [session.mentee.email])]
+
+
+def admin_status_emails(session):
+    """Emails to the mentee (and the mentor, on confirmation) when an admin changes a session's status."""
+    emails = []
+    if session.mentee.email:
+        subject = f'Session {session.get_status_display()} - CodeMentorHub'
+
+        if session.status == 'completed':
+            message = (
+                f'Hello {_mentee_name(session)},\n\n'
+                f'Your session with {session.mentor.full_name} on {session.session_date} at {session.session_time} has been marked as completed.\n\n'
+                f'Thank you for using CodeMentorHub!\n\n'
+                f'Best regards,\nCodeMentorHub Team'
+            )
+        elif session.status == 'cancelled':
+            message = (
+                f'Hello {_mentee_name(session)},\n\n'
+                f'Your session with {session.mentor.full_name} on {session.session_date} at {session.session_time} has been cancelled.\n\n'
+                f'If you have any questions, please contact support.\n\n'
+                f'Best regards,\nCodeMentorHub Team'
+            )
+        elif session.status == 'confirmed':
+            # Either the admin-provided or the auto-generated link
+            message = (
+                f'Hello {_mentee_name(session)},\n\n'
+                f'Your session with {session.mentor.full_name} has been confirmed!\n\n'
+                f'Session Details:\n'
+                f'Date: {session.session_date}\n'
+                f'Time: {session.session_time}\n'
+                f'Duration: {session.duration_minutes} minutes\n'
+                f'Meeting Link: {session.get_meeting_link}\n\n'
+                f'Please join the meeting 5 minutes before the scheduled time.\n\n'
+                f'Best regards,\nCodeMentorHub Team'
+            )
+        else:
+            message = (
+                f'Hello {_mentee_name(session)},\n\n'
+                f'Your session with {session.mentor.full_name} on {session.session_date} at {session.session_time} status has been updated to {session.get_status_display()}.\n\n'
+                f'Best regards,\nCodeMentorHub Team'
+            )
+        emails.append((subject, message, [session.mentee.email]))
+
+    mentor_email = _mentor_email(session)
+    if session.status == 'confirmed' and mentor_email:
+        emails.append((
+            'Session Confirmed - CodeMentorHub',
+            f'Hello {session.mentor.full_name},\n\n'
+            f'Your session with {_mentee_name(session)} has been confirmed!\n\n'
+            f'Session Details:\n'
+            f'Date: {session.session_date}\n'
+            f'Time: {session.session_time}\n'
+            f'Duration: {session.duration_minutes} minutes\n'
+            f'Meeting Link: {session.get_meeting_link}\n\n'
+            f'Please join the meeting 5 minutes before the scheduled time.\n\n'
+            f'Best regards,\nCodeMentorHub Team',
+            [mentor_email],
+        ))
+    return emails
+
+
+# Builders a job can name, for emails rendered by the worker (see tasks.send_session_emails)
+SESSION_EMAILS = {
+    'confirmation': session_confirmation_emails,
+    'mentor_status': mentor_status_emails,
+    'admin_status': admin_status_emails,
+}
+
+
+def session_scope(session):
+    """Dedup scope for a session's emails: one set per saved state of the session."""
+    return f'session:{session.id}:{session.updated_at.isoformat()}'
+
+
+def _dedup_key(scope, subject, message, recipient_list):
+    raw = '\x1f'.join([scope, subject, message, *sorted(recipient_list)])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+# -----------------------------
+# Outbox
+# -----------------------------
+
+def queue_emails(emails, scope=''):
+    """Write (subject, message, recipient_list) emails to the outbox in the current transaction.
+
+    Identical emails within the same `scope` are stored once, so retrying the code
+    that queued them doesn't send duplicates. Returns the number of rows written.
+    """
+    rows = []
+    for subject, message, recipient_list in emails:
+        recipient_list = [address for address in recipient_list if address]
+        if recipient_list:
+            rows.append(OutboxEmail(
+                dedup_key=_dedup_key(scope, subject, message, recipient_list),
+                subject=subject[:255],
+                body=message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipients=recipient_list,
+            ))
+    if not rows:
+        return 0
+    OutboxEmail.objects.bulk_create(rows, ignore_conflicts=True)
+    enqueue('dispatch_email_outbox')
+    return len(rows)
+
+
+class EmailConnectionPool:
+    """At most `size` open email backend connections, shared by dispatcher threads.
+
+    Connections idle for longer than `max_idle` seconds are closed rather than reused,
+    since SMTP servers drop idle clients.
+    """
+
+    def __init__(self, size=2, max_idle=60):
+        self.size = size
+        self.max_idle = max_idle
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self):
+        self._slots.acquire()
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                conn = get_connection(fail_silently=False)
+                conn.open()
+                return conn
+            if time.monotonic() - last_used <= self.max_idle:
+                return conn
+            self._close(conn)
+
+    def release(self, conn, broken=False):
+        if broken:
+            self._close(conn)
+        else:
+            self._idle.put((conn, time.monotonic()))
+        self._slots.release()
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = EmailConnectionPool(size=getattr(settings, 'EMAIL_POOL_SIZE', 2))
+        return _pool
+
+
+def _claim_batch(batch_size):
+    now = timezone.now()
+    stale = now - timedelta(seconds=SENDING_STALE_SECONDS)
+    OutboxEmail.objects.filter(status='sending', locked_at__lt=stale).update(status='pending', locked_at=None)
+    with transaction.atomic():
+        due = OutboxEmail.objects.filter(status='pending', next_attempt_at__lte=now).order_by('next_attempt_at')
+        if db_connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return []
+        # Conditional update: safe without SKIP LOCKED too, only one dispatcher wins a row
+        OutboxEmail.objects.filter(id__in=ids, status='pending').update(status='sending', locked_at=now)
+    return list(OutboxEmail.objects.filter(id__in=ids, status='sending', locked_at=now))
+
+
+def dispatch_outbox(batch_size=50, max_batches=None):
+    """Send due outbox emails in batches over one pooled connection. Returns (sent, failed)."""
+    sent = failed = batches = 0
+    pool = get_pool()
+    while max_batches is None or batches < max_batches:
+        batch = _claim_batch(batch_size)
+        if not batch:
+            break
+        batches += 1
+
+        conn = pool.acquire()
+        broken = False
+        delivered, errors = [], {}
+        try:
+            for row in batch:
+                message = EmailMessage(row.subject, row.body, row.from_email or None, row.recipients, connection=conn)
+                try:
+                    conn.send_messages([message])
+                    delivered.append(row.id)
+                except Exception as e:
+                    errors[row.id] = e
+                    # The connection may be dead; reopen it for the rest of the batch
+                    pool._close(conn)
+                    conn.open()
+        except Exception as e:
+            broken = True
+            for row in batch:
+                if row.id not in delivered:
+                    errors.setdefault(row.id, e)
+        finally:
+            pool.release(conn, broken=broken)
+
+        now = timezone.now()
+        if delivered:
+            OutboxEmail.objects.filter(id__in=delivered).update(
+                status='sent', sent_at=now, locked_at=None, attempts=F('attempts') + 1
+            )
+            sent += len(delivered)
+        for row in batch:
+            if row.id in errors:
+                row.attempts += 1
+                row.last_error = repr(errors[row.id])[:2000]
+                row.locked_at = None
+                if row.attempts >= row.max_attempts:
+                    row.status = 'failed'
+                    logger.error("Giving up on outbox email %s after %s attempts: %s", row.id, row.attempts, row.last_error)
+                else:
+                    row.status = 'pending'
+                    row.next_attempt_at = now + backoff_delay(row.attempts)
+                row.save(update_fields=['attempts', 'last_error', 'locked_at', 'status', 'next_attempt_at'])
+                failed += 1
+    return sent, failed
+
+
+def next_retry_at():
+    """When the earliest pending outbox email becomes due, or None."""
+    return (
+        OutboxEmail.objects.filter(status='pending')
+        .order_by('next_attempt_at').values_list('next_attempt_at', flat=True).first()
+    )
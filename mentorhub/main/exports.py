@@ -0,0 +1,72 @@
+"""
+Exports Module
+Streams staff exports as CSV or NDJSON without building them in memory.
+
+Rows are read with values_list() projections through QuerySet.iterator(chunk_size),
+which uses a server-side cursor on PostgreSQL, and written out one chunk at a time
+through StreamingHttpResponse. A worker holds at most one chunk of rows however
+large the export is.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+CHUNK_SIZE = 2000
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Spreadsheet apps run cells starting with these as formulas
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the csv writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_lines(headers, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def ndjson_lines(headers, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def stream_export(queryset, columns, basename, fmt='csv', chunk_size=CHUNK_SIZE):
+    """Return a StreamingHttpResponse of `queryset` as CSV or NDJSON.
+
+    `columns` is a list of (header, field lookup) pairs, e.g. ('mentor', 'mentor__full_name').
+    The queryset should already be filtered and ordered.
+    """
+    if fmt not in FORMATS:
+        fmt = 'csv'
+    headers = [header for header, _ in columns]
+    rows = queryset.values_list(*[lookup for _, lookup in columns]).iterator(chunk_size=chunk_size)
+    lines = csv_lines(headers, rows) if fmt == 'csv' else ndjson_lines(headers, rows)
+
+    response = StreamingHttpResponse(lines, content_type=FORMATS[fmt])
+    filename = f"{basename}-{timezone.localdate():%Y-%m-%d}.{fmt}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'no-store'
+    return response
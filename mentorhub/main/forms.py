@@ -17,7 +17,7 @@ class HireDeveloperForm(ModelForm):
 
     class Meta:
         model = hire_developer
-        fields = '__all__'
+        exclude = ['read_at']
         widgets = {
             'email': forms.EmailInput(attrs={
                 'placeholder': 'you@example.com',
@@ -77,7 +77,7 @@ class SkillForm(ModelForm):
 class CategoryForm(ModelForm):
     class Meta:
         model = Category
-        fields = ['name', 'description']
+        fields = ['name', 'description', 'sample_size', 'stratify_by_marks']
 
 
 class QuestionForm(ModelForm):
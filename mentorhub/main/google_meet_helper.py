@@ -3,189 +3,667 @@ Google Meet Integration Module
 Handles creation of actual Google Meet links using Google Calendar API
 Primary method: Google Calendar API (Method 2)
 Fallback method: Simple SHA256 hashing
+
+The Calendar client is built once per process and reused (see get_calendar_backend):
+service-account credentials are loaded once and refreshed only when their token
+expires, the API surface comes from a static discovery document instead of a
+network fetch, and the google libraries are imported on first use only.
+
+settings.GOOGLE_CALENDAR_BACKEND picks the backend:
+    'google'  the real Calendar API (used when GOOGLE_CALENDAR_API_ENABLED is on)
+    'fake'    LocalCalendarBackend, an in-process stand-in for tests and benchmarks
+    or a dotted path to a class with the same insert_events() method.
+
+The created event is recorded on Session.calendar_event_id / calendar_provider, so
+update_calendar_event() and cancel_calendar_event() address it directly.
+
+create_meet_links() sends many sessions' events as Calendar batch requests. Every
+session has a stable event id and conference requestId, so a retried insert finds
+the existing event instead of creating a second one; cancelling bumps the
+session's calendar_event_generation, so an event created after that gets a new id
+(Calendar never reuses a deleted event's id). A circuit breaker kept in
+the cache sends callers straight to the SHA256 fallback after repeated
+API failures instead of letting each one wait for a timeout.
 """
 
 import os
 import json
-from datetime import datetime, timedelta
+import hashlib
+import threading
+import time
+import uuid
+from datetime import timedelta
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+CALENDAR_SCOPES = ['https://www.googleapis.com/auth/calendar']
+
+# Calendar API limit on requests per batch
+BATCH_LIMIT = 50
+
+
+class CircuitBreaker:
+    """Fail fast after `threshold` consecutive failures, for `reset_seconds`.
+
+    State lives in the default cache. With a shared backend (REDIS_URL, see
+    settings.py) every worker process sees the same circuit; with Django's default
+    per-process LocMemCache each worker counts failures and trips on its own. Once
+    the open period ends a single trial call is let through (half-open); success
+    closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name, threshold=5, reset_seconds=60):
+        self.name = name
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+
+    def _key(self, suffix):
+        return f'circuit:{self.name}:{suffix}'
+
+    def allow(self):
+        open_until = cache.get(self._key('open_until'))
+        if open_until is None:
+            return True
+        if time.time() < open_until:
+            return False
+        # Half-open: only the caller that wins the add() gets to try
+        return cache.add(self._key('trial'), 1, self.reset_seconds)
+
+    def record_success(self):
+        cache.delete_many([self._key('failures'), self._key('open_until'), self._key('trial')])
+
+    def record_failure(self):
+        key = self._key('failures')
+        cache.add(key, 0, self.reset_seconds * 10)
+        try:
+            failures = cache.incr(key)
+        except ValueError:
+            failures = 1
+            cache.set(key, failures, self.reset_seconds * 10)
+        if failures >= self.threshold:
+            cache.set(self._key('open_until'), time.time() + self.reset_seconds, None)
+            cache.delete(self._key('trial'))
+
+    @property
+    def is_open(self):
+        open_until = cache.get(self._key('open_until'))
+        return open_until is not None and time.time() < open_until
+
+
+def calendar_breaker():
+    return CircuitBreaker(
+        'google_calendar',
+        threshold=getattr(settings, 'GOOGLE_CALENDAR_BREAKER_THRESHOLD', 5),
+        reset_seconds=getattr(settings, 'GOOGLE_CALENDAR_BREAKER_RESET_SECONDS', 60),
+    )
+
+
+def stable_event_id(session_obj):
+    """Client-chosen Calendar event id for a session (base32hex: a-v and 0-9).
+
+    Google keeps the ids of deleted events, so every event a session gets after a
+    cancellation carries the session's calendar_event_generation as a suffix.
+    """
+    event_id = f'codementorhub{session_obj.id:010d}'
+    if session_obj.calendar_event_generation:
+        event_id += f'g{session_obj.calendar_event_generation}'
+    return event_id
+
+
+def stable_request_id(session_obj):
+    request_id = f'codementorhub-session-{session_obj.id}'
+    if session_obj.calendar_event_generation:
+        request_id += f'-{session_obj.calendar_event_generation}'
+    return request_id
+
+
+class DeletedEventError(Exception):
+    """The session's event id belongs to an event that was deleted."""
+
+
+def is_transient_error(error):
+    """Errors that say the API is unhealthy, as opposed to a bad request."""
+    if isinstance(error, DeletedEventError):
+        return False
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    return status is None or int(status) >= 500 or int(status) == 429
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+
+class GoogleCalendarBackend:
+    """Calendar API client with process-wide credentials and discovery document.
+
+    googleapiclient service objects sit on httplib2, which isn't thread-safe, so each
+    thread gets its own service, built from the shared parsed discovery document
+    (cheap) rather than by fetching or re-reading it.
+    """
+
+    name = 'google'
+
+    def __init__(self, service_account_file=None, discovery_file=None):
+        self.service_account_file = service_account_file or getattr(settings, 'GOOGLE_SERVICE_ACCOUNT_FILE', '')
+        self.discovery_file = discovery_file or getattr(settings, 'GOOGLE_CALENDAR_DISCOVERY_FILE', '')
+        self._credentials = None
+        self._discovery = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def available(self):
+        return bool(self.service_account_file) and os.path.exists(self.service_account_file)
+
+    def _discovery_document(self):
+        if self._discovery is None:
+            if self.discovery_file:
+                with open(self.discovery_file, encoding='utf-8') as f:
+                    document = f.read()
+            else:
+                # Shipped as package data with google-api-python-client >= 2.0
+                from googleapiclient.discovery_cache import get_static_doc
+                document = get_static_doc('calendar', 'v3')
+                if document is None:
+                    raise RuntimeError("No static discovery document for calendar v3; set GOOGLE_CALENDAR_DISCOVERY_FILE")
+            self._discovery = json.loads(document)
+        return self._discovery
+
+    def credentials(self):
+        """Service-account credentials, loaded once and refreshed when the token expires."""
+        with self._lock:
+            if self._credentials is None:
+                from google.oauth2.service_account import Credentials
+                self._credentials = Credentials.from_service_account_file(
+                    self.service_account_file, scopes=CALENDAR_SCOPES
+                )
+            if not self._credentials.valid:
+                # Refresh under the lock so concurrent confirmations don't all hit the token endpoint
+                from google.auth.transport.requests import Request
+                self._credentials.refresh(Request())
+            return self._credentials
+
+    def service(self):
+        credentials = self.credentials()
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+            from googleapiclient.discovery import build_from_document
+            with self._lock:
+                document = self._discovery_document()
+            # Bounded timeout so a slow API fails into the breaker instead of hanging workers
+            http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=getattr(settings, 'GOOGLE_CALENDAR_TIMEOUT', 10)))
+            service = self._local.service = build_from_document(document, http=http)
+        return service
+
+    def insert_events(self, calendar_id, events, send_notifications=True):
+        """Insert events in Calendar batch requests; returns a created event or an exception per event."""
+        from googleapiclient.errors import HttpError
+
+        service = self.service()
+        results = [None] * len(events)
+
+        def callback(request_id, response, exception):
+            results[int(request_id)] = exception if exception is not None else response
+
+        for start in range(0, len(events), BATCH_LIMIT):
+            batch = service.new_batch_http_request(callback=callback)
+            for index in range(start, min(start + BATCH_LIMIT, len(events))):
+                batch.add(service.events().insert(
+                    calendarId=calendar_id,
+                    body=events[index],
+                    conferenceDataVersion=1,
+                    sendNotifications=send_notifications,
+                ), request_id=str(index))
+            batch.execute()
+
+        # 409: an earlier (retried) attempt already created the event under its stable id
+        for index, result in enumerate(results):
+            if isinstance(result, HttpError) and result.resp.status == 409 and events[index].get('id'):
+                try:
+                    existing = service.events().get(calendarId=calendar_id, eventId=events[index]['id']).execute()
+                except Exception as e:
+                    results[index] = e
+                    continue
+                if existing.get('status') == 'cancelled':
+                    # A deleted event's id, whose Meet link is dead; never hand that out
+                    results[index] = DeletedEventError(f"Calendar event {events[index]['id']} was deleted")
+                else:
+                    results[index] = existing
+        return results
+
+    def insert_event(self, calendar_id, event, send_notifications=True):
+        result = self.insert_events(calendar_id, [event], send_notifications)[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def update_event(self, calendar_id, event_id, changes, send_notifications=True):
+        return self.service().events().patch(
+            calendarId=calendar_id,
+            eventId=event_id,
+            body=changes,
+            sendUpdates='all' if send_notifications else 'none',
+        ).execute()
+
+    def delete_event(self, calendar_id, event_id, send_notifications=True):
+        """Delete an event; returns False if it was already gone."""
+        from googleapiclient.errors import HttpError
+        try:
+            self.service().events().delete(
+                calendarId=calendar_id,
+                eventId=event_id,
+                sendUpdates='all' if send_notifications else 'none',
+            ).execute()
+        except HttpError as e:
+            if e.resp.status in (404, 410):
+                return False
+            raise
+        return True
+
+
+class LocalCalendarBackend:
+    """In-process stand-in for the Calendar API: no network, no credentials.
+
+    Events are kept in memory and get a deterministic Meet-style link derived from
+    the conference requestId. `latency_ms` (or settings.GOOGLE_CALENDAR_FAKE_LATENCY_MS)
+    simulates API round-trip time for benchmarking the confirmation path.
+    """
+
+    name = 'fake'
+    available = True
+
+    def __init__(self, latency_ms=None):
+        if latency_ms is None:
+            latency_ms = getattr(settings, 'GOOGLE_CALENDAR_FAKE_LATENCY_MS', 0)
+        self.latency = latency_ms / 1000.0
+        self.events = {}
+        self.requests = 0
+        # Set to an exception instance to simulate an outage
+        self.fail_with = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def meet_code(seed):
+        digest = hashlib.sha256(seed.encode()).hexdigest()
+        letters = ''.join(chr(ord('a') + int(c, 16) % 26) for c in digest[:10])
+        return f'{letters[:3]}-{letters[3:7]}-{letters[7:10]}'
+
+    def insert_events(self, calendar_id, events, send_notifications=True):
+        """One simulated round trip per BATCH_LIMIT events, like the real batch endpoint."""
+        results = []
+        for start in range(0, len(events), BATCH_LIMIT):
+            self._round_trip()
+            for event in events[start:start + BATCH_LIMIT]:
+                results.append(self._insert(calendar_id, event))
+        return results
+
+    def insert_event(self, calendar_id, event, send_notifications=True):
+        return self.insert_events(calendar_id, [event], send_notifications)[0]
+
+    def _round_trip(self):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_with is not None:
+            raise self.fail_with
+
+    def update_event(self, calendar_id, event_id, changes, send_notifications=True):
+        self._round_trip()
+        with self._lock:
+            if event_id not in self.events:
+                raise KeyError(f'No such event: {event_id}')
+            self.events[event_id].update(changes)
+            return self.events[event_id]
+
+    def delete_event(self, calendar_id, event_id, send_notifications=True):
+        self._round_trip()
+        with self._lock:
+            event = self.events.get(event_id)
+            if event is None or event.get('status') == 'cancelled':
+                return False
+            # Like Calendar, keep the deleted event's id taken
+            event['status'] = 'cancelled'
+            return True
+
+    def _insert(self, calendar_id, event):
+        event_id = event.get('id') or uuid.uuid4().hex
+        with self._lock:
+            if event_id in self.events:
+                if self.events[event_id].get('status') == 'cancelled':
+                    return DeletedEventError(f'Calendar event {event_id} was deleted')
+                # Same stable id as an earlier attempt: hand back the existing event
+                return self.events[event_id]
+        request_id = event.get('conferenceData', {}).get('createRequest', {}).get('requestId') or uuid.uuid4().hex
+        created = dict(event)
+        created['id'] = event_id
+        created['conferenceData'] = {
+            'createRequest': {'requestId': request_id, 'status': {'statusCode': 'success'}},
+            'entryPoints': [{'entryPointType': 'video', 'uri': f'https://meet.google.com/{self.meet_code(request_id)}'}],
+        }
+        with self._lock:
+            self.events[event_id] = {'calendar_id': calendar_id, **created}
+        return created
+
+
+BACKENDS = {
+    'google': GoogleCalendarBackend,
+    'fake': LocalCalendarBackend,
+}
+
+_backend = None
+_backend_key = None
+_backend_lock = threading.Lock()
+
+
+def get_calendar_backend():
+    """The process-wide Calendar backend, or None when the API is disabled.
+
+    Rebuilt only when the relevant settings change (e.g. override_settings in tests).
+    """
+    global _backend, _backend_key
+    name = getattr(settings, 'GOOGLE_CALENDAR_BACKEND', 'google')
+    enabled = getattr(settings, 'GOOGLE_CALENDAR_API_ENABLED', False)
+    key = (name, enabled, getattr(settings, 'GOOGLE_SERVICE_ACCOUNT_FILE', ''))
+    with _backend_lock:
+        if _backend_key != key:
+            if name == 'google' and not enabled:
+                _backend = None
+            else:
+                backend_class = BACKENDS[name] if name in BACKENDS else import_string(name)
+                _backend = backend_class()
+            _backend_key = key
+        return _backend
+
+
+def reset_calendar_backend():
+    global _backend, _backend_key
+    with _backend_lock:
+        _backend = _backend_key = None
+
+
+# -----------------------------
+# Meet links
+# -----------------------------
 
 class GoogleMeetHelper:
     """Helper class to manage Google Meet links using Google Calendar API"""
-    
+
+    @staticmethod
+    def event_schedule(session_obj):
+        """The start/end part of a session's event; also the body for reschedule updates."""
+        event_start = session_obj.session_datetime
+        event_end = event_start + timedelta(minutes=session_obj.duration_minutes)
+        return {
+            'start': {
+                'dateTime': event_start.isoformat(),
+                'timeZone': 'UTC',
+            },
+            'end': {
+                'dateTime': event_end.isoformat(),
+                'timeZone': 'UTC',
+            },
+        }
+
+    @staticmethod
+    def build_event(session_obj):
+        """Calendar event body (with a Meet conference request) for a session."""
+        mentor_user = session_obj.mentor.user
+
+        event = {
+            'id': stable_event_id(session_obj),
+            'summary': f'Mentoring Session: {session_obj.mentor.full_name} & {session_obj.mentee.username}',
+            'description': (
+                f'CodeMentorHub Mentoring Session\n\n'
+                f'Mentor: {session_obj.mentor.full_name}\n'
+                f'Mentor Email: {mentor_user.email if mentor_user else "N/A"}\n'
+                f'Mentee: {session_obj.mentee.first_name or session_obj.mentee.username}\n'
+                f'Mentee Email: {session_obj.mentee.email}\n\n'
+                f'Session ID: {session_obj.id}\n'
+                f'Duration: {session_obj.duration_minutes} minutes'
+            ),
+            **GoogleMeetHelper.event_schedule(session_obj),
+            'conferenceData': {
+                'createRequest': {
+                    # Stable per session so retries reuse the same conference
+                    'requestId': stable_request_id(session_obj),
+                    'conferenceSolutionKey': {
+                        'key': 'hangoutsMeet'
+                    }
+                }
+            },
+            'attendees': [],
+        }
+
+        # Add mentee as attendee
+        if session_obj.mentee.email:
+            event['attendees'].append({
+                'email': session_obj.mentee.email,
+                'displayName': session_obj.mentee.first_name or session_obj.mentee.username,
+                'responseStatus': 'needsAction'
+            })
+
+        # Add mentor as attendee if they have an email
+        if mentor_user and mentor_user.email:
+            event['attendees'].append({
+                'email': mentor_user.email,
+                'displayName': session_obj.mentor.full_name,
+                'responseStatus': 'needsAction'
+            })
+        return event
+
+    @staticmethod
+    def extract_meet_link(created_event):
+        for entry in created_event.get('conferenceData', {}).get('entryPoints', []):
+            if entry.get('entryPointType') == 'video' and entry.get('uri'):
+                return entry['uri']
+        return None
+
     @staticmethod
     def generate_meet_link_with_calendar(session_obj):
         """
         Create an actual Google Meet link by creating a Google Calendar event
         This is Method 2 - Google Calendar API (Primary method)
-        
+
         Args:
             session_obj: Session model instance
-            
+
         Returns:
             str: The Google Meet link URL
         """
-        try:
-            # Check if Google Calendar API is enabled
-            if not settings.GOOGLE_CALENDAR_API_ENABLED:
-                return GoogleMeetHelper._generate_simple_meet_link(session_obj)
-            
-            # Import Google API libraries
-            from google.oauth2.service_account import Credentials
-            from googleapiclient.discovery import build
-            
-            # Get service account credentials
-            credentials = GoogleMeetHelper._get_service_account_credentials()
-            
-            if not credentials:
-                # Fallback to simple method if credentials not available
-                return GoogleMeetHelper._generate_simple_meet_link(session_obj)
-            
-            # Build the Google Calendar service
-            service = build('calendar', 'v3', credentials=credentials)
-            
-            # Prepare event details for Google Calendar
-            event_start = session_obj.session_datetime
-            event_end = event_start + timedelta(minutes=session_obj.duration_minutes)
-            
-            event = {
-                'summary': f'Mentoring Session: {session_obj.mentor.full_name} & {session_obj.mentee.username}',
-                'description': (
-                    f'CodeMentorHub Mentoring Session\n\n'
-                    f'Mentor: {session_obj.mentor.full_name}\n'
-                    f'Mentor Email: {session_obj.mentor.user.email if session_obj.mentor.user else "N/A"}\n'
-                    f'Mentee: {session_obj.mentee.first_name or session_obj.mentee.username}\n'
-                    f'Mentee Email: {session_obj.mentee.email}\n\n'
-                    f'Session ID: {session_obj.id}\n'
-                    f'Duration: {session_obj.duration_minutes} minutes'
-                ),
-                'start': {
-                    'dateTime': event_start.isoformat(),
-                    'timeZone': 'UTC',
-                },
-                'end': {
-                    'dateTime': event_end.isoformat(),
-                    'timeZone': 'UTC',
-                },
-                'conferenceData': {
-                    'createRequest': {
-                        'requestId': f'session-{session_obj.id}-{int(datetime.now().timestamp())}',
-                        'conferenceSolutionKey': {
-                            'key': 'hangoutsMeet'
-                        }
-                    }
-                },
-                'attendees': [],
-            }
-            
-            # Add mentee as attendee
-            if session_obj.mentee.email:
-                event['attendees'].append({
-                    'email': session_obj.mentee.email,
-                    'displayName': session_obj.mentee.first_name or session_obj.mentee.username,
-                    'responseStatus': 'needsAction'
-                })
-            
-            # Add mentor as attendee if they have an email
-            if session_obj.mentor.user and session_obj.mentor.user.email:
-                event['attendees'].append({
-                    'email': session_obj.mentor.user.email,
-                    'displayName': session_obj.mentor.full_name,
-                    'responseStatus': 'needsAction'
-                })
-            
-            # Create the event with conference data (generates Google Meet link)
-            created_event = service.events().insert(
-                calendarId=settings.GOOGLE_CALENDAR_ID,
-                body=event,
-                conferenceDataVersion=1,
-                sendNotifications=True  # Send calendar invitations
-            ).execute()
-            
-            # Extract the Google Meet link from the created event
-            if 'conferenceData' in created_event and 'entryPoints' in created_event['conferenceData']:
-                for entry in created_event['conferenceData']['entryPoints']:
-                    if entry.get('entryPointType') == 'video':
-                        meet_link = entry.get('uri')
-                        if meet_link:
-                            # Store the calendar event ID for potential future updates
-                            session_obj.meeting_notes = session_obj.meeting_notes or ''
-                            if 'calendar_event_id' not in session_obj.meeting_notes:
-                                session_obj.meeting_notes += f"\n[Calendar Event ID: {created_event.get('id')}]"
-                            return meet_link
-            
-            # If no meet link found, try fallback
-            raise Exception("No Google Meet link found in calendar event")
-            
-        except Exception as e:
-            print(f"Error creating Google Calendar event: {e}")
-            # Fallback to simple method
-            return GoogleMeetHelper._generate_simple_meet_link(session_obj)
-    
+        return GoogleMeetHelper.generate_meet_links_with_calendar([session_obj])[session_obj.id]
+
+    @staticmethod
+    def generate_meet_links_with_calendar(sessions):
+        """
+        Create Meet links for many sessions with batched Calendar requests.
+        Sessions whose event can't be created get the SHA256 fallback link.
+
+        Returns:
+            dict: {session id: Google Meet link URL}
+        """
+        sessions = list(sessions)
+        links = {}
+        backend = get_calendar_backend()
+        breaker = calendar_breaker()
+
+        if backend is None or not backend.available:
+            # API disabled or credentials not available
+            pending = []
+        elif not breaker.allow():
+            print("Google Calendar circuit open; using fallback links.")
+            pending = []
+        else:
+            pending = sessions
+
+        if pending:
+            try:
+                results = backend.insert_events(
+                    getattr(settings, 'GOOGLE_CALENDAR_ID', 'primary'),
+                    [GoogleMeetHelper.build_event(session_obj) for session_obj in pending],
+                    send_notifications=True  # Send calendar invitations
+                )
+            except ImportError as e:
+                print(f"Google API libraries not installed: {e}")
+                print("Install with: pip install google-api-python-client google-auth google-auth-httplib2")
+                results = [e] * len(pending)
+            except Exception as e:
+                # The whole batch failed (timeout, connection error, auth)
+                print(f"Error creating Google Calendar events: {e}")
+                breaker.record_failure()
+                results = [e] * len(pending)
+            else:
+                if any(isinstance(r, Exception) and is_transient_error(r) for r in results):
+                    breaker.record_failure()
+                elif any(not isinstance(r, Exception) for r in results):
+                    breaker.record_success()
+
+            for session_obj, created_event in zip(pending, results):
+                if isinstance(created_event, Exception):
+                    print(f"Error creating Google Calendar event for session {session_obj.id}: {created_event}")
+                    continue
+                meet_link = GoogleMeetHelper.extract_meet_link(created_event)
+                if meet_link:
+                    # Record the calendar event for later updates and cancellation
+                    session_obj.calendar_event_id = created_event.get('id') or ''
+                    session_obj.calendar_provider = backend.name
+                    session_obj.calendar_synced_at = timezone.now()
+                    links[session_obj.id] = meet_link
+
+        # Fallback to simple method for everything the API didn't handle
+        for session_obj in sessions:
+            if session_obj.id not in links:
+                links[session_obj.id] = GoogleMeetHelper._generate_simple_meet_link(session_obj)
+        return links
+
     @staticmethod
     def _generate_simple_meet_link(session_obj):
         """
         Fallback method to generate a simple Google Meet link using SHA256 hashing
         This is Method 1 - Used as fallback if Google Calendar API fails
         """
-        import hashlib
-        
         # Create a unique, reproducible meeting ID
         meeting_seed = f"codementor-{session_obj.mentor.id}-{session_obj.mentee.id}-{session_obj.session_date}-{session_obj.session_time}"
         meeting_hash = hashlib.sha256(meeting_seed.encode()).hexdigest()[:16]
-        
+
         # Use a format that Google Meet will recognize and auto-create
         meeting_id = f"codementor-{session_obj.id}-{meeting_hash}"
-        
+
         return f"https://meet.google.com/{meeting_id}"
-    
+
     @staticmethod
     def _get_service_account_credentials():
         """
-        Get Google API credentials from service account JSON file
-        
+        Get Google API credentials from the cached Calendar backend
+
         Returns:
             Credentials object or None if not available
         """
+        backend = get_calendar_backend()
+        if not isinstance(backend, GoogleCalendarBackend) or not backend.available:
+            return None
         try:
-            from google.oauth2.service_account import Credentials
-            
-            service_account_file = settings.GOOGLE_SERVICE_ACCOUNT_FILE
-            
-            # Check if file exists
-            if not os.path.exists(service_account_file):
-                print(f"Service account file not found: {service_account_file}")
-                return None
-            
-            # Load credentials from service account file
-            credentials = Credentials.from_service_account_file(
-                service_account_file,
-                scopes=['https://www.googleapis.com/auth/calendar']
-            )
-            
-            return credentials
-            
+            return backend.credentials()
         except ImportError as e:
             print(f"Google API libraries not installed: {e}")
-            print("Install with: pip install -r requirements.txt")
             return None
         except Exception as e:
             print(f"Error loading service account credentials: {e}")
             return None
 
 
+def _event_backend(session_obj):
+    """The backend that owns a session's event, or None if it can't be reached now."""
+    if not session_obj.calendar_event_id:
+        return None
+    backend = get_calendar_backend()
+    if backend is None or not backend.available or backend.name != session_obj.calendar_provider:
+        return None
+    return backend
+
+
+def _call_with_breaker(func, *args, **kwargs):
+    breaker = calendar_breaker()
+    if not breaker.allow():
+        raise RuntimeError("Google Calendar circuit open")
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        if is_transient_error(e):
+            breaker.record_failure()
+        raise
+    breaker.record_success()
+    return result
+
+
+def update_calendar_event(session_obj):
+    """
+    Push a session's current date, time and duration to its calendar event
+
+    Returns:
+        bool: True if the event was updated, False if there is no reachable event
+    """
+    backend = _event_backend(session_obj)
+    if backend is None:
+        return False
+    _call_with_breaker(
+        backend.update_event,
+        getattr(settings, 'GOOGLE_CALENDAR_ID', 'primary'),
+        session_obj.calendar_event_id,
+        GoogleMeetHelper.event_schedule(session_obj),
+    )
+    session_obj.calendar_synced_at = timezone.now()
+    return True
+
+
+def cancel_calendar_event(session_obj):
+    """
+    Delete a session's calendar event (attendees are notified) and forget it,
+    together with its Meet link; a later event for the session gets a new id
+
+    Returns:
+        bool: True if the session had an event that is now gone
+    """
+    backend = _event_backend(session_obj)
+    if backend is None:
+        return False
+    _call_with_breaker(
+        backend.delete_event,
+        getattr(settings, 'GOOGLE_CALENDAR_ID', 'primary'),
+        session_obj.calendar_event_id,
+    )
+    session_obj.calendar_event_id = ''
+    session_obj.calendar_event_generation += 1
+    session_obj.meeting_link = ''
+    session_obj.calendar_synced_at = timezone.now()
+    return True
+
+
+def create_meet_links(sessions):
+    """
+    Create Google Meet links for several sessions in batched Calendar requests
+
+    Returns:
+        dict: {session id: Google Meet link URL}
+    """
+    return GoogleMeetHelper.generate_meet_links_with_calendar(sessions)
+
+
 def create_meet_link(session_obj):
     """
     Public function to create a Google Meet link
     Uses Method 2 (Google Calendar API) as primary
     Falls back to Method 1 (SHA256) if needed
-    
+
     Args:
         session_obj: Session model instance
-        
+
     Returns:
         str: Google Meet link URL
     """
     helper = GoogleMeetHelper()
     return helper.generate_meet_link_with_calendar(session_obj)
-
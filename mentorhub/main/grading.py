@@ -0,0 +1,104 @@
+"""
+Grading Module
+Grades a submitted quiz and stores the attempt in a fixed number of queries.
+
+grade() is a pure in-memory pass over the category's cached answer key
+(main/answer_keys.py): a question scores its marks when the selected options are
+exactly its correct options. record_attempt() then writes, in one transaction, the
+attempt row (unless it was created when a sampled test was served), the attempt's
+score with one UPDATE, every AttemptAnswer with one bulk_create and every selected
+option with one bulk_create on the selected_options through table, and counts the
+score in the category's leaderboard tables (main/leaderboards.py). The number of
+queries is the same for a 5-question quiz and a 500-question one.
+"""
+
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.utils import timezone
+
+from .leaderboards import record_score
+from .models import AttemptAnswer, TestAttempt
+
+SelectedOption = AttemptAnswer.selected_options.through
+
+
+@dataclass
+class GradedAnswer:
+    question_id: int
+    # Selected option ids that belong to the question, in display order
+    selected: list
+    is_correct: bool
+    marks_awarded: int
+
+
+def selections_from_post(post, question_ids):
+    """{question id: set of option ids} from the `q_<question id>` checkbox fields."""
+    selections = {}
+    for question_id in question_ids:
+        values = post.getlist(f'q_{question_id}')
+        selections[question_id] = {int(value) for value in values if value.isdigit()}
+    return selections
+
+
+def grade(answer_key, selections, question_ids=None):
+    """Grade against a category's AnswerKey (main/answer_keys.py) and {question id: set of option ids}.
+
+    `question_ids` limits grading to the questions served (a sampled attempt);
+    served questions deleted since are left out. Returns (answers, score,
+    total_marks). Submitted ids that aren't options of the question are ignored.
+    """
+    answers = []
+    score = total_marks = 0
+    for question_id in (answer_key.key if question_ids is None else question_ids):
+        if question_id not in answer_key.key:
+            continue
+        marks, correct = answer_key.key[question_id]
+        chosen = selections.get(question_id, set())
+        selected = [option_id for option_id in answer_key.option_ids[question_id] if option_id in chosen]
+        is_correct = correct == set(selected)
+        marks_awarded = marks if is_correct else 0
+        answers.append(GradedAnswer(question_id, selected, is_correct, marks_awarded))
+        score += marks_awarded
+        total_marks += marks
+    return answers, score, total_marks
+
+
+def record_attempt(user, category, answers, score, total_marks, attempt=None):
+    """Store a graded attempt. Returns the completed TestAttempt.
+
+    `attempt` is an open attempt created when the test was served (a sampled
+    attempt). If it was completed meanwhile, e.g. by a double submit, nothing is
+    written and None is returned.
+    """
+    completed_at = timezone.now()
+    with transaction.atomic():
+        if attempt is None:
+            attempt = TestAttempt.objects.create(user=user, category=category, total_marks=total_marks)
+        # Completing first makes a concurrent second submit of the same attempt a no-op
+        if not TestAttempt.objects.filter(pk=attempt.pk, completed=False).update(
+            score=score, total_marks=total_marks, completed=True, completed_at=completed_at,
+        ):
+            return None
+        rows = AttemptAnswer.objects.bulk_create([
+            AttemptAnswer(
+                attempt=attempt,
+                question_id=answer.question_id,
+                # First selection kept for the legacy selected_option column
+                selected_option_id=answer.selected[0] if answer.selected else None,
+                is_correct=answer.is_correct,
+                marks_awarded=answer.marks_awarded,
+            )
+            for answer in answers
+        ])
+        SelectedOption.objects.bulk_create([
+            SelectedOption(attemptanswer_id=row.id, option_id=option_id)
+            for row, answer in zip(rows, answers)
+            for option_id in answer.selected
+        ])
+        attempt.score = score
+        attempt.total_marks = total_marks
+        attempt.completed = True
+        attempt.completed_at = completed_at
+        record_score(attempt)
+    return attempt
@@ -0,0 +1,150 @@
+"""
+Job Queue Module
+Small database-backed task queue so requests don't wait on SMTP or Google.
+
+    from main.jobs import enqueue
+    enqueue('send_email', subject=..., message=..., recipient_list=[...])
+
+Tasks are plain functions registered with @task('name') (see main/tasks.py) and
+called with the job's JSON payload as keyword arguments. Workers
+(`manage.py run_workers`) claim due jobs with SELECT ... FOR UPDATE SKIP LOCKED,
+so any number of them can poll the same table. A failing job is retried with
+exponential backoff until max_attempts, then parked as 'dead' with its last error
+for an admin to inspect or requeue.
+
+Jobs are inserted on transaction commit, so a worker never picks up a job for a
+row it can't see yet. With settings.JOBS_RUN_INLINE the task runs right there
+instead, for development without a worker; delayed jobs are still stored.
+"""
+
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Retry delay is BACKOFF_BASE_SECONDS * 2**(attempts - 1), capped, with jitter
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 6 * 60 * 60
+
+# A 'running' job whose worker hasn't finished it in this long is assumed lost
+STALE_AFTER = timedelta(minutes=15)
+
+_registry = {}
+
+
+def task(name):
+    """Register a function as the handler for jobs named `name`."""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    # Handlers live in main.tasks; importing it here keeps the registry complete in
+    # processes (workers, shells) that never imported it themselves.
+    from . import tasks  # noqa: F401
+    return _registry[name]
+
+
+def enqueue(task_name, max_attempts=5, delay=None, **payload):
+    """Queue `task_name(**payload)` to run after the current transaction commits.
+
+    The payload must be JSON-serializable; pass ids rather than model instances.
+    """
+    run_at = timezone.now() + delay if delay else None
+
+    def insert():
+        if getattr(settings, 'JOBS_RUN_INLINE', False) and not run_at:
+            try:
+                get_task(task_name)(**payload)
+            except Exception:
+                logger.exception("Inline job %s failed", task_name)
+            return
+        job = Job(task=task_name, payload=payload, max_attempts=max_attempts)
+        if run_at:
+            job.run_at = run_at
+        job.save()
+
+    transaction.on_commit(insert)
+
+
+def backoff_delay(attempts):
+    seconds = min(BACKOFF_BASE_SECONDS * (2 ** max(attempts - 1, 0)), BACKOFF_MAX_SECONDS)
+    # +/-10% jitter so jobs that failed together don't all retry together
+    return timedelta(seconds=seconds * random.uniform(0.9, 1.1))
+
+
+def claim_jobs(worker_id, limit=1):
+    """Mark up to `limit` due jobs as running for this worker and return them."""
+    now = timezone.now()
+    with transaction.atomic():
+        due = Job.objects.filter(status='queued', run_at__lte=now).order_by('run_at')
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        # The status condition makes the claim safe on backends without SKIP LOCKED:
+        # of two workers that read the same id, only one UPDATE matches.
+        claimed = []
+        for job_id in ids:
+            if Job.objects.filter(id=job_id, status='queued').update(
+                status='running', locked_at=now, locked_by=worker_id, updated_at=now
+            ):
+                claimed.append(job_id)
+    return list(Job.objects.filter(id__in=claimed).order_by('run_at'))
+
+
+def run_job(job):
+    """Run one claimed job and record the outcome. Returns True on success."""
+    try:
+        get_task(job.task)(**job.payload)
+    except Exception as e:
+        job.attempts += 1
+        job.last_error = f"{e!r}\n\n{traceback.format_exc()}"[:10000]
+        job.locked_at = None
+        job.locked_by = ''
+        if job.attempts >= job.max_attempts:
+            job.status = 'dead'
+            logger.error("Job %s (%s) failed permanently after %s attempts: %r", job.id, job.task, job.attempts, e)
+        else:
+            job.status = 'queued'
+            job.run_at = timezone.now() + backoff_delay(job.attempts)
+            logger.warning("Job %s (%s) failed, retrying at %s: %r", job.id, job.task, job.run_at, e)
+        job.save(update_fields=['attempts', 'last_error', 'locked_at', 'locked_by', 'status', 'run_at', 'updated_at'])
+        return False
+
+    job.attempts += 1
+    job.status = 'done'
+    job.locked_at = None
+    job.save(update_fields=['attempts', 'status', 'locked_at', 'updated_at'])
+    return True
+
+
+def requeue_stale_jobs():
+    """Put 'running' jobs from crashed workers back in the queue. Returns the number requeued."""
+    cutoff = timezone.now() - STALE_AFTER
+    return Job.objects.filter(status='running', locked_at__lt=cutoff).update(
+        status='queued', locked_at=None, locked_by='', run_at=timezone.now()
+    )
+
+
+def requeue_dead_jobs(job_ids=None):
+    """Give dead jobs a fresh set of attempts."""
+    jobs = Job.objects.filter(status='dead')
+    if job_ids is not None:
+        jobs = jobs.filter(id__in=job_ids)
+    return jobs.update(status='queued', attempts=0, run_at=timezone.now())
+
+
+def purge_finished_jobs(older_than=timedelta(days=7)):
+    return Job.objects.filter(status='done', updated_at__lt=timezone.now() - older_than).delete()[0]
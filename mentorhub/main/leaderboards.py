@@ -0,0 +1,133 @@
+"""
+Leaderboards Module
+Per-category leaderboards and percentile ranks for quiz attempts.
+
+Two tables are kept up to date as each attempt completes (record_score(), called by
+main/grading.py in the grading transaction), so reading them never scans TestAttempt:
+
+- CategoryScoreBucket: a histogram of completed attempts per whole-percent score,
+  at most 101 rows per category. A percentile is one aggregate over those rows.
+- CategoryBestScore: each user's best attempt per category; the leaderboard is the
+  top rows of an index on (category, percent, score, achieved_at).
+
+`manage.py rebuild_leaderboards` recomputes both from TestAttempt, e.g. after
+attempts were deleted.
+"""
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+
+from .models import CategoryBestScore, CategoryScoreBucket, TestAttempt
+
+# Rows on the result page and on the category's leaderboard page
+LEADERBOARD_SIZE = 10
+LEADERBOARD_PAGE_SIZE = 100
+
+BUCKETS = range(0, 101)
+
+
+def bucket_for(attempt):
+    return max(0, min(100, int(attempt.performance_percent())))
+
+
+def _ensure_buckets(category_id):
+    CategoryScoreBucket.objects.bulk_create(
+        [CategoryScoreBucket(category_id=category_id, percent=percent) for percent in BUCKETS],
+        ignore_conflicts=True,
+    )
+
+
+def record_score(attempt):
+    """Count a newly completed attempt in its category's histogram and the user's best score.
+
+    Runs in the caller's transaction (record_attempt() in main/grading.py) and costs
+    two to four queries; no rows are read back.
+    """
+    with transaction.atomic(savepoint=False):
+        buckets = CategoryScoreBucket.objects.filter(category_id=attempt.category_id, percent=bucket_for(attempt))
+        if not buckets.update(attempts=F('attempts') + 1):
+            # The category's bucket rows don't exist yet (first attempt, or a sparse rebuild)
+            _ensure_buckets(attempt.category_id)
+            buckets.update(attempts=F('attempts') + 1)
+
+        percent = attempt.performance_percent()
+        values = {
+            'attempt_id': attempt.id,
+            'percent': percent,
+            'score': attempt.score,
+            'total_marks': attempt.total_marks,
+            'achieved_at': attempt.completed_at,
+        }
+        # Only replaces a worse best score; equal scores keep the earlier attempt
+        improves = CategoryBestScore.objects.filter(category_id=attempt.category_id, user_id=attempt.user_id).filter(
+            Q(percent__lt=percent) | Q(percent=percent, score__lt=attempt.score)
+        )
+        if not improves.update(**values):
+            # No best score yet, or not better than it: the insert is a no-op when a
+            # row exists, and the update covers a row inserted concurrently
+            CategoryBestScore.objects.bulk_create(
+                [CategoryBestScore(category_id=attempt.category_id, user_id=attempt.user_id, **values)],
+                ignore_conflicts=True,
+            )
+            improves.update(**values)
+
+
+def percentile(attempt):
+    """Share (0-100) of the category's completed attempts that scored lower than `attempt`.
+
+    Attempts in the same whole-percent bucket count as neither better nor worse.
+    Returns None when the attempt is the only one.
+    """
+    totals = CategoryScoreBucket.objects.filter(category_id=attempt.category_id).aggregate(
+        total=Sum('attempts'),
+        lower=Sum('attempts', filter=Q(percent__lt=bucket_for(attempt))),
+    )
+    total = totals['total'] or 0
+    if total <= 1:
+        return None
+    return round(100 * (totals['lower'] or 0) / (total - 1), 1)
+
+
+def leaderboard(category_id, limit=LEADERBOARD_SIZE):
+    return list(
+        CategoryBestScore.objects.filter(category_id=category_id)
+        .select_related('user')
+        .order_by('-percent', '-score', 'achieved_at')[:limit]
+    )
+
+
+def rebuild(category_ids=None):
+    """Recompute histograms and best scores from TestAttempt. Returns the attempts counted."""
+    # Oldest first, so of two equal scores the earlier one stays the user's best
+    attempts = TestAttempt.objects.filter(completed=True).order_by('completed_at', 'id')
+    if category_ids is not None:
+        attempts = attempts.filter(category_id__in=category_ids)
+
+    counts = {}
+    best = {}
+    for attempt in attempts.only('id', 'user_id', 'category_id', 'score', 'total_marks', 'started_at', 'completed_at').iterator(chunk_size=2000):
+        key = (attempt.category_id, bucket_for(attempt))
+        counts[key] = counts.get(key, 0) + 1
+        current = best.get((attempt.category_id, attempt.user_id))
+        if current is None or (attempt.performance_percent(), attempt.score) > (current.percent, current.score):
+            best[(attempt.category_id, attempt.user_id)] = CategoryBestScore(
+                category_id=attempt.category_id, user_id=attempt.user_id, attempt_id=attempt.id,
+                percent=attempt.performance_percent(), score=attempt.score,
+                total_marks=attempt.total_marks, achieved_at=attempt.completed_at or attempt.started_at,
+            )
+
+    with transaction.atomic():
+        for model in (CategoryScoreBucket, CategoryBestScore):
+            stale = model.objects.all()
+            if category_ids is not None:
+                stale = stale.filter(category_id__in=category_ids)
+            stale.delete()
+        CategoryScoreBucket.objects.bulk_create(
+            [
+                CategoryScoreBucket(category_id=category_id, percent=percent, attempts=count)
+                for (category_id, percent), count in counts.items()
+            ],
+            batch_size=1000,
+        )
+        CategoryBestScore.objects.bulk_create(best.values(), batch_size=1000)
+    return sum(counts.values())
@@ -0,0 +1,45 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from main.google_meet_helper import create_meet_link, reset_calendar_backend
+from main.models import Session
+
+class Command(BaseCommand):
+    help = 'Time Meet link creation (the confirmation path) against the configured or fake Calendar backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=50, help='Number of links to create')
+        parser.add_argument('--fake', action='store_true', help='Use the in-process fake backend (no network)')
+        parser.add_argument('--latency-ms', type=int, default=0, help='Simulated API latency for --fake')
+
+    def handle(self, *args, **options):
+        # Events are created for existing sessions but nothing is saved
+        sessions = list(Session.objects.select_related('mentor', 'mentor__user', 'mentee')[:options['count']])
+        if not sessions:
+            raise CommandError('Need at least one session to build calendar events from.')
+
+        overrides = {}
+        if options['fake']:
+            overrides = {'GOOGLE_CALENDAR_BACKEND': 'fake', 'GOOGLE_CALENDAR_FAKE_LATENCY_MS': options['latency_ms']}
+
+        with override_settings(**overrides):
+            reset_calendar_backend()
+            timings = []
+            for i in range(options['count']):
+                session = sessions[i % len(sessions)]
+                notes = session.meeting_notes
+                start = time.perf_counter()
+                create_meet_link(session)
+                timings.append((time.perf_counter() - start) * 1000)
+                session.meeting_notes = notes
+            reset_calendar_backend()
+
+        timings_sorted = sorted(timings)
+        p95 = timings_sorted[max(0, int(len(timings_sorted) * 0.95) - 1)]
+        self.stdout.write(
+            f'{len(timings)} link(s): first {timings[0]:.1f} ms, '
+            f'median {statistics.median(timings):.1f} ms, p95 {p95:.1f} ms, max {timings_sorted[-1]:.1f} ms'
+        )
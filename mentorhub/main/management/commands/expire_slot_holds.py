@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+from main.booking import expire_holds
+
+class Command(BaseCommand):
+    help = 'Delete expired booking holds in batches (run from cron, or with --interval as a loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Holds deleted per DELETE statement')
+        parser.add_argument('--interval', type=int, default=0, help='Keep running, sweeping every N seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = expire_holds(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired hold(s).'))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
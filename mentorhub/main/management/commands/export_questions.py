@@ -0,0 +1,31 @@
+import csv
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from main.models import Category
+from main.question_bank import FORMATS, export_csv_rows, export_json
+
+class Command(BaseCommand):
+    help = 'Export a quiz category\'s questions and options as JSON or CSV (see main/question_bank.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('category', help='Category name')
+        parser.add_argument('--format', choices=FORMATS, default='json')
+        parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+
+    def handle(self, *args, **options):
+        try:
+            category = Category.objects.get(name=options['category'])
+        except Category.DoesNotExist:
+            raise CommandError(f'No category named "{options["category"]}".')
+
+        out = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            if options['format'] == 'csv':
+                csv.writer(out).writerows(export_csv_rows(category))
+            else:
+                out.write(export_json(category) + '\n')
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f'Exported "{category.name}" to {options["output"]}.'))
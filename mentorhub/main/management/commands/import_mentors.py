@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from main.mentor_import import REQUIRED_COLUMNS, OPTIONAL_COLUMNS, run_import
+
+class Command(BaseCommand):
+    help = 'Import mentors from a CSV file (see main/mentor_import.py for the columns)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Path to the CSV file (UTF-8, header row first)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate every row but import nothing')
+        parser.add_argument('--skip-invalid', action='store_true', help='Import the valid rows even if some rows have errors')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Mentors inserted per bulk_create')
+
+    def handle(self, *args, **options):
+        try:
+            # utf-8-sig drops the byte order mark spreadsheet apps put in front of the header
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as f:
+                result = run_import(
+                    f,
+                    dry_run=options['dry_run'],
+                    skip_invalid=options['skip_invalid'],
+                    chunk_size=options['chunk_size'],
+                )
+        except OSError as e:
+            raise CommandError(f'Could not read {options["csv_file"]}: {e}')
+        except UnicodeDecodeError:
+            raise CommandError('The file is not UTF-8 encoded.')
+
+        for line, message in result.errors:
+            self.stderr.write(f'line {line}: {message}')
+
+        if result.errors and not result.mentors and result.rows == 0:
+            raise CommandError(
+                f'Expected the columns {", ".join(REQUIRED_COLUMNS)} (optional: {", ".join(OPTIONAL_COLUMNS)}).'
+            )
+        summary = f'{result.rows} row(s) read, {len(result.mentors)} valid, {len(result.errors)} invalid.'
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Dry run: {summary}'))
+        elif result.errors and not options['skip_invalid']:
+            raise CommandError(f'{summary} Nothing imported; fix the rows above or pass --skip-invalid.')
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'{summary} Imported {result.imported} mentor(s), created {len(result.created_skills)} skill(s).'
+            ))
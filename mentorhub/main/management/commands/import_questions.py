@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from main.question_bank import FORMATS, get_or_create_category, import_questions, parse
+
+class Command(BaseCommand):
+    help = 'Import a quiz question bank (JSON or CSV, see main/question_bank.py) into a category'
+
+    def add_arguments(self, parser):
+        parser.add_argument('bank_file', help='Path to the .json or .csv file')
+        parser.add_argument('--category', help='Category name (created if missing); defaults to the name in a JSON bank')
+        parser.add_argument('--format', choices=FORMATS, help='File format; taken from the file extension by default')
+        parser.add_argument('--dry-run', action='store_true', help='Validate every question but import nothing')
+
+    def handle(self, *args, **options):
+        path = options['bank_file']
+        fmt = options['format'] or ('csv' if path.lower().endswith('.csv') else 'json')
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                text = f.read()
+        except OSError as e:
+            raise CommandError(f'Could not read {path}: {e}')
+        except UnicodeDecodeError:
+            raise CommandError('The file is not UTF-8 encoded.')
+
+        # Validate before the category is looked up or created
+        result = parse(text, fmt)
+        for where, message in result.errors:
+            self.stderr.write(f'{"line" if fmt == "csv" else "question"} {where}: {message}')
+        if result.errors:
+            raise CommandError(f'{len(result.errors)} invalid question(s); nothing imported.')
+
+        name = options['category'] or result.category.get('name')
+        if not name:
+            raise CommandError('Pass --category; the file does not name one.')
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Dry run: {len(result.questions)} valid question(s) for "{name}".'))
+            return
+
+        category = get_or_create_category(name, result.category.get('description', ''))
+        imported = import_questions(category, result.questions)
+        self.stdout.write(self.style.SUCCESS(f'Imported {imported} question(s) into "{category.name}".'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from main.leaderboards import rebuild
+
+class Command(BaseCommand):
+    help = 'Rebuild the quiz score histograms and best scores behind leaderboards and percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', type=int, action='append', dest='categories', help='Category id (repeatable); all categories by default')
+
+    def handle(self, *args, **options):
+        counted = rebuild(options['categories'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt leaderboards from {counted} completed attempt(s).'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from main.models import MentorProfile
+
+class Command(BaseCommand):
+    help = 'Rebuild the stored rating aggregates on every MentorProfile from MentorFeedback'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mentor', type=int, action='append', dest='mentor_ids', help='Only rebuild this mentor id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Mentors written per bulk update')
+
+    def handle(self, *args, **options):
+        updated = MentorProfile.rebuild_rating_aggregates(
+            mentor_ids=options['mentor_ids'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating aggregates for {updated} mentor(s).'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from main.search import rebuild_search_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the mentor full-text search documents from MentorProfile and Skill data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Documents inserted per bulk create')
+
+    def handle(self, *args, **options):
+        written = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {written} approved mentor(s).'))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from main.skill_index import rebuild_skill_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the skill -> mentor posting lists used for skill filtering and facet counts'
+
+    def handle(self, *args, **options):
+        indexed = rebuild_skill_index()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt posting lists for {indexed} skill(s).'))
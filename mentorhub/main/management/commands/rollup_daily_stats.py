@@ -0,0 +1,27 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from main.metrics import rollup_daily_stats
+
+class Command(BaseCommand):
+    help = 'Recompute the DailyStats rollup behind the admin dashboard signup trends (run from cron, e.g. hourly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=2, help='Recompute this many days up to today (default: today and yesterday)')
+        parser.add_argument('--since', help='Backfill from this date (YYYY-MM-DD) up to today instead')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        if options['since']:
+            try:
+                start = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be a date like 2024-01-31')
+        else:
+            start = today - timedelta(days=max(options['days'], 1) - 1)
+        if start > today:
+            raise CommandError('--since is in the future')
+
+        written = rollup_daily_stats(start, today)
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {written} day(s) from {start} to {today}.'))
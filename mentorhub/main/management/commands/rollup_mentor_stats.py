@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from main.rollups import run_rollup
+
+class Command(BaseCommand):
+    help = 'Update the per mentor x day reporting rollup with sessions and feedback changed since the last run (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Recompute every row instead of only what changed since the last run')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Mentor/day keys recomputed per transaction')
+
+    def handle(self, *args, **options):
+        keys, written, deleted = run_rollup(rebuild=options['rebuild'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed {keys} mentor/day key(s): {written} row(s) written, {deleted} removed.'
+        ))
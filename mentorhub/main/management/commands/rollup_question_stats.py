@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from main.question_stats import np, run_question_stats
+
+class Command(BaseCommand):
+    help = 'Add quiz attempts completed since the last run to the per-question statistics (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Recount every completed attempt instead of only the new ones')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Attempts processed per transaction')
+
+    def handle(self, *args, **options):
+        attempts, answers = run_question_stats(rebuild=options['rebuild'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Counted {attempts} attempt(s), {answers} answer(s){" (NumPy)" if np is not None else ""}.'
+        ))
@@ -0,0 +1,65 @@
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from main.jobs import claim_jobs, run_job, requeue_stale_jobs
+
+class Command(BaseCommand):
+    help = 'Run background job workers (emails, Google Calendar calls) until interrupted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help='Number of worker threads')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the jobs that are due now, then exit')
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        host = f'{socket.gethostname()}:{os.getpid()}'
+
+        def shutdown(signum, frame):
+            self.stdout.write('Stopping after the current jobs...')
+            stop.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale job(s).')
+
+        counts = {'done': 0, 'failed': 0}
+        lock = threading.Lock()
+
+        def work(index):
+            worker_id = f'{host}-{index}'
+            try:
+                while not stop.is_set():
+                    close_old_connections()
+                    jobs = claim_jobs(worker_id)
+                    if not jobs:
+                        if options['once']:
+                            return
+                        stop.wait(options['poll_interval'])
+                        continue
+                    for job in jobs:
+                        ok = run_job(job)
+                        with lock:
+                            counts['done' if ok else 'failed'] += 1
+            finally:
+                connection.close()
+
+        concurrency = max(1, options['concurrency'])
+        self.stdout.write(f'Starting {concurrency} worker(s) on {host}.')
+        workers = [threading.Thread(target=work, args=(i,), daemon=True) for i in range(concurrency)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            # join() with a timeout so signals are still delivered to the main thread
+            while worker.is_alive():
+                worker.join(0.5)
+
+        self.stdout.write(self.style.SUCCESS(f"Workers stopped: {counts['done']} succeeded, {counts['failed']} failed."))
@@ -0,0 +1,87 @@
+import threading
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from main.booking import create_hold, BookingError, SlotUnavailable
+from main.models import MentorProfile, SlotHold
+from main.slots import free_slots
+
+class Command(BaseCommand):
+    help = 'Fire parallel booking holds at one mentor slot and check that exactly one succeeds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('mentor_id', type=int, help='Approved mentor to book against')
+        parser.add_argument('--threads', type=int, default=20, help='Number of concurrent booking attempts')
+        parser.add_argument('--keep', action='store_true', help='Keep the stress-test users and holds afterwards')
+
+    def handle(self, *args, **options):
+        try:
+            mentor = MentorProfile.objects.get(pk=options['mentor_id'])
+        except MentorProfile.DoesNotExist:
+            raise CommandError(f"Mentor {options['mentor_id']} does not exist")
+
+        slots = free_slots(mentor)
+        if slots:
+            slot_date, slot_time = slots[0].date, slots[0].time
+        else:
+            # No availability configured; any future time is bookable
+            start = timezone.localtime() + timedelta(days=30)
+            slot_date, slot_time = start.date(), start.time().replace(minute=0, second=0, microsecond=0)
+        duration = mentor.session_duration or 60
+
+        threads = options['threads']
+        mentees = [
+            User.objects.get_or_create(username=f'stress-mentee-{i}', defaults={'email': f'stress-mentee-{i}@example.com'})[0]
+            for i in range(threads)
+        ]
+        self.stdout.write(f'Booking {mentor.full_name} on {slot_date} at {slot_time} from {threads} threads...')
+
+        barrier = threading.Barrier(threads)
+        results = []
+        lock = threading.Lock()
+
+        def attempt(index):
+            # Stagger durations so some attempts overlap rather than collide exactly
+            minutes = duration if index % 2 == 0 else duration + 30
+            try:
+                barrier.wait()
+                hold = create_hold(mentor, mentees[index], slot_date, slot_time, minutes)
+                outcome = ('booked', hold.id)
+            except SlotUnavailable as e:
+                outcome = ('conflict', str(e))
+            except BookingError as e:
+                outcome = ('busy', str(e))
+            except Exception as e:
+                outcome = ('error', repr(e))
+            finally:
+                connection.close()
+            with lock:
+                results.append(outcome)
+
+        workers = [threading.Thread(target=attempt, args=(i,)) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        counts = {}
+        for kind, _ in results:
+            counts[kind] = counts.get(kind, 0) + 1
+        self.stdout.write(f'Results: {counts}')
+        for kind, detail in results:
+            if kind == 'error':
+                self.stdout.write(self.style.ERROR(f'  {detail}'))
+
+        booked_ids = [detail for kind, detail in results if kind == 'booked']
+        if not options['keep']:
+            SlotHold.objects.filter(id__in=booked_ids).delete()
+            User.objects.filter(id__in=[m.id for m in mentees]).delete()
+
+        if len(booked_ids) == 1:
+            self.stdout.write(self.style.SUCCESS('OK: exactly one booking succeeded.'))
+        else:
+            raise CommandError(f'Expected exactly one successful booking, got {len(booked_ids)}.')
@@ -0,0 +1,172 @@
+"""
+Mentor Import Module
+Bulk onboarding of mentors from a CSV file (`manage.py import_mentors`, and the
+upload form under /admin/mentors/import/).
+
+One header row, then one mentor per row:
+
+    full_name,headline,bio,years_of_experience,hourly_rate,available_for,skills,...
+
+Required columns are REQUIRED_COLUMNS; location, linkedin_url, github_url,
+session_duration, application_status and availability (JSON) are optional.
+`skills` holds skill names separated by ';'. Unknown skills are created.
+
+Rows are parsed and validated one at a time as the file is read, without touching
+the database. The import then runs in one transaction: one query resolves every
+skill name, missing skills are created in one bulk insert, and mentors and their
+skill links are inserted with bulk_create in chunks. bulk_create skips the model
+signals, so the search documents, skill posting lists and admin counters are
+refreshed explicitly afterwards.
+"""
+
+import csv
+import json
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .metrics import invalidate_counters
+from .models import MentorProfile, Skill
+from .search import refresh_search_documents
+from .skill_index import create_skill_postings, sync_mentor_postings
+
+MentorSkill = MentorProfile.skills.through
+
+REQUIRED_COLUMNS = ['full_name', 'headline', 'bio', 'years_of_experience', 'hourly_rate', 'available_for']
+OPTIONAL_COLUMNS = [
+    'skills', 'location', 'linkedin_url', 'github_url', 'session_duration', 'application_status', 'availability',
+]
+SKILL_SEPARATOR = ';'
+
+# Fields filled from the CSV; everything else keeps its model default
+_MODEL_FIELDS = [c for c in REQUIRED_COLUMNS + OPTIONAL_COLUMNS if c not in ('skills',)]
+_SKILL_NAME_LENGTH = Skill._meta.get_field('name').max_length
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    mentors: list = field(default_factory=list)
+    # (line number, message)
+    errors: list = field(default_factory=list)
+    created_skills: list = field(default_factory=list)
+    imported: int = 0
+
+
+def _parse_row(row):
+    """Build an unsaved MentorProfile and its skill names from a CSV row; raises ValidationError."""
+    values = {}
+    for column in _MODEL_FIELDS:
+        raw = (row.get(column) or '').strip()
+        if raw:
+            values[column] = raw
+    missing = [column for column in REQUIRED_COLUMNS if column not in values]
+    if missing:
+        raise ValidationError(f"missing {', '.join(missing)}")
+
+    if 'availability' in values:
+        try:
+            values['availability'] = json.loads(values['availability'])
+        except ValueError:
+            raise ValidationError('availability is not valid JSON')
+    status = values.setdefault('application_status', 'pending')
+    values['is_approved'] = status == 'approved'
+
+    mentor = MentorProfile(**values)
+    # Field-level validation only: types, choices, validators, lengths. No queries.
+    # An empty availability is allowed, as for mentors added by hand; approval fills it in.
+    exclude = ['user', 'profile_picture', 'skills']
+    if not mentor.availability:
+        exclude.append('availability')
+    mentor.clean_fields(exclude=exclude)
+
+    skills = []
+    for name in (row.get('skills') or '').split(SKILL_SEPARATOR):
+        name = name.strip()
+        if not name:
+            continue
+        if len(name) > _SKILL_NAME_LENGTH:
+            raise ValidationError(f'skill name "{name[:40]}…" is longer than {_SKILL_NAME_LENGTH} characters')
+        if name.lower() not in {s.lower() for s in skills}:
+            skills.append(name)
+    return mentor, skills
+
+
+def validate_csv(lines):
+    """Read CSV `lines` (any iterable of text lines) into an ImportResult, one row at a time."""
+    result = ImportResult()
+    reader = csv.DictReader(lines)
+    header = [column.strip() for column in (reader.fieldnames or [])]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        result.errors.append((1, f"missing column(s): {', '.join(missing)}"))
+        return result
+    reader.fieldnames = header
+
+    for row in reader:
+        result.rows += 1
+        try:
+            result.mentors.append(_parse_row(row))
+        except ValidationError as e:
+            messages = []
+            for name, errors in getattr(e, 'message_dict', {'': e.messages}).items():
+                messages.extend(f'{name}: {message}' if name else message for message in errors)
+            result.errors.append((reader.line_num, '; '.join(messages)))
+    return result
+
+
+def resolve_skills(names):
+    """Return {lower-cased name: skill id} for `names`, creating the missing skills in bulk.
+
+    Also returns the names of the skills that were created.
+    """
+    wanted = {}
+    for name in names:
+        wanted.setdefault(name.lower(), name)
+    if not wanted:
+        return {}, []
+
+    lookup = Skill.objects.annotate(lower_name=Lower('name')).filter(lower_name__in=wanted)
+    ids = dict(lookup.values_list('lower_name', 'id'))
+    missing = [name for lower, name in wanted.items() if lower not in ids]
+    if missing:
+        # ignore_conflicts: a skill created concurrently is simply picked up below
+        Skill.objects.bulk_create([Skill(name=name) for name in missing], ignore_conflicts=True)
+        created = dict(lookup.filter(lower_name__in=[name.lower() for name in missing]).values_list('lower_name', 'id'))
+        ids.update(created)
+        create_skill_postings(created.values())
+    return ids, missing
+
+
+def import_mentors(parsed, chunk_size=500):
+    """Insert validated (MentorProfile, skill names) pairs. Returns (mentor ids, created skill names)."""
+    mentor_ids = []
+    with transaction.atomic():
+        skill_ids, created = resolve_skills(name for _, skills in parsed for name in skills)
+
+        for start in range(0, len(parsed), chunk_size):
+            chunk = parsed[start:start + chunk_size]
+            mentors = MentorProfile.objects.bulk_create([mentor for mentor, _ in chunk])
+            MentorSkill.objects.bulk_create([
+                MentorSkill(mentorprofile_id=mentor.id, skill_id=skill_ids[name.lower()])
+                for mentor, (_, skills) in zip(mentors, chunk)
+                for name in skills
+            ], ignore_conflicts=True)
+            mentor_ids.extend(mentor.id for mentor in mentors)
+
+        refresh_search_documents(mentor_ids)
+        sync_mentor_postings(mentor_ids)
+    invalidate_counters()
+    return mentor_ids, created
+
+
+def run_import(lines, dry_run=False, skip_invalid=False, chunk_size=500):
+    """Validate the CSV and, unless there are errors (or skip_invalid) or dry_run, import it."""
+    result = validate_csv(lines)
+    if dry_run or (result.errors and not skip_invalid) or not result.mentors:
+        return result
+    mentor_ids, result.created_skills = import_mentors(result.mentors, chunk_size=chunk_size)
+    result.imported = len(mentor_ids)
+    return result
@@ -0,0 +1,165 @@
+"""
+Metrics Module
+Headline counters and daily trend numbers for the admin dashboard.
+
+dashboard_counters() computes the user, mentor and skill counts with one
+conditional-aggregate query per table and caches them for ADMIN_COUNTERS_TTL
+seconds; main/signals.py drops the cached copy when a user, mentor or skill is
+added or removed (or a mentor changes status), so staff see changes immediately.
+
+Trend numbers come from precomputed rows, so the dashboard never scans Session or
+User: sessions, cancellations and revenue per session day from MentorDailyStats
+(`manage.py rollup_mentor_stats`, main/rollups.py), the same rows the admin reports
+read, and signups per join day from DailyStats (`manage.py rollup_daily_stats`).
+"""
+
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyStats, MentorDailyStats, MentorProfile, Skill
+
+COUNTERS_CACHE_KEY = 'admin:dashboard_counters'
+
+SESSION_TREND_FIELDS = ['sessions', 'sessions_cancelled', 'revenue']
+SIGNUP_TREND_FIELDS = ['new_users', 'new_mentors']
+TREND_FIELDS = SESSION_TREND_FIELDS + SIGNUP_TREND_FIELDS
+
+
+def _counters_ttl():
+    return getattr(settings, 'ADMIN_COUNTERS_TTL', 60)
+
+
+# -----------------------------
+# Counters
+# -----------------------------
+
+def compute_counters():
+    counters = {}
+    counters.update(User.objects.aggregate(
+        total_users=Count('id'),
+        staff_users=Count('id', filter=Q(is_staff=True)),
+    ))
+    counters.update(MentorProfile.objects.aggregate(
+        total_mentors=Count('id'),
+        pending_mentors=Count('id', filter=Q(application_status='pending')),
+        approved_mentors=Count('id', filter=Q(application_status='approved')),
+        rejected_mentors=Count('id', filter=Q(application_status='rejected')),
+    ))
+    counters.update(Skill.objects.aggregate(total_skills=Count('id')))
+    return counters
+
+
+def dashboard_counters():
+    counters = cache.get(COUNTERS_CACHE_KEY)
+    if counters is None:
+        counters = compute_counters()
+        cache.set(COUNTERS_CACHE_KEY, counters, _counters_ttl())
+    return counters
+
+
+def invalidate_counters():
+    cache.delete(COUNTERS_CACHE_KEY)
+
+
+# -----------------------------
+# Daily rollup
+# -----------------------------
+
+def _day_bounds(start, end):
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, time.min), tz),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+    )
+
+
+def rollup_daily_stats(start, end):
+    """Recompute the DailyStats rows for every day from `start` to `end` inclusive.
+
+    Users and mentors count on the day they joined. Returns the number of rows written.
+    """
+    since, until = _day_bounds(start, end)
+    days = {}
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        days[day] = DailyStats(date=day)
+
+    users = (
+        User.objects.filter(date_joined__gte=since, date_joined__lt=until)
+        .annotate(day=TruncDate('date_joined')).values('day')
+        .annotate(joined=Count('id')).order_by()
+    )
+    for row in users:
+        days[row['day']].new_users = row['joined']
+
+    mentors = (
+        MentorProfile.objects.filter(created_at__gte=since, created_at__lt=until)
+        .annotate(day=TruncDate('created_at')).values('day')
+        .annotate(joined=Count('id')).order_by()
+    )
+    for row in mentors:
+        days[row['day']].new_mentors = row['joined']
+
+    now = timezone.now()
+    for stats in days.values():
+        # bulk_create() doesn't run auto_now
+        stats.updated_at = now
+    DailyStats.objects.bulk_create(
+        days.values(),
+        update_conflicts=True,
+        unique_fields=['date'],
+        update_fields=SIGNUP_TREND_FIELDS + ['updated_at'],
+    )
+    return len(days)
+
+
+def daily_trends(days=7):
+    """Totals for the last `days` days and the `days` before them, plus the per-day rows.
+
+    Returns {'days': [{'date', 'sessions', ...}, ...oldest first], 'current': {...},
+    'previous': {...}}. Sessions and revenue count on the session's day, like the
+    admin reports; days the rollups haven't reached yet count as zero.
+    """
+    today = timezone.localdate()
+    start = today - timedelta(days=2 * days)
+    rows = {}
+
+    def row(day):
+        return rows.setdefault(day, {'date': day, **{field: 0 for field in TREND_FIELDS}})
+
+    sessions = (
+        MentorDailyStats.objects.filter(date__gt=start, date__lte=today).values('date')
+        .annotate(
+            pending=Sum('sessions_pending'), confirmed=Sum('sessions_confirmed'),
+            completed=Sum('sessions_completed'), cancelled=Sum('sessions_cancelled'),
+            revenue=Sum('amount_paid'),
+        )
+        .order_by()
+    )
+    for totals in sessions:
+        day = row(totals['date'])
+        day['sessions'] = totals['pending'] + totals['confirmed'] + totals['completed'] + totals['cancelled']
+        day['sessions_cancelled'] = totals['cancelled']
+        day['revenue'] = totals['revenue'] or Decimal('0')
+    for signups in DailyStats.objects.filter(date__gt=start, date__lte=today).values('date', *SIGNUP_TREND_FIELDS):
+        row(signups['date']).update(signups)
+
+    cutoff = today - timedelta(days=days)
+    current = {field: 0 for field in TREND_FIELDS}
+    previous = {field: 0 for field in TREND_FIELDS}
+    for day in rows.values():
+        totals = current if day['date'] > cutoff else previous
+        for field in TREND_FIELDS:
+            totals[field] += day[field]
+    return {
+        'days': sorted((day for day in rows.values() if day['date'] > cutoff), key=lambda day: day['date']),
+        'current': current,
+        'previous': previous,
+    }
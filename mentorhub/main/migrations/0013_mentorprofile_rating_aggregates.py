@@ -0,0 +1,55 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:21
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    MentorProfile = apps.get_model('main', 'MentorProfile')
+    MentorFeedback = apps.get_model('main', 'MentorFeedback')
+
+    histograms = {}
+    for row in MentorFeedback.objects.order_by().values('mentor_id', 'rating').annotate(n=Count('id')):
+        histograms.setdefault(row['mentor_id'], {})[str(row['rating'])] = row['n']
+
+    mentors = list(MentorProfile.objects.filter(pk__in=histograms.keys()))
+    for mentor in mentors:
+        histogram = {str(stars): histograms[mentor.id].get(str(stars), 0) for stars in range(1, 6)}
+        mentor.rating_count = sum(histogram.values())
+        mentor.rating_sum = sum(int(stars) * count for stars, count in histogram.items())
+        mentor.rating_avg = mentor.rating_sum / mentor.rating_count if mentor.rating_count else 0
+        mentor.rating_histogram = histogram
+    MentorProfile.objects.bulk_update(
+        mentors, ['rating_sum', 'rating_count', 'rating_avg', 'rating_histogram'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_attemptanswer_selected_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='rating_avg',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='rating_histogram',
+            field=models.JSONField(default=dict, editable=False, help_text="Feedback count per star, e.g. {'1': 0, '2': 1, '3': 0, '4': 3, '5': 8}"),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,136 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:22
+
+import logging
+
+import django.db.models.deletion
+from django.db import OperationalError, migrations, models
+
+logger = logging.getLogger(__name__)
+
+
+POSTGRES_FORWARD = [
+    # Weighted document: name and skills rank above headline, then available_for, then bio
+    """
+    ALTER TABLE main_mentorsearchdocument ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(full_name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(skills, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(headline, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(available_for, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(bio, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX main_mentorsearch_vector_gin ON main_mentorsearchdocument USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS main_mentorsearch_vector_gin",
+    "ALTER TABLE main_mentorsearchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+# External-content FTS5 table mirrored from main_mentorsearchdocument by triggers
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE main_mentorsearch_fts USING fts5(
+        full_name, skills, headline, available_for, bio,
+        content='main_mentorsearchdocument', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER main_mentorsearch_fts_ai AFTER INSERT ON main_mentorsearchdocument BEGIN
+        INSERT INTO main_mentorsearch_fts(rowid, full_name, skills, headline, available_for, bio)
+        VALUES (new.id, new.full_name, new.skills, new.headline, new.available_for, new.bio);
+    END
+    """,
+    """
+    CREATE TRIGGER main_mentorsearch_fts_ad AFTER DELETE ON main_mentorsearchdocument BEGIN
+        INSERT INTO main_mentorsearch_fts(main_mentorsearch_fts, rowid, full_name, skills, headline, available_for, bio)
+        VALUES ('delete', old.id, old.full_name, old.skills, old.headline, old.available_for, old.bio);
+    END
+    """,
+    """
+    CREATE TRIGGER main_mentorsearch_fts_au AFTER UPDATE ON main_mentorsearchdocument BEGIN
+        INSERT INTO main_mentorsearch_fts(main_mentorsearch_fts, rowid, full_name, skills, headline, available_for, bio)
+        VALUES ('delete', old.id, old.full_name, old.skills, old.headline, old.available_for, old.bio);
+        INSERT INTO main_mentorsearch_fts(rowid, full_name, skills, headline, available_for, bio)
+        VALUES (new.id, new.full_name, new.skills, new.headline, new.available_for, new.bio);
+    END
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS main_mentorsearch_fts_au",
+    "DROP TRIGGER IF EXISTS main_mentorsearch_fts_ad",
+    "DROP TRIGGER IF EXISTS main_mentorsearch_fts_ai",
+    "DROP TABLE IF EXISTS main_mentorsearch_fts",
+]
+
+
+def _run_statements(schema_editor, statements):
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run_statements(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite':
+        try:
+            _run_statements(schema_editor, SQLITE_FORWARD)
+        except OperationalError as e:
+            # SQLite built without FTS5; main.search falls back to icontains on the document table
+            logger.warning("FTS5 unavailable, skipping the full-text index: %s", e)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run_statements(schema_editor, POSTGRES_REVERSE)
+    elif vendor == 'sqlite':
+        _run_statements(schema_editor, SQLITE_REVERSE)
+
+
+def backfill_search_documents(apps, schema_editor):
+    MentorProfile = apps.get_model('main', 'MentorProfile')
+    MentorSearchDocument = apps.get_model('main', 'MentorSearchDocument')
+
+    mentors = MentorProfile.objects.filter(is_approved=True, application_status='approved').prefetch_related('skills')
+    MentorSearchDocument.objects.bulk_create([
+        MentorSearchDocument(
+            mentor_id=mentor.id,
+            full_name=mentor.full_name or '',
+            headline=mentor.headline or '',
+            bio=mentor.bio or '',
+            skills=', '.join(skill.name for skill in mentor.skills.all()),
+            available_for=mentor.available_for or '',
+        )
+        for mentor in mentors
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_mentorprofile_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MentorSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('full_name', models.CharField(max_length=100)),
+                ('headline', models.CharField(blank=True, max_length=100)),
+                ('bio', models.TextField(blank=True)),
+                ('skills', models.TextField(blank=True, help_text='Comma-separated skill names')),
+                ('available_for', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('mentor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to='main.mentorprofile')),
+            ],
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_posting_lists(apps, schema_editor):
+    Skill = apps.get_model('main', 'Skill')
+    MentorProfile = apps.get_model('main', 'MentorProfile')
+    SkillPostingList = apps.get_model('main', 'SkillPostingList')
+
+    postings = {skill_id: set() for skill_id in Skill.objects.values_list('id', flat=True)}
+    memberships = MentorProfile.skills.through.objects.filter(
+        mentorprofile__is_approved=True, mentorprofile__application_status='approved'
+    ).values_list('skill_id', 'mentorprofile_id')
+    for skill_id, mentor_id in memberships.iterator():
+        postings[skill_id].add(mentor_id)
+
+    SkillPostingList.objects.bulk_create([
+        SkillPostingList(skill_id=skill_id, mentor_ids=sorted(ids), mentor_count=len(ids))
+        for skill_id, ids in postings.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_mentorsearchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillPostingList',
+            fields=[
+                ('skill', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='posting_list', serialize=False, to='main.skill')),
+                ('mentor_ids', models.JSONField(default=list, help_text='Sorted ids of approved mentors with this skill')),
+                ('mentor_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_posting_lists, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:29
+
+import logging
+
+from django.conf import settings
+from django.db import DatabaseError, migrations, models, transaction
+
+logger = logging.getLogger(__name__)
+
+
+# Active sessions of one mentor may not overlap in time. session_date + session_time is
+# a naive local timestamp (USE_TZ stores times in TIME_ZONE), hence tsrange.
+EXCLUSION_SQL = """
+    ALTER TABLE main_session ADD CONSTRAINT main_session_no_overlap EXCLUDE USING gist (
+        mentor_id WITH =,
+        tsrange(
+            session_date + session_time,
+            session_date + session_time + duration_minutes * interval '1 minute',
+            '[)'
+        ) WITH &&
+    ) WHERE (status IN ('pending', 'confirmed'))
+"""
+
+
+# Pairs of active sessions that already overlap and would make the constraint fail
+OVERLAPS_SQL = """
+    SELECT a.id, b.id, a.mentor_id, a.session_date, a.session_time, b.session_date, b.session_time
+    FROM main_session a
+    JOIN main_session b ON b.mentor_id = a.mentor_id AND b.id > a.id
+    WHERE a.status IN ('pending', 'confirmed') AND b.status IN ('pending', 'confirmed')
+      AND a.session_date + a.session_time < b.session_date + b.session_time + b.duration_minutes * interval '1 minute'
+      AND b.session_date + b.session_time < a.session_date + a.session_time + a.duration_minutes * interval '1 minute'
+    ORDER BY a.mentor_id, a.id, b.id
+    LIMIT 20
+"""
+
+SKIP_HINT = (
+    "To migrate without the constraint, set SESSION_OVERLAP_CONSTRAINT=0; main.booking then "
+    "remains the only guard against double bookings."
+)
+
+
+def add_overlap_exclusion(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    if not getattr(settings, 'SESSION_OVERLAP_CONSTRAINT', True):
+        logger.warning("SESSION_OVERLAP_CONSTRAINT is off; not adding the main_session_no_overlap constraint.")
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'btree_gist'")
+        if cursor.fetchone() is None:
+            try:
+                with transaction.atomic(using=schema_editor.connection.alias):
+                    cursor.execute("CREATE EXTENSION btree_gist")
+            except DatabaseError as e:
+                raise RuntimeError(
+                    f"Could not create the btree_gist extension needed by main_session_no_overlap ({e}). "
+                    f"Have a database superuser run CREATE EXTENSION btree_gist; and migrate again. {SKIP_HINT}"
+                ) from e
+
+        cursor.execute(OVERLAPS_SQL)
+        overlaps = cursor.fetchall()
+        if overlaps:
+            pairs = "\n".join(
+                f"  mentor {mentor_id}: session {a_id} ({a_date} {a_time}) and session {b_id} ({b_date} {b_time})"
+                for a_id, b_id, mentor_id, a_date, a_time, b_date, b_time in overlaps
+            )
+            raise RuntimeError(
+                "Active sessions overlap, so the main_session_no_overlap constraint can't be added. "
+                "Cancel or reschedule one session of each pair (first 20 shown) and migrate again:\n"
+                f"{pairs}\n{SKIP_HINT}"
+            )
+
+        cursor.execute(EXCLUSION_SQL)
+
+
+def drop_overlap_exclusion(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("ALTER TABLE main_session DROP CONSTRAINT IF EXISTS main_session_no_overlap")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_skillpostinglist'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='session',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='session',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=('mentor', 'session_date', 'session_time'), name='main_session_active_slot_unique'),
+        ),
+        migrations.RunPython(add_overlap_exclusion, drop_overlap_exclusion),
+    ]
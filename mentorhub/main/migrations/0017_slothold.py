@@ -0,0 +1,35 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0016_session_active_slot_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_date', models.DateField()),
+                ('session_time', models.TimeField()),
+                ('duration_minutes', models.IntegerField(default=60)),
+                ('meeting_notes', models.TextField(blank=True, null=True)),
+                ('amount_paid', models.DecimalField(decimal_places=2, default=0, help_text='Amount due on payment', max_digits=8)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('mentee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_holds', to=settings.AUTH_USER_MODEL)),
+                ('mentor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_holds', to='main.mentorprofile')),
+            ],
+            options={
+                'ordering': ['expires_at'],
+                'indexes': [models.Index(fields=['mentor', 'session_date'], name='main_slothold_mentor_date')],
+            },
+        ),
+    ]
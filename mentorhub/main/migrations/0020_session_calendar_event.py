@@ -0,0 +1,70 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:38
+
+import re
+
+from django.db import migrations, models
+
+EVENT_MARKER = re.compile(r'\n?\[Calendar Event ID: ([^\]\s]+)\]')
+
+
+def split_event_markers(notes):
+    """(event ids in the order they were appended, notes without the markers or None)."""
+    event_ids = EVENT_MARKER.findall(notes or '')
+    if not event_ids:
+        return [], notes
+    return event_ids, EVENT_MARKER.sub('', notes).strip() or None
+
+
+def move_event_ids_out_of_notes(apps, schema_editor):
+    """Parse '[Calendar Event ID: ...]' markers out of meeting_notes into calendar_event_id."""
+    Session = apps.get_model('main', 'Session')
+    batch = []
+    sessions = Session.objects.filter(meeting_notes__contains='[Calendar Event ID:').only('id', 'meeting_notes', 'updated_at')
+    for session in sessions.iterator(chunk_size=500):
+        event_ids, notes = split_event_markers(session.meeting_notes)
+        if not event_ids:
+            continue
+        # Regenerations appended a marker each time; the last one is the live event
+        session.calendar_event_id = event_ids[-1]
+        session.calendar_provider = 'google'
+        session.calendar_synced_at = session.updated_at
+        session.meeting_notes = notes
+        batch.append(session)
+        if len(batch) >= 500:
+            Session.objects.bulk_update(batch, ['calendar_event_id', 'calendar_provider', 'calendar_synced_at', 'meeting_notes'])
+            batch = []
+    if batch:
+        Session.objects.bulk_update(batch, ['calendar_event_id', 'calendar_provider', 'calendar_synced_at', 'meeting_notes'])
+
+
+def restore_event_ids_to_notes(apps, schema_editor):
+    Session = apps.get_model('main', 'Session')
+    for session in Session.objects.exclude(calendar_event_id='').only('id', 'meeting_notes', 'calendar_event_id').iterator(chunk_size=500):
+        session.meeting_notes = (session.meeting_notes or '') + f"\n[Calendar Event ID: {session.calendar_event_id}]"
+        session.save(update_fields=['meeting_notes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0019_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='calendar_event_id',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='calendar_provider',
+            field=models.CharField(blank=True, default='', help_text="Calendar backend that owns the event, e.g. 'google'", max_length=20),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='calendar_synced_at',
+            field=models.DateTimeField(blank=True, help_text='Last time the calendar event was created or updated', null=True),
+        ),
+        migrations.RunPython(move_event_ids_out_of_notes, restore_event_ids_to_notes),
+    ]
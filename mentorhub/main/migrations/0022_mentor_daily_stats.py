@@ -0,0 +1,57 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0021_dailystats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('high_water_mark', models.DateTimeField(blank=True, null=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='mentorfeedback',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='session',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='MentorDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('sessions_pending', models.PositiveIntegerField(default=0)),
+                ('sessions_confirmed', models.PositiveIntegerField(default=0)),
+                ('sessions_completed', models.PositiveIntegerField(default=0)),
+                ('sessions_cancelled', models.PositiveIntegerField(default=0)),
+                ('minutes_booked', models.PositiveIntegerField(default=0)),
+                ('amount_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('feedback_count', models.PositiveIntegerField(default=0)),
+                ('feedback_rating_sum', models.PositiveIntegerField(default=0)),
+                ('dirty', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('mentor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='main.mentorprofile')),
+            ],
+            options={
+                'verbose_name_plural': 'mentor daily stats',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='main_mentordailystats_date')],
+                'constraints': [models.UniqueConstraint(fields=('mentor', 'date'), name='main_mentordailystats_mentor_date')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0022_mentor_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='hire_developer',
+            options={'ordering': ['-created_at']},
+        ),
+        # Existing requests get the migration time; there is no better timestamp for them
+        migrations.AddField(
+            model_name='hire_developer',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='hire_developer',
+            name='read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['-created_at'], name='main_contact_created'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(condition=models.Q(('read_at__isnull', True)), fields=['-created_at'], name='main_contact_unread'),
+        ),
+        migrations.AddIndex(
+            model_name='hire_developer',
+            index=models.Index(fields=['-created_at'], name='main_hire_created'),
+        ),
+        migrations.AddIndex(
+            model_name='hire_developer',
+            index=models.Index(condition=models.Q(('read_at__isnull', True)), fields=['-created_at'], name='main_hire_unread'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0023_inbox_created_read'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='sample_size',
+            field=models.PositiveIntegerField(blank=True, help_text='Questions per attempt, sampled from the pool. Leave empty to serve every question.', null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='stratify_by_marks',
+            field=models.BooleanField(default=False, help_text="Keep the pool's mix of question marks in each sample"),
+        ),
+        migrations.AddField(
+            model_name='testattempt',
+            name='sample_seed',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='testattempt',
+            name='served_question_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
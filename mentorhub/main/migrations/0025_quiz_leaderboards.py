@@ -0,0 +1,45 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0024_question_sampling'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryBestScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('percent', models.FloatField()),
+                ('score', models.PositiveIntegerField()),
+                ('total_marks', models.PositiveIntegerField()),
+                ('achieved_at', models.DateTimeField()),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='main.testattempt')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='best_scores', to='main.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='best_test_scores', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', '-percent', '-score', 'achieved_at'], name='main_best_score_rank')],
+                'constraints': [models.UniqueConstraint(fields=('category', 'user'), name='main_best_score_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryScoreBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('percent', models.PositiveSmallIntegerField()),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_buckets', to='main.category')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('category', 'percent'), name='main_score_bucket_unique')],
+            },
+        ),
+    ]
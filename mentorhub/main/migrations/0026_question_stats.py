@@ -0,0 +1,47 @@
+# Generated by Django 5.1.2 on 2026-10-18 16:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0025_quiz_leaderboards'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('rest_count', models.PositiveIntegerField(default=0)),
+                ('rest_correct', models.PositiveIntegerField(default=0)),
+                ('rest_sum', models.FloatField(default=0)),
+                ('rest_sq_sum', models.FloatField(default=0)),
+                ('rest_correct_sum', models.FloatField(default=0)),
+                ('option_counts', models.JSONField(blank=True, default=dict)),
+                ('p_value', models.FloatField(blank=True, null=True)),
+                ('discrimination', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='testattempt',
+            name='analyzed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='testattempt',
+            index=models.Index(condition=models.Q(('analyzed', False), ('completed', True)), fields=['id'], name='main_attempt_unanalyzed'),
+        ),
+        migrations.AddField(
+            model_name='questionstats',
+            name='question',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='main.question'),
+        ),
+    ]
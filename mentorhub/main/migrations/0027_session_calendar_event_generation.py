@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0026_question_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='calendar_event_generation',
+            field=models.PositiveIntegerField(default=0, help_text="Bumped when the session's event is deleted, so a new event gets a fresh id"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.2 on 2026-10-18 16:13
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0027_session_calendar_event_generation'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='dailystats',
+            name='revenue',
+        ),
+        migrations.RemoveField(
+            model_name='dailystats',
+            name='sessions_booked',
+        ),
+        migrations.RemoveField(
+            model_name='dailystats',
+            name='sessions_cancelled',
+        ),
+    ]
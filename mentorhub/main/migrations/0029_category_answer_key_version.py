@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0028_dailystats_signups_only'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='answer_key_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
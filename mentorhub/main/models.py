@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
@@ -90,6 +90,17 @@ class MentorProfile(models.Model):
     )
     admin_notes = models.TextField(blank=True, null=True)
     
+    # Denormalized feedback aggregates, maintained by the MentorFeedback signals
+    # (see main/signals.py) and rebuilt with `manage.py rebuild_mentor_ratings`.
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_avg = models.FloatField(default=0, editable=False)
+    rating_histogram = models.JSONField(
+        default=dict,
+        editable=False,
+        help_text="Feedback count per star, e.g. {'1': 0, '2': 1, '3': 0, '4': 3, '5': 8}"
+    )
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -97,28 +108,99 @@ class MentorProfile(models.Model):
     class Meta:
         ordering = ['-created_at']
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the approval state so only approval changes touch the skill posting lists
+        instance._loaded_availability = (
+            instance.__dict__.get('is_approved'), instance.__dict__.get('application_status')
+        )
+        return instance
+    
     def __str__(self):
         return f"{self.full_name} - {self.headline}"
     
     @property
     def average_rating(self):
         """Return average rating from mentee feedback; 0 when no feedback."""
-        from django.db.models import Avg  # local import to avoid circulars at import time
-        agg = self.feedbacks.aggregate(avg=Avg('rating'))
-        avg = agg.get('avg') or 0
         # Round to single decimal to keep UI compact
-        return round(avg, 1) if avg else 0
-    
-    @property
-    def rating_count(self):
-        """Total number of feedback entries for this mentor."""
-        return self.feedbacks.count()
+        return round(self.rating_avg, 1) if self.rating_count else 0
     
     @property
     def average_rating_rounded(self):
         """Rounded average for quick star display."""
         return int(round(self.average_rating))
     
+    @property
+    def rating_distribution(self):
+        """Feedback counts as a list of (stars, count) pairs from 5 down to 1."""
+        histogram = self.rating_histogram or {}
+        return [(stars, int(histogram.get(str(stars), 0))) for stars in range(5, 0, -1)]
+    
+    @staticmethod
+    def build_rating_aggregates(histogram):
+        """Return the stored rating columns for a {stars: count} histogram."""
+        histogram = {str(stars): max(int(histogram.get(str(stars), 0)), 0) for stars in range(1, 6)}
+        rating_count = sum(histogram.values())
+        rating_sum = sum(int(stars) * count for stars, count in histogram.items())
+        return {
+            'rating_sum': rating_sum,
+            'rating_count': rating_count,
+            'rating_avg': (rating_sum / rating_count) if rating_count else 0,
+            'rating_histogram': histogram,
+        }
+    
+    @classmethod
+    def apply_rating_change(cls, mentor_id, added=None, removed=None):
+        """Add and/or remove a single star rating from a mentor's stored aggregates.
+
+        The mentor row is locked for the duration of the update so concurrent feedback
+        writes can't lose increments. Uses a queryset update so `updated_at` is untouched.
+        """
+        with transaction.atomic():
+            mentor = cls.objects.select_for_update().only('id', 'rating_histogram').filter(pk=mentor_id).first()
+            if mentor is None:
+                # Mentor is being deleted along with its feedback
+                return
+            histogram = dict(mentor.rating_histogram or {})
+            if removed:
+                histogram[str(removed)] = int(histogram.get(str(removed), 0)) - 1
+            if added:
+                histogram[str(added)] = int(histogram.get(str(added), 0)) + 1
+            cls.objects.filter(pk=mentor_id).update(**cls.build_rating_aggregates(histogram))
+    
+    @classmethod
+    def rebuild_rating_aggregates(cls, mentor_ids=None, batch_size=500):
+        """Recompute stored rating aggregates from MentorFeedback with one grouped query.
+
+        Returns the number of mentor rows written.
+        """
+        from django.db.models import Count  # local import to avoid circulars at import time
+        feedbacks = MentorFeedback.objects.order_by()
+        mentors = cls.objects.order_by('pk').only('id')
+        if mentor_ids is not None:
+            feedbacks = feedbacks.filter(mentor_id__in=mentor_ids)
+            mentors = mentors.filter(pk__in=mentor_ids)
+
+        histograms = {}
+        for row in feedbacks.values('mentor_id', 'rating').annotate(n=Count('id')):
+            histograms.setdefault(row['mentor_id'], {})[str(row['rating'])] = row['n']
+
+        fields = ['rating_sum', 'rating_count', 'rating_avg', 'rating_histogram']
+        updated = 0
+        with transaction.atomic():
+            batch = []
+            for mentor in mentors.iterator(chunk_size=batch_size):
+                for field, value in cls.build_rating_aggregates(histograms.get(mentor.id, {})).items():
+                    setattr(mentor, field, value)
+                batch.append(mentor)
+                if len(batch) >= batch_size:
+                    updated += cls.objects.bulk_update(batch, fields)
+                    batch = []
+            if batch:
+                updated += cls.objects.bulk_update(batch, fields)
+        return updated
+    
     @property
     def is_available(self):
         """Check if mentor is available for booking"""
@@ -129,6 +211,40 @@ class MentorProfile(models.Model):
         return ", ".join([skill.name for skill in self.skills.all()])
 
 
+class MentorSearchDocument(models.Model):
+    """Flattened, searchable copy of an approved mentor's profile.
+
+    One row per approved mentor, kept fresh by the handlers in main/signals.py. The
+    database-specific full-text index over these columns (weighted tsvector + GIN on
+    PostgreSQL, FTS5 on SQLite) is created in migration 0014; see main/search.py.
+    """
+    mentor = models.OneToOneField(MentorProfile, on_delete=models.CASCADE, related_name='search_document')
+    full_name = models.CharField(max_length=100)
+    headline = models.CharField(max_length=100, blank=True)
+    bio = models.TextField(blank=True)
+    skills = models.TextField(blank=True, help_text="Comma-separated skill names")
+    available_for = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Search document for {self.full_name}"
+
+
+class SkillPostingList(models.Model):
+    """Inverted index entry: the approved mentors that list a given skill.
+
+    Maintained incrementally by the skills m2m_changed and MentorProfile handlers in
+    main/signals.py and rebuilt with `manage.py rebuild_skill_index`; see main/skill_index.py.
+    """
+    skill = models.OneToOneField(Skill, on_delete=models.CASCADE, primary_key=True, related_name='posting_list')
+    mentor_ids = models.JSONField(default=list, help_text="Sorted ids of approved mentors with this skill")
+    mentor_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.skill.name} ({self.mentor_count} mentors)"
+
+
 class MenteeProfile(models.Model):
     LEVEL_CHOICES = [
         ('beginner', 'Beginner'),
@@ -189,18 +305,40 @@ class Session(models.Model):
     admin_provided_link = models.URLField(blank=True, null=True, help_text="Link provided by admin when confirming session")
     link_provided_at = models.DateTimeField(blank=True, null=True, help_text="Timestamp when admin provided the link")
     
+    # Calendar event backing meeting_link (see main/google_meet_helper.py)
+    calendar_event_id = models.CharField(max_length=255, blank=True, default='', db_index=True)
+    calendar_provider = models.CharField(max_length=20, blank=True, default='', help_text="Calendar backend that owns the event, e.g. 'google'")
+    calendar_synced_at = models.DateTimeField(blank=True, null=True, help_text="Last time the calendar event was created or updated")
+    calendar_event_generation = models.PositiveIntegerField(default=0, help_text="Bumped when the session's event is deleted, so a new event gets a fresh id")
+    
     # Payment info
     amount_paid = models.DecimalField(max_digits=8, decimal_places=2, default=0)
     payment_status = models.CharField(max_length=20, default='pending')
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['session_date', 'session_time']
-        unique_together = ['mentor', 'session_date', 'session_time']
-    
+        constraints = [
+            # Only live bookings claim a start time; cancelled/completed ones free it again.
+            # Overlapping (not just identical) times are rejected by main.booking and, on
+            # PostgreSQL, by the main_session_no_overlap exclusion constraint.
+            models.UniqueConstraint(
+                fields=['mentor', 'session_date', 'session_time'],
+                condition=models.Q(status__in=['pending', 'confirmed']),
+                name='main_session_active_slot_unique',
+            ),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the rollup key so a reschedule can flag the day it moved away from
+        instance._loaded_rollup_key = (instance.__dict__.get('mentor_id'), instance.__dict__.get('session_date'))
+        return instance
+
     def __str__(self):
         return f"{self.mentor.full_name} - {self.mentee.username} on {self.session_date} at {self.session_time}"
     
@@ -249,6 +387,37 @@ class Session(models.Model):
         return self.meeting_link
 
 
+class SlotHold(models.Model):
+    """Short-lived reservation of a mentor's time while the mentee completes payment.
+
+    Live holds (expires_at in the future) count as busy time for availability and
+    overlap checks. Paying converts the hold into a Session; abandoned holds simply
+    lapse and are deleted in batches by `manage.py expire_slot_holds`.
+    """
+    mentor = models.ForeignKey(MentorProfile, on_delete=models.CASCADE, related_name='slot_holds')
+    mentee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='slot_holds')
+    session_date = models.DateField()
+    session_time = models.TimeField()
+    duration_minutes = models.IntegerField(default=60)
+    meeting_notes = models.TextField(blank=True, null=True)
+    amount_paid = models.DecimalField(max_digits=8, decimal_places=2, default=0, help_text="Amount due on payment")
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ['expires_at']
+        indexes = [
+            models.Index(fields=['mentor', 'session_date'], name='main_slothold_mentor_date'),
+        ]
+
+    def __str__(self):
+        return f"Hold on {self.mentor.full_name} for {self.mentee.username} on {self.session_date} at {self.session_time}"
+
+    @property
+    def is_live(self):
+        return self.expires_at > timezone.now()
+
+
 class MentorFeedback(models.Model):
     """Feedback left by a mentee for a completed session."""
     mentor = models.ForeignKey(MentorProfile, on_delete=models.CASCADE, related_name='feedbacks')
@@ -257,10 +426,27 @@ class MentorFeedback(models.Model):
     rating = models.PositiveIntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
     comment = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['-created_at']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the persisted rating so edits can be applied as a delta
+        instance._loaded_rating = instance.__dict__.get('rating')
+        instance._loaded_mentor_id = instance.__dict__.get('mentor_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Keep the feedback row and the mentor's rating aggregates in one transaction;
+        # the post_save handler in main/signals.py runs inside this block.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self._loaded_rating = self.rating
+        self._loaded_mentor_id = self.mentor_id
+
     def __str__(self):
         return f"Feedback {self.rating}/5 by {self.mentee.username} for {self.mentor.full_name}"
 
@@ -270,9 +456,15 @@ class ContactMessage(models.Model):
     subject = models.CharField(max_length=150)
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(blank=True, null=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='main_contact_created'),
+            # The inbox opens on unread messages; only those rows are in this index
+            models.Index(fields=['-created_at'], name='main_contact_unread', condition=models.Q(read_at__isnull=True)),
+        ]
 
     def __str__(self):
         return f"Contact from {self.name} - {self.subject}"
@@ -286,7 +478,16 @@ class hire_developer(models.Model):
     project_heading = models.CharField(max_length=200)
     project_details = models.TextField()
     deadline = models.DateField()
-    
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='main_hire_created'),
+            # The inbox opens on unread requests; only those rows are in this index
+            models.Index(fields=['-created_at'], name='main_hire_unread', condition=models.Q(read_at__isnull=True)),
+        ]
 
     def __str__(self):
         return f"Hire Request from {self.name} - {self.email}"
@@ -297,6 +498,18 @@ class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Serve this many questions sampled from the category per attempt (empty: all of them)
+    sample_size = models.PositiveIntegerField(
+        blank=True, null=True,
+        help_text="Questions per attempt, sampled from the pool. Leave empty to serve every question."
+    )
+    stratify_by_marks = models.BooleanField(
+        default=False,
+        help_text="Keep the pool's mix of question marks in each sample"
+    )
+    # Part of the cache key of the compiled answer key (main/answer_keys.py); bumped
+    # with an UPDATE whenever the category's questions or options change
+    answer_key_version = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ['name']
@@ -304,6 +517,16 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Never write back a stale answer_key_version: a question edited while this
+            # instance was loaded would otherwise get its old compiled key served again
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'answer_key_version'
+            ]
+        super().save(*args, **kwargs)
+
 
 class Question(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='questions')
@@ -311,6 +534,13 @@ class Question(models.Model):
     marks = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the category so moving a question drops both categories' answer keys
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        return instance
+
     def __str__(self):
         return f"{self.category.name}: {self.text[:50]}"
 
@@ -332,9 +562,19 @@ class TestAttempt(models.Model):
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(blank=True, null=True)
     completed = models.BooleanField(default=False)
+    # Sampled attempts (Category.sample_size): the questions served, in order, and
+    # the seed they were drawn with. Empty for attempts that served every question.
+    served_question_ids = models.JSONField(default=list, blank=True)
+    sample_seed = models.BigIntegerField(blank=True, null=True)
+    # Counted in QuestionStats by `manage.py rollup_question_stats`
+    analyzed = models.BooleanField(default=False)
 
     class Meta:
         ordering = ['-started_at']
+        indexes = [
+            # The analytics job's backlog: completed attempts not counted yet
+            models.Index(fields=['id'], name='main_attempt_unanalyzed', condition=models.Q(completed=True, analyzed=False)),
+        ]
 
     def performance_percent(self):
         if not self.total_marks:
@@ -364,4 +604,221 @@ class AttemptAnswer(models.Model):
     marks_awarded = models.PositiveIntegerField(default=0)
 
     def __str__(self):
-        return f"Attempt {self.attempt.id} - Q{self.question.id} - {self.marks_awarded}"
\ No newline at end of file
+        return f"Attempt {self.attempt.id} - Q{self.question.id} - {self.marks_awarded}"
+
+
+class QuestionStats(models.Model):
+    """Item analysis of a quiz question over the completed attempts counted so far.
+
+    The running sums are what main/question_stats.py adds each run's attempts to;
+    p_value, discrimination and option_counts are what the admin reads.
+    """
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, related_name='stats')
+    responses = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    # Answers with a rest score (the attempt's score without this question, as a
+    # fraction of the marks left): count, correct count, sum, sum of squares and
+    # sum over correct answers
+    rest_count = models.PositiveIntegerField(default=0)
+    rest_correct = models.PositiveIntegerField(default=0)
+    rest_sum = models.FloatField(default=0)
+    rest_sq_sum = models.FloatField(default=0)
+    rest_correct_sum = models.FloatField(default=0)
+    # {option id: times selected}
+    option_counts = models.JSONField(default=dict, blank=True)
+    p_value = models.FloatField(null=True, blank=True)
+    discrimination = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def option_rate(self, option_id):
+        if not self.responses:
+            return None
+        return self.option_counts.get(str(option_id), 0) / self.responses
+
+    def __str__(self):
+        return f"Q{self.question_id}: p={self.p_value} d={self.discrimination}"
+
+
+class CategoryScoreBucket(models.Model):
+    """Completed attempts of a category per whole-percent score (0-100), for percentile ranks.
+
+    Maintained incrementally by main/leaderboards.py as attempts complete.
+    """
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='score_buckets')
+    percent = models.PositiveSmallIntegerField()
+    attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'percent'], name='main_score_bucket_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.category_id} {self.percent}%: {self.attempts}"
+
+
+class CategoryBestScore(models.Model):
+    """A user's best completed attempt in a category; the category leaderboard reads these."""
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='best_scores')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='best_test_scores')
+    attempt = models.ForeignKey(TestAttempt, on_delete=models.CASCADE, related_name='+')
+    percent = models.FloatField()
+    score = models.PositiveIntegerField()
+    total_marks = models.PositiveIntegerField()
+    achieved_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'user'], name='main_best_score_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['category', '-percent', '-score', 'achieved_at'], name='main_best_score_rank'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} in {self.category_id}: {self.percent}%"
+
+
+class Job(models.Model):
+    """A unit of background work (email, Google Calendar call) run by `manage.py run_workers`.
+
+    See main/jobs.py for enqueueing, claiming and the retry/backoff policy.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('dead', 'Dead'),
+    ]
+
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['run_at']
+        indexes = [
+            # Workers poll "queued and due, oldest first"
+            models.Index(fields=['status', 'run_at'], name='main_job_status_run_at'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.id} ({self.status})"
+
+
+class OutboxEmail(models.Model):
+    """A notification email written in the same transaction as the change it reports.
+
+    Drained in batches over a reused SMTP connection by main.emails.dispatch_outbox.
+    `dedup_key` is unique, so queueing the same email twice (a retried job or request)
+    stores it once.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    dedup_key = models.CharField(max_length=64, unique=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='main_outbox_status_next'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+
+class DailyStats(models.Model):
+    """Site-wide signups for one day, precomputed for the admin dashboard's trend numbers.
+
+    Written by `manage.py rollup_daily_stats` (see main/metrics.py); never read live tables for these.
+    The session and revenue trends come from MentorDailyStats instead, by session day.
+    """
+    date = models.DateField(unique=True)
+    new_users = models.PositiveIntegerField(default=0)
+    new_mentors = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name_plural = 'daily stats'
+
+    def __str__(self):
+        return f"Stats for {self.date}"
+
+
+class MentorDailyStats(models.Model):
+    """Per mentor and session day aggregates of sessions and feedback, for reporting.
+
+    Maintained incrementally by `manage.py rollup_mentor_stats` (see main/rollups.py).
+    Amounts and minutes leave out cancelled sessions. `dirty` marks rows whose sessions
+    moved away or were deleted, which an updated_at scan can't see.
+    """
+    mentor = models.ForeignKey(MentorProfile, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    sessions_pending = models.PositiveIntegerField(default=0)
+    sessions_confirmed = models.PositiveIntegerField(default=0)
+    sessions_completed = models.PositiveIntegerField(default=0)
+    sessions_cancelled = models.PositiveIntegerField(default=0)
+    minutes_booked = models.PositiveIntegerField(default=0)
+    amount_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    feedback_count = models.PositiveIntegerField(default=0)
+    feedback_rating_sum = models.PositiveIntegerField(default=0)
+    dirty = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name_plural = 'mentor daily stats'
+        constraints = [
+            models.UniqueConstraint(fields=['mentor', 'date'], name='main_mentordailystats_mentor_date'),
+        ]
+        indexes = [
+            # Reports filter by date range first
+            models.Index(fields=['date'], name='main_mentordailystats_date'),
+        ]
+
+    @property
+    def sessions_total(self):
+        return self.sessions_pending + self.sessions_confirmed + self.sessions_completed + self.sessions_cancelled
+
+    @property
+    def feedback_avg(self):
+        return round(self.feedback_rating_sum / self.feedback_count, 2) if self.feedback_count else None
+
+    def __str__(self):
+        return f"{self.mentor_id} on {self.date}"
+
+
+class RollupState(models.Model):
+    """High-water mark of an incremental rollup: rows changed after it are still to be processed."""
+    name = models.CharField(max_length=50, unique=True)
+    high_water_mark = models.DateTimeField(null=True, blank=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} up to {self.high_water_mark}"
@@ -0,0 +1,236 @@
+"""
+Keyset (cursor) pagination for the large listings.
+
+Django's Paginator runs COUNT(*) over the whole filtered queryset on every page and
+then an OFFSET that gets slower the deeper you go. CursorPaginator instead seeks
+from the last row of the previous page using the listing's ordering, so every page
+costs the same. The page object mimics django.core.paginator.Page closely enough
+for the existing templates: previous_page_number / next_page_number return opaque
+signed tokens that travel in the usual ?page= parameter.
+
+Opt in with settings.CURSOR_PAGINATION = True; see paginate().
+"""
+
+import datetime
+import json
+import math
+from collections.abc import Sequence
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core import signing
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+
+TOKEN_SALT = 'main.pagination.cursor'
+LAST_PAGE = 'last'
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, number, paginator, has_next, has_previous, next_token=None, previous_token=None):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self._next_token = next_token
+        self._previous_token = previous_token
+
+    def __repr__(self):
+        return f"<Cursor page {self.number or '?'}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def next_page_number(self):
+        return self._next_token
+
+    def previous_page_number(self):
+        return self._previous_token
+
+
+class CursorPaginator:
+    """Keyset paginator over a queryset ordered by non-null, directly-stored fields.
+
+    `ordering` must match the listing order, e.g. ('-session_date', '-session_time');
+    the primary key is appended as a tiebreaker. `count` is 'exact', 'approximate'
+    (planner estimate on PostgreSQL, exact elsewhere) or None to skip counting.
+    """
+
+    is_cursor = True
+
+    def __init__(self, queryset, per_page, ordering, count=None):
+        self.per_page = int(per_page)
+        pk_name = queryset.model._meta.pk.name
+        ordering = list(ordering)
+        if not any(o.lstrip('-') in (pk_name, 'pk') for o in ordering):
+            ordering.append(('-' if ordering and ordering[0].startswith('-') else '') + pk_name)
+        self.ordering = ordering
+        self.fields = [o.lstrip('-') for o in ordering]
+        self.queryset = queryset.order_by(*ordering)
+        self.count_mode = count
+        self._count = None
+
+    # -- counting -------------------------------------------------------
+
+    @property
+    def count(self):
+        if self.count_mode is None:
+            return None
+        if self._count is None:
+            if self.count_mode == 'approximate':
+                self._count = estimate_count(self.queryset)
+            else:
+                self._count = self.queryset.count()
+        return self._count
+
+    @property
+    def num_pages(self):
+        count = self.count
+        if count is None:
+            return None
+        return max(1, math.ceil(count / self.per_page))
+
+    @property
+    def last_page_token(self):
+        return LAST_PAGE
+
+    # -- tokens ---------------------------------------------------------
+
+    def _field_value(self, obj, field):
+        return getattr(obj, 'pk' if field == 'pk' else field)
+
+    def _encode_value(self, value):
+        # DjangoJSONEncoder cuts datetimes and times to milliseconds, and the seek would
+        # then skip every row inside the lost microseconds; isoformat() keeps them
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+        return json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+
+    def _make_token(self, obj, direction, number):
+        values = [self._encode_value(self._field_value(obj, f)) for f in self.fields]
+        payload = {'v': values, 'd': direction, 'n': number}
+        return signing.dumps(payload, salt=TOKEN_SALT, compress=True)
+
+    def _read_token(self, token):
+        """Decode a page token; returns None (first page) for missing, numeric or tampered tokens."""
+        if not token or str(token).isdigit():
+            return None
+        try:
+            payload = signing.loads(token, salt=TOKEN_SALT)
+            if len(payload['v']) != len(self.fields) or payload['d'] not in ('next', 'prev'):
+                return None
+            opts = self.queryset.model._meta
+            values = [
+                (opts.pk if f == 'pk' else opts.get_field(f)).to_python(raw)
+                for f, raw in zip(self.fields, payload['v'])
+            ]
+            return values, payload['d'], payload.get('n')
+        except Exception:
+            # Bad signature, stale token from a different ordering, malformed values...
+            return None
+
+    def _seek(self, values, forward):
+        """Rows strictly after (forward) or before the given key in listing order."""
+        clauses = []
+        for i, field in enumerate(self.fields):
+            descending = self.ordering[i].startswith('-')
+            # Moving forward through a descending column means smaller values
+            op = 'lt' if descending == forward else 'gt'
+            equal = {f: v for f, v in zip(self.fields[:i], values[:i])}
+            clauses.append(Q(**equal, **{f'{field}__{op}': values[i]}))
+        return reduce(or_, clauses)
+
+    def _reversed_ordering(self):
+        return [o[1:] if o.startswith('-') else f'-{o}' for o in self.ordering]
+
+    # -- pages ----------------------------------------------------------
+
+    def get_page(self, token=None):
+        limit = self.per_page + 1
+
+        if token == LAST_PAGE:
+            rows = list(self.queryset.order_by(*self._reversed_ordering())[:limit])
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return self._build_page(rows, self.num_pages, has_next=False, has_previous=has_previous)
+
+        decoded = self._read_token(token)
+        if decoded is None:
+            rows = list(self.queryset[:limit])
+            has_next = len(rows) > self.per_page
+            return self._build_page(rows[:self.per_page], 1, has_next=has_next, has_previous=False)
+
+        values, direction, number = decoded
+        if direction == 'next':
+            rows = list(self.queryset.filter(self._seek(values, forward=True))[:limit])
+            has_next = len(rows) > self.per_page
+            return self._build_page(rows[:self.per_page], number, has_next=has_next, has_previous=True)
+
+        rows = list(self.queryset.filter(self._seek(values, forward=False)).order_by(*self._reversed_ordering())[:limit])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        if not has_previous:
+            number = 1
+        return self._build_page(rows, number, has_next=True, has_previous=has_previous)
+
+    def _build_page(self, rows, number, has_next, has_previous):
+        next_token = previous_token = None
+        if rows and has_next:
+            next_token = self._make_token(rows[-1], 'next', number + 1 if number else None)
+        if rows and has_previous:
+            previous_token = self._make_token(rows[0], 'prev', number - 1 if number and number > 1 else None)
+        return CursorPage(rows, number, self, has_next, has_previous, next_token, previous_token)
+
+
+def estimate_count(queryset):
+    """Cheap row count: the planner's estimate on PostgreSQL, an exact COUNT elsewhere.
+
+    Unfiltered querysets read pg_class.reltuples; filtered ones use the row estimate
+    from EXPLAIN, which is good enough for "about N results" and page totals.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            if row and row[0] >= 0:
+                return int(row[0])
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+def paginate(request, queryset, per_page, ordering, count='approximate'):
+    """Return a page for a listing, using keyset pagination when settings.CURSOR_PAGINATION is on.
+
+    `ordering` is the listing's order_by() fields; the queryset is (re)ordered by it.
+    """
+    page = request.GET.get('page')
+    if getattr(settings, 'CURSOR_PAGINATION', False):
+        return CursorPaginator(queryset, per_page, ordering, count=count).get_page(page)
+    return Paginator(queryset.order_by(*ordering), per_page).get_page(page)
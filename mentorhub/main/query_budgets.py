@@ -0,0 +1,57 @@
+"""
+Query Budgets
+Per-view SQL query budgets, keyed by URL name, enforced by main/querybudget.py.
+
+A budget is the most queries one request to that view may run, independent of how
+many rows the page lists. Views without an entry get DEFAULT_QUERY_BUDGET; None
+turns the budget check off for a view (N+1 detection still applies). Raise a
+budget deliberately in review, not to silence a warning.
+"""
+
+DEFAULT_QUERY_BUDGET = 25
+
+# The same normalized statement from the same call site this many times in one
+# request is reported as an N+1
+N_PLUS_ONE_THRESHOLD = 3
+
+QUERY_BUDGETS = {
+    # Public pages
+    'home': 5,
+    'find_mentors': 10,
+    'mentor_detail': 12,
+    'quiz_categories': 6,
+    # Grading also counts the attempt in the leaderboard tables (main/leaderboards.py);
+    # worst case is a submit that recompiles the answer key and is the category's first
+    'take_test': 15,
+    'test_result': 12,
+    'quiz_leaderboard': 6,
+
+    # Dashboards
+    'mentee_dashboard': 8,
+    'mentor_dashboard': 8,
+    'mentee_session_history': 8,
+    'mentor_session_history': 8,
+    'mentee_session_detail': 8,
+    'mentor_session_detail': 8,
+
+    # Booking
+    'book_session': 15,
+    'payment_page': 15,
+    'session_confirmation': 8,
+
+    # Staff pages
+    'admin_dashboard': 10,
+    'admin_reports': 10,
+    'admin_mentors': 8,
+    # One bulk insert per chunk of rows and one posting-list update per skill
+    'admin_mentor_import': None,
+    'admin_sessions': 8,
+    'admin_users': 8,
+    'admin_skills': 6,
+    'admin_quiz_manage': 6,
+    'admin_category_detail': 8,
+    # One bulk insert per batch of questions and of options
+    'admin_category_import': None,
+    'hire_developer_data': 6,
+    'contact_messages': 6,
+}
@@ -0,0 +1,187 @@
+"""
+Query Budget Module
+Records every SQL statement a request runs, flags N+1 patterns and enforces the
+per-URL-name query budgets declared in main/query_budgets.py.
+
+Runtime: QueryBudgetMiddleware (enabled with settings.QUERY_BUDGET_ENABLED, on in
+DEBUG) logs violations to the 'main.querybudget' logger, or raises
+QueryBudgetExceeded when settings.QUERY_BUDGET_STRICT is on (the test runner).
+
+Tests:
+    with assert_query_budget('find_mentors'):
+        client.get(reverse('find_mentors'))
+
+An N+1 is the same normalized statement issued from the same call site at least
+N_PLUS_ONE_THRESHOLD times in one request, e.g. a template loop touching
+`session.mentor.full_name` without select_related.
+"""
+
+import logging
+import os
+import re
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from .query_budgets import DEFAULT_QUERY_BUDGET, N_PLUS_ONE_THRESHOLD, QUERY_BUDGETS
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?|\d+|NULL)\s*,?)+\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+# Savepoints aren't counted: TestCase runs every test in a transaction, which turns
+# each atomic() block into SAVEPOINT/RELEASE statements a production request doesn't issue
+_SAVEPOINT = re.compile(r'^\s*(?:SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b', re.IGNORECASE)
+# bulk_create() batches: one statement per batch_size rows, not one per row
+_MULTI_ROW_INSERT = re.compile(r'^\s*INSERT\b.*\bVALUES\s*\(.*?\)\s*,\s*\(', re.IGNORECASE | re.DOTALL)
+
+# Frames from these paths are skipped when looking for the code that issued a query
+_SKIP_PATHS = (
+    os.path.dirname(__file__) + os.sep + 'querybudget.py',
+    os.sep + 'django' + os.sep,
+    os.sep + 'site-packages' + os.sep,
+    os.sep + 'dist-packages' + os.sep,
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def normalize_sql(sql):
+    """Collapse literals and IN lists so the same statement with other parameters groups together."""
+    sql = _STRING.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    return _SPACE.sub(' ', sql).strip()
+
+
+def _call_site():
+    """file:line (function) of the innermost project frame, or the template being rendered."""
+    template = None
+    for frame, lineno in traceback.walk_stack(None):
+        filename = frame.f_code.co_filename
+        if template is None and 'django' + os.sep + 'template' in filename:
+            origin = getattr(frame.f_locals.get('self'), 'origin', None)
+            if origin is not None and getattr(origin, 'template_name', None):
+                template = origin.template_name
+        if any(part in filename for part in _SKIP_PATHS):
+            continue
+        site = f'{os.path.relpath(filename, settings.BASE_DIR)}:{lineno} ({frame.f_code.co_name})'
+        return f'{template} via {site}' if template else site
+    return template or '<unknown>'
+
+
+class QueryRecorder:
+    """Context manager that records (sql, normalized sql, call site, ms) for every query."""
+
+    def __init__(self, using=None):
+        self.aliases = [using] if using else list(connections)
+        self.queries = []
+        self._contexts = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if _SAVEPOINT.match(sql):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'normalized': normalize_sql(sql),
+                'site': _call_site(),
+                'ms': (time.perf_counter() - start) * 1000,
+            })
+
+    def __enter__(self):
+        for alias in self.aliases:
+            ctx = connections[alias].execute_wrapper(self)
+            ctx.__enter__()
+            self._contexts.append(ctx)
+        return self
+
+    def __exit__(self, *exc):
+        while self._contexts:
+            self._contexts.pop().__exit__(*exc)
+        return False
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    def repeated(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """[(count, normalized sql, call site)] for statements repeated from one call site."""
+        groups = Counter(
+            (q['normalized'], q['site']) for q in self.queries if not _MULTI_ROW_INSERT.match(q['normalized'])
+        )
+        return sorted(
+            ((count, sql, site) for (sql, site), count in groups.items() if count >= threshold),
+            reverse=True,
+        )
+
+
+def budget_for(url_name):
+    return QUERY_BUDGETS.get(url_name, DEFAULT_QUERY_BUDGET)
+
+
+def check(recorder, url_name, budget=None):
+    """Return a list of human-readable violations (empty when within budget)."""
+    budget = budget_for(url_name) if budget is None else budget
+    problems = []
+    if budget is not None and recorder.count > budget:
+        problems.append(f'{url_name or "<unnamed>"} ran {recorder.count} queries (budget {budget})')
+    for count, sql, site in recorder.repeated():
+        problems.append(f'possible N+1: {count}x from {site}: {sql[:300]}')
+    return problems
+
+
+class QueryBudgetMiddleware:
+    """Per-request query recording with budget and N+1 checks (see module docstring)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', settings.DEBUG):
+            return self.get_response(request)
+
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+            # Streaming responses run their queries after this point and aren't counted
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            try:
+                match = resolve(request.path_info)
+            except Resolver404:
+                match = None
+        url_name = match.url_name if match else None
+
+        problems = check(recorder, url_name)
+        if problems:
+            message = f'{request.method} {request.path}: ' + '; '.join(problems)
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        if settings.DEBUG:
+            response['X-Query-Count'] = str(recorder.count)
+        return response
+
+
+@contextmanager
+def assert_query_budget(url_name=None, budget=None):
+    """Fail if the wrapped block exceeds the URL name's budget (or `budget`) or repeats a query N+1-style."""
+    with QueryRecorder() as recorder:
+        yield recorder
+    problems = check(recorder, url_name, budget)
+    if problems:
+        raise QueryBudgetExceeded('\n'.join(problems))
@@ -0,0 +1,259 @@
+"""
+Question Bank Module
+JSON and CSV import and export of a whole quiz Category: questions, marks and
+options with their correctness flags.
+
+JSON:
+
+    {"category": {"name": "Python", "description": "..."},
+     "questions": [{"text": "...", "marks": 2,
+                    "options": [{"text": "...", "is_correct": true}, ...]}, ...]}
+
+CSV, one question per row, any number of option_N columns; `correct` lists the
+numbers of the correct options separated by ';':
+
+    text,marks,correct,option_1,option_2,option_3,option_4
+
+Every question is parsed and validated (text, marks, at least two options, at
+least one correct option) before anything is written. The import then inserts all
+questions with one bulk_create and all their options with another, in a single
+transaction; a bank either loads completely or not at all.
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from .answer_keys import invalidate_answer_key
+from .models import Category, Option, Question
+
+FORMATS = ('json', 'csv')
+
+CSV_COLUMNS = ['text', 'marks', 'correct']
+CSV_OPTION_PREFIX = 'option_'
+CORRECT_SEPARATOR = ';'
+
+_OPTION_TEXT_LENGTH = Option._meta.get_field('text').max_length
+
+
+@dataclass
+class ParsedQuestion:
+    text: str
+    marks: int
+    # [(text, is_correct)]
+    options: list
+
+
+@dataclass
+class BankResult:
+    questions: list = field(default_factory=list)
+    # (question number or line, message)
+    errors: list = field(default_factory=list)
+    category: dict = field(default_factory=dict)
+    imported: int = 0
+
+
+class BankError(ValueError):
+    pass
+
+
+def _correct_flag(value):
+    """A JSON is_correct value as a bool: true/false or 1/0 only, so "false" can't pass as correct."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    raise BankError(f'is_correct must be true or false, not {json.dumps(value)}')
+
+
+def _validate(text, marks, options):
+    """Return a ParsedQuestion or raise BankError."""
+    text = (text or '').strip()
+    if not text:
+        raise BankError('question text is empty')
+    try:
+        marks = int(marks if marks not in (None, '') else 1)
+    except (TypeError, ValueError):
+        raise BankError(f'marks "{marks}" is not a whole number')
+    if marks < 1:
+        raise BankError('marks must be at least 1')
+
+    cleaned = []
+    for option_text, is_correct in options:
+        option_text = (option_text or '').strip()
+        if not option_text:
+            continue
+        if len(option_text) > _OPTION_TEXT_LENGTH:
+            raise BankError(f'option "{option_text[:40]}…" is longer than {_OPTION_TEXT_LENGTH} characters')
+        cleaned.append((option_text, is_correct))
+    if len(cleaned) < 2:
+        raise BankError('a question needs at least two options')
+    if not any(is_correct for _, is_correct in cleaned):
+        raise BankError('no option is marked correct')
+    return ParsedQuestion(text=text, marks=marks, options=cleaned)
+
+
+# -----------------------------
+# Parsing
+# -----------------------------
+
+def parse_json(data):
+    """Parse a JSON bank (str or bytes) into a BankResult."""
+    result = BankResult()
+    try:
+        bank = json.loads(data)
+    except ValueError as e:
+        result.errors.append((0, f'not valid JSON: {e}'))
+        return result
+    if isinstance(bank, list):
+        bank = {'questions': bank}
+    if not isinstance(bank, dict) or not isinstance(bank.get('questions'), list):
+        result.errors.append((0, 'expected an object with a "questions" list'))
+        return result
+    if isinstance(bank.get('category'), dict):
+        result.category = {
+            'name': str(bank['category'].get('name') or '').strip(),
+            'description': str(bank['category'].get('description') or ''),
+        }
+
+    for number, item in enumerate(bank['questions'], start=1):
+        try:
+            if not isinstance(item, dict) or not isinstance(item.get('options', []), list):
+                raise BankError('expected {"text", "marks", "options": [...]}')
+            options = [
+                (option.get('text'), _correct_flag(option.get('is_correct', False)))
+                if isinstance(option, dict) else (option, False)
+                for option in item.get('options', [])
+            ]
+            result.questions.append(_validate(item.get('text'), item.get('marks'), options))
+        except BankError as e:
+            result.errors.append((number, str(e)))
+    return result
+
+
+def parse_csv(lines):
+    """Parse CSV `lines` (any iterable of text lines) into a BankResult, one row at a time."""
+    result = BankResult()
+    reader = csv.DictReader(lines)
+    header = [column.strip() for column in (reader.fieldnames or [])]
+    option_columns = sorted(
+        (column for column in header if column.startswith(CSV_OPTION_PREFIX) and column[len(CSV_OPTION_PREFIX):].isdigit()),
+        key=lambda column: int(column[len(CSV_OPTION_PREFIX):]),
+    )
+    if 'text' not in header or not option_columns:
+        result.errors.append((1, f'expected the columns {", ".join(CSV_COLUMNS)} and option_1, option_2, ...'))
+        return result
+    reader.fieldnames = header
+
+    for row in reader:
+        try:
+            correct = set()
+            for number in (row.get('correct') or '').split(CORRECT_SEPARATOR):
+                number = number.strip()
+                if not number:
+                    continue
+                if not number.isdigit() or f'{CSV_OPTION_PREFIX}{number}' not in option_columns:
+                    raise BankError(f'"correct" refers to option {number}, which has no column')
+                correct.add(f'{CSV_OPTION_PREFIX}{number}')
+            options = [(row.get(column), column in correct) for column in option_columns]
+            for column in correct:
+                if not (row.get(column) or '').strip():
+                    raise BankError(f'correct option {column} is empty')
+            result.questions.append(_validate(row.get('text'), row.get('marks'), options))
+        except BankError as e:
+            result.errors.append((reader.line_num, str(e)))
+    return result
+
+
+def parse(text, fmt):
+    """Parse a bank held in a string, by format name."""
+    if fmt == 'csv':
+        # newline='' keeps line breaks inside quoted cells intact
+        return parse_csv(io.StringIO(text, newline=''))
+    return parse_json(text)
+
+
+# -----------------------------
+# Import
+# -----------------------------
+
+def import_questions(category, questions):
+    """Add validated ParsedQuestions to `category`. Returns the number of questions created."""
+    with transaction.atomic():
+        created = Question.objects.bulk_create(
+            [Question(category=category, text=q.text, marks=q.marks) for q in questions],
+            batch_size=500,
+        )
+        Option.objects.bulk_create(
+            [
+                Option(question_id=question.id, text=text, is_correct=is_correct)
+                for question, parsed in zip(created, questions)
+                for text, is_correct in parsed.options
+            ],
+            batch_size=1000,
+        )
+        # bulk_create() skips the signals that drop the cached answer key
+        invalidate_answer_key(category.id)
+    return len(created)
+
+
+def run_import(category, text, fmt, dry_run=False):
+    """Parse and validate a bank and, if every question is valid and not dry_run, import it."""
+    result = parse(text, fmt)
+    if result.errors or dry_run or not result.questions:
+        return result
+    result.imported = import_questions(category, result.questions)
+    return result
+
+
+# -----------------------------
+# Export
+# -----------------------------
+
+def category_questions(category):
+    return category.questions.prefetch_related('options').order_by('id')
+
+
+def export_json(category):
+    """The category's bank as a JSON string, in the format parse_json() reads."""
+    return json.dumps({
+        'category': {'name': category.name, 'description': category.description},
+        'questions': [
+            {
+                'text': question.text,
+                'marks': question.marks,
+                'options': [
+                    {'text': option.text, 'is_correct': option.is_correct}
+                    for option in sorted(question.options.all(), key=lambda option: option.id)
+                ],
+            }
+            for question in category_questions(category)
+        ],
+    }, indent=2, ensure_ascii=False)
+
+
+def export_csv_rows(category):
+    """Header plus one row per question, in the format parse_csv() reads.
+
+    Cells are written as they are (no spreadsheet formula escaping), so an exported
+    bank imports back unchanged.
+    """
+    questions = list(category_questions(category))
+    width = max((len(question.options.all()) for question in questions), default=4)
+    yield CSV_COLUMNS + [f'{CSV_OPTION_PREFIX}{n}' for n in range(1, width + 1)]
+    for question in questions:
+        options = sorted(question.options.all(), key=lambda option: option.id)
+        correct = [str(n) for n, option in enumerate(options, start=1) if option.is_correct]
+        yield (
+            [question.text, question.marks, CORRECT_SEPARATOR.join(correct)]
+            + [option.text for option in options]
+            + [''] * (width - len(options))
+        )
+
+
+def get_or_create_category(name, description=''):
+    category, _ = Category.objects.get_or_create(name=name, defaults={'description': description})
+    return category
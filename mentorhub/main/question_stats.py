@@ -0,0 +1,203 @@
+"""
+Question Stats Module
+Per-question item analysis of quiz answers, shown on the admin category page.
+
+For every question, over the completed attempts counted so far:
+
+- p-value: the fraction of answers that were correct (near 1 is too easy, near 0
+  too hard).
+- discrimination: the point-biserial correlation between answering the question
+  correctly and the rest score, i.e. the attempt's score without this question as
+  a fraction of the marks left. A good question is answered correctly more often
+  by people who do well on the rest of the test; a negative value usually means a
+  wrong answer key.
+- option rates: how often each option was selected, including the distractors.
+
+Every statistic is built from running sums (QuestionStats), so each run of
+`manage.py rollup_question_stats` only reads the attempts completed since the last
+one (TestAttempt.analyzed is false), adds them and marks them counted. Answers and
+selections are streamed with QuerySet.iterator() in chunks of attempts, and the sums
+of each chunk are computed with NumPy.
+"""
+
+from math import sqrt
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AttemptAnswer, QuestionStats, RollupState, TestAttempt
+
+STATS_NAME = 'question_stats'
+
+SUM_FIELDS = ['responses', 'correct', 'rest_count', 'rest_correct', 'rest_sum', 'rest_sq_sum', 'rest_correct_sum']
+
+SelectedOption = AttemptAnswer.selected_options.through
+
+
+# -----------------------------
+# Statistics
+# -----------------------------
+
+def _rest_score(score, total_marks, marks_awarded, question_marks):
+    """The attempt's score without this question, as a fraction of the marks left (None if none are left)."""
+    rest_total = total_marks - question_marks
+    if rest_total <= 0:
+        return None
+    return min(max((score - marks_awarded) / rest_total, 0.0), 1.0)
+
+
+def chunk_sums(question_ids, correct, rest):
+    """{question id: [responses, correct, rest_count, rest_correct, rest_sum, rest_sq_sum, rest_correct_sum]}.
+
+    `rest` holds NaN for answers without a rest score.
+    """
+    if not question_ids:
+        return {}
+    questions, index = np.unique(np.asarray(question_ids), return_inverse=True)
+    x = np.asarray(correct, dtype=float)
+    y = np.asarray(rest, dtype=float)
+    scored = ~np.isnan(y)
+    y = np.where(scored, y, 0.0)
+    size = len(questions)
+    columns = [
+        np.bincount(index, minlength=size),
+        np.bincount(index, weights=x, minlength=size),
+        np.bincount(index, weights=scored, minlength=size),
+        np.bincount(index, weights=x * scored, minlength=size),
+        np.bincount(index, weights=y, minlength=size),
+        np.bincount(index, weights=y * y, minlength=size),
+        np.bincount(index, weights=x * y, minlength=size),
+    ]
+    return {
+        # The four counts come back as floats from the weighted bincounts
+        int(question_id): [int(round(column[i])) for column in columns[:4]] + [float(column[i]) for column in columns[4:]]
+        for i, question_id in enumerate(questions)
+    }
+
+
+def point_biserial(n, sx, sy, syy, sxy):
+    """Correlation of a 0/1 variable with a continuous one from their running sums."""
+    if n < 2:
+        return None
+    # sum(x*x) == sum(x) for a 0/1 variable
+    variance = (n * sx - sx * sx) * (n * syy - sy * sy)
+    if variance <= 1e-12:
+        return None
+    return (n * sxy - sx * sy) / sqrt(variance)
+
+
+def finalize(stats):
+    stats.p_value = stats.correct / stats.responses if stats.responses else None
+    r = point_biserial(stats.rest_count, stats.rest_correct, stats.rest_sum, stats.rest_sq_sum, stats.rest_correct_sum)
+    stats.discrimination = round(r, 4) if r is not None else None
+    return stats
+
+
+# -----------------------------
+# Incremental job
+# -----------------------------
+
+def _process(attempt_ids):
+    """Add the answers of these attempts to QuestionStats. Returns the number of answers read."""
+    question_ids, correct, rest = [], [], []
+    answers = (
+        AttemptAnswer.objects.filter(attempt_id__in=attempt_ids)
+        .values_list('question_id', 'is_correct', 'marks_awarded', 'question__marks', 'attempt__score', 'attempt__total_marks')
+        .order_by()
+        .iterator(chunk_size=2000)
+    )
+    for question_id, is_correct, marks_awarded, question_marks, score, total_marks in answers:
+        question_ids.append(question_id)
+        correct.append(1 if is_correct else 0)
+        value = _rest_score(score, total_marks, marks_awarded, question_marks)
+        rest.append(float('nan') if value is None else value)
+    sums = chunk_sums(question_ids, correct, rest)
+
+    selections = {}
+    for question_id, option_id in (
+        SelectedOption.objects.filter(attemptanswer__attempt_id__in=attempt_ids)
+        .values_list('attemptanswer__question_id', 'option_id')
+        .order_by()
+        .iterator(chunk_size=2000)
+    ):
+        counts = selections.setdefault(question_id, {})
+        counts[str(option_id)] = counts.get(str(option_id), 0) + 1
+
+    existing = {stats.question_id: stats for stats in QuestionStats.objects.filter(question_id__in=sums)}
+    to_create, to_update = [], []
+    now = timezone.now()
+    for question_id, values in sums.items():
+        stats = existing.get(question_id)
+        if stats is None:
+            stats = QuestionStats(question_id=question_id)
+            to_create.append(stats)
+        else:
+            to_update.append(stats)
+        for field, value in zip(SUM_FIELDS, values):
+            setattr(stats, field, getattr(stats, field) + value)
+        for option_id, count in selections.get(question_id, {}).items():
+            stats.option_counts[option_id] = stats.option_counts.get(option_id, 0) + count
+        stats.updated_at = now
+        finalize(stats)
+
+    QuestionStats.objects.bulk_create(to_create, batch_size=500)
+    QuestionStats.objects.bulk_update(
+        to_update, SUM_FIELDS + ['option_counts', 'p_value', 'discrimination', 'updated_at'], batch_size=500,
+    )
+    return len(question_ids)
+
+
+def run_question_stats(rebuild=False, chunk_size=500):
+    """Count the completed attempts not analyzed yet. Returns (attempts, answers) processed."""
+    RollupState.objects.get_or_create(name=STATS_NAME)
+    if rebuild:
+        with transaction.atomic():
+            QuestionStats.objects.all().delete()
+            TestAttempt.objects.filter(analyzed=True).update(analyzed=False)
+
+    attempts = answers = 0
+    while True:
+        with transaction.atomic():
+            # Locking the job's state row serializes concurrent runs, so no attempt is
+            # counted twice and no QuestionStats update is lost
+            state = RollupState.objects.select_for_update().get(name=STATS_NAME)
+            attempt_ids = list(
+                TestAttempt.objects.filter(completed=True, analyzed=False)
+                .order_by('id').values_list('id', flat=True)[:chunk_size]
+            )
+            if not attempt_ids:
+                break
+            answers += _process(attempt_ids)
+            TestAttempt.objects.filter(id__in=attempt_ids).update(analyzed=True)
+            attempts += len(attempt_ids)
+
+    state.last_run_at = timezone.now()
+    state.save(update_fields=['last_run_at'])
+    return attempts, answers
+
+
+# -----------------------------
+# Admin
+# -----------------------------
+
+# Flags shown next to a question's numbers
+TOO_EASY = 0.9
+TOO_HARD = 0.2
+WEAK_DISCRIMINATION = 0.1
+MIN_RESPONSES = 20
+
+
+def flags(stats):
+    if stats is None or stats.responses < MIN_RESPONSES:
+        return []
+    result = []
+    if stats.p_value is not None and stats.p_value >= TOO_EASY:
+        result.append('too easy')
+    if stats.p_value is not None and stats.p_value <= TOO_HARD:
+        result.append('too hard')
+    if stats.discrimination is not None and stats.discrimination < 0:
+        result.append('check answer key')
+    elif stats.discrimination is not None and stats.discrimination < WEAK_DISCRIMINATION:
+        result.append('weak discrimination')
+    return result
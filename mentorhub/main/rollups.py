@@ -0,0 +1,204 @@
+"""
+Rollups Module
+Incremental per mentor x day aggregates (MentorDailyStats) for the reporting views.
+
+Each run looks only at sessions and feedback whose updated_at is past the rollup's
+high-water mark (RollupState), collects the (mentor, session day) keys they touch,
+plus rows flagged dirty by main/signals.py when a session is rescheduled or deleted,
+and recomputes those keys from scratch. Recomputing whole keys keeps the rollup
+exact however often a row changes. The new mark trails the run's start time by
+HIGH_WATER_OVERLAP, so rows committed by transactions that were still open during
+the scan are picked up by the next run.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import MentorDailyStats, MentorFeedback, RollupState, Session
+
+ROLLUP_NAME = 'mentor_daily_stats'
+
+HIGH_WATER_OVERLAP = timedelta(minutes=5)
+
+STAT_FIELDS = [
+    'sessions_pending', 'sessions_confirmed', 'sessions_completed', 'sessions_cancelled',
+    'minutes_booked', 'amount_paid', 'feedback_count', 'feedback_rating_sum',
+]
+
+
+def mark_dirty(keys):
+    """Flag the rollup rows for these (mentor_id, date) keys for recomputation."""
+    keys = {key for key in keys if None not in key}
+    if not keys:
+        return
+    condition = Q()
+    for mentor_id, day in keys:
+        condition |= Q(mentor_id=mentor_id, date=day)
+    MentorDailyStats.objects.filter(condition).update(dirty=True)
+
+
+def changed_keys(since):
+    """(mentor_id, session day) keys touched by sessions or feedback changed after `since`."""
+    keys = set()
+    sessions = Session.objects.all()
+    feedback = MentorFeedback.objects.all()
+    if since is not None:
+        sessions = sessions.filter(updated_at__gt=since)
+        feedback = feedback.filter(updated_at__gt=since)
+    keys.update(sessions.values_list('mentor_id', 'session_date').distinct().order_by().iterator(chunk_size=2000))
+    keys.update(
+        feedback.values_list('session__mentor_id', 'session__session_date').distinct().order_by().iterator(chunk_size=2000)
+    )
+    keys.update(MentorDailyStats.objects.filter(dirty=True).values_list('mentor_id', 'date'))
+    return keys
+
+
+def compute_keys(keys):
+    """Fresh MentorDailyStats (unsaved) for the given keys; keys without sessions are left out."""
+    mentor_ids = {mentor_id for mentor_id, _ in keys}
+    days = {day for _, day in keys}
+    live = ~Q(status='cancelled')
+
+    # mentor IN (...) AND day IN (...) is a superset of the keys; the extra rows are
+    # exact too, so they are kept rather than filtered out
+    rows = {}
+    sessions = (
+        Session.objects.filter(mentor_id__in=mentor_ids, session_date__in=days)
+        .values('mentor_id', 'session_date')
+        .annotate(
+            pending=Count('id', filter=Q(status='pending')),
+            confirmed=Count('id', filter=Q(status='confirmed')),
+            completed=Count('id', filter=Q(status='completed')),
+            cancelled=Count('id', filter=Q(status='cancelled')),
+            minutes=Sum('duration_minutes', filter=live),
+            amount=Sum('amount_paid', filter=live),
+        )
+        .order_by()
+    )
+    for row in sessions:
+        rows[(row['mentor_id'], row['session_date'])] = MentorDailyStats(
+            mentor_id=row['mentor_id'],
+            date=row['session_date'],
+            sessions_pending=row['pending'],
+            sessions_confirmed=row['confirmed'],
+            sessions_completed=row['completed'],
+            sessions_cancelled=row['cancelled'],
+            minutes_booked=row['minutes'] or 0,
+            amount_paid=row['amount'] or Decimal('0'),
+        )
+
+    feedback = (
+        MentorFeedback.objects.filter(session__mentor_id__in=mentor_ids, session__session_date__in=days)
+        .values('session__mentor_id', 'session__session_date')
+        .annotate(count=Count('id'), rating_sum=Sum('rating'))
+        .order_by()
+    )
+    for row in feedback:
+        stats = rows.get((row['session__mentor_id'], row['session__session_date']))
+        if stats is not None:
+            stats.feedback_count = row['count']
+            stats.feedback_rating_sum = row['rating_sum'] or 0
+    return rows
+
+
+def _chunks(items, size):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def run_rollup(rebuild=False, chunk_size=500):
+    """Bring MentorDailyStats up to date. Returns (keys recomputed, rows written, rows deleted)."""
+    started = timezone.now()
+    state, _ = RollupState.objects.get_or_create(name=ROLLUP_NAME)
+    since = None if rebuild else state.high_water_mark
+
+    if rebuild:
+        MentorDailyStats.objects.update(dirty=True)
+    keys = changed_keys(since)
+
+    written = deleted = 0
+    for chunk in _chunks(sorted(keys), chunk_size):
+        with transaction.atomic():
+            rows = compute_keys(chunk)
+            for stats in rows.values():
+                # bulk_create() doesn't run auto_now
+                stats.updated_at = started
+            MentorDailyStats.objects.bulk_create(
+                rows.values(),
+                update_conflicts=True,
+                unique_fields=['mentor', 'date'],
+                update_fields=STAT_FIELDS + ['dirty', 'updated_at'],
+            )
+            written += len(rows)
+            # Keys left without any session (everything moved away or was deleted)
+            empty = [key for key in chunk if key not in rows]
+            for empty_chunk in _chunks(empty, 100):
+                condition = Q()
+                for mentor_id, day in empty_chunk:
+                    condition |= Q(mentor_id=mentor_id, date=day)
+                deleted += MentorDailyStats.objects.filter(condition).delete()[0]
+
+    state.high_water_mark = started - HIGH_WATER_OVERLAP
+    state.last_run_at = timezone.now()
+    state.save(update_fields=['high_water_mark', 'last_run_at'])
+    return len(keys), written, deleted
+
+
+# -----------------------------
+# Reports (read the rollup only)
+# -----------------------------
+
+# Report grouping -> function truncating the rollup day to the period start
+PERIODS = {
+    'day': lambda field: F(field),
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def _with_rates(row):
+    row['sessions_total'] = (
+        row['sessions_pending'] + row['sessions_confirmed'] + row['sessions_completed'] + row['sessions_cancelled']
+    )
+    row['cancellation_rate'] = (
+        round(100 * row['sessions_cancelled'] / row['sessions_total'], 1) if row['sessions_total'] else None
+    )
+    row['feedback_avg'] = round(row['feedback_rating_sum'] / row['feedback_count'], 2) if row['feedback_count'] else None
+    return row
+
+
+def _sums():
+    return {field: Coalesce(Sum(field), Value(0), output_field=MentorDailyStats._meta.get_field(field)) for field in STAT_FIELDS}
+
+
+def report(start, end, period='week', mentor_limit=50):
+    """Totals overall, per period, per mentor and per skill for session days from `start` to `end`.
+
+    Reads MentorDailyStats only (joined to mentor names and skills), never Session.
+    """
+    stats = MentorDailyStats.objects.filter(date__gte=start, date__lte=end)
+    by_period = (
+        stats.annotate(period=PERIODS.get(period, TruncWeek)('date'))
+        .values('period').annotate(**_sums()).order_by('period')
+    )
+    by_mentor = (
+        stats.values('mentor_id', 'mentor__full_name').annotate(**_sums())
+        .order_by('-amount_paid', '-sessions_completed')[:mentor_limit]
+    )
+    # A mentor's sessions count toward each of their skills
+    by_skill = (
+        stats.filter(mentor__skills__isnull=False)
+        .values('mentor__skills__name').annotate(**_sums()).order_by('mentor__skills__name')
+    )
+    return {
+        'totals': _with_rates(stats.aggregate(**_sums())),
+        'by_period': [_with_rates(row) for row in by_period],
+        'by_mentor': [_with_rates(row) for row in by_mentor],
+        'by_skill': [_with_rates(row) for row in by_skill],
+    }
@@ -0,0 +1,90 @@
+"""
+Question Sampling Module
+Per-attempt random question samples for categories with Category.sample_size set.
+
+Samples are drawn in memory from the question ids of the category's cached answer
+key (main/answer_keys.py), never with ORDER BY RANDOM(). The served ids and the
+seed are stored on the TestAttempt, so grading touches only the served questions
+and a sample can be redrawn from its seed against the same pool.
+
+With stratify_by_marks, the sample keeps the pool's mix of marks: each marks value
+gets its proportional share of the sample (largest remainder rounding), and the
+questions within each share are drawn at random.
+"""
+
+import random
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import TestAttempt
+
+# Seeds are stored in a BigIntegerField
+_SEED_BITS = 63
+
+
+def new_seed():
+    return random.SystemRandom().getrandbits(_SEED_BITS)
+
+
+def _shares(group_sizes, size):
+    """Split `size` over groups in proportion to their sizes (largest remainder)."""
+    pool = sum(group_sizes.values())
+    exact = {group: size * count / pool for group, count in group_sizes.items()}
+    shares = {group: int(value) for group, value in exact.items()}
+    leftover = size - sum(shares.values())
+    # Ties broken by group so the split is deterministic for a given pool
+    for group in sorted(exact, key=lambda group: (shares[group] - exact[group], group))[:leftover]:
+        shares[group] += 1
+    return shares
+
+
+def sample_question_ids(answer_key, size, seed, stratify_by_marks=False):
+    """Draw `size` question ids from the key's pool, reproducibly for a given seed."""
+    pool = sorted(answer_key.key)
+    if not size or size >= len(pool):
+        return pool
+    rng = random.Random(seed)
+    if not stratify_by_marks:
+        return rng.sample(pool, size)
+
+    groups = defaultdict(list)
+    for question_id in pool:
+        groups[answer_key.key[question_id][0]].append(question_id)
+    sample = []
+    for marks, share in sorted(_shares({marks: len(ids) for marks, ids in groups.items()}, size).items()):
+        sample.extend(rng.sample(groups[marks], share))
+    # Mix the strata so questions aren't served grouped by marks
+    rng.shuffle(sample)
+    return sample
+
+
+def is_sampled(category, answer_key):
+    return bool(category.sample_size) and category.sample_size < len(answer_key.key)
+
+
+def open_attempt(user, category, answer_key):
+    """The user's unfinished sampled attempt for the category, or a new one.
+
+    Reloading the test page shows the same questions rather than drawing again.
+    """
+    with transaction.atomic():
+        attempt = (
+            TestAttempt.objects.select_for_update()
+            .filter(user=user, category=category, completed=False, sample_seed__isnull=False)
+            .order_by('-started_at').first()
+        )
+        if attempt is None:
+            seed = new_seed()
+            served = sample_question_ids(answer_key, category.sample_size, seed, category.stratify_by_marks)
+            attempt = TestAttempt.objects.create(
+                user=user, category=category, sample_seed=seed, served_question_ids=served,
+                total_marks=sum(answer_key.key[question_id][0] for question_id in served),
+            )
+    return attempt
+
+
+def served_questions(answer_key, question_ids):
+    """Rendered payload of the served questions, in serving order; deleted questions are skipped."""
+    by_id = {question['id']: question for question in answer_key.questions}
+    return [by_id[question_id] for question_id in question_ids if question_id in by_id]
@@ -0,0 +1,173 @@
+"""
+Mentor Search Module
+Maintains MentorSearchDocument rows and runs ranked full-text search over them.
+
+PostgreSQL: weighted tsvector column + GIN index (migration 0014)
+SQLite: FTS5 external-content table main_mentorsearch_fts (migration 0014)
+Anything else (or SQLite without FTS5): icontains over the single document table
+"""
+
+import re
+from django.db import connection, transaction
+from django.db.models import Q, F, FloatField, Value
+from django.db.models.expressions import RawSQL
+
+from .models import MentorProfile, MentorSearchDocument
+
+FTS_TABLE = 'main_mentorsearch_fts'
+
+# FTS5 bm25() column weights, in table column order:
+# full_name, skills, headline, available_for, bio
+FTS5_WEIGHTS = '10.0, 10.0, 5.0, 2.0, 1.0'
+
+DOCUMENT_FIELDS = ['full_name', 'headline', 'bio', 'skills', 'available_for']
+
+_fts5_available = None
+
+
+def _search_terms(query):
+    """Split a free-text query into lower-case word tokens safe to embed in a match expression."""
+    return re.findall(r'\w+', (query or '').lower())
+
+
+def _has_fts5():
+    """Whether the SQLite FTS5 table was created by the migration (cached per process)."""
+    global _fts5_available
+    if _fts5_available is None:
+        _fts5_available = FTS_TABLE in connection.introspection.table_names()
+    return _fts5_available
+
+
+def build_document(mentor):
+    """Return the document field values for a mentor (skills should be prefetched)."""
+    return {
+        'full_name': mentor.full_name or '',
+        'headline': mentor.headline or '',
+        'bio': mentor.bio or '',
+        'skills': ', '.join(skill.name for skill in mentor.skills.all()),
+        'available_for': mentor.available_for or '',
+    }
+
+
+def refresh_search_documents(mentor_ids):
+    """Create, update or delete the search documents for the given mentors.
+
+    Approved mentors get an up-to-date document; everyone else has theirs removed.
+    """
+    mentor_ids = set(mentor_ids)
+    if not mentor_ids:
+        return
+
+    with transaction.atomic():
+        mentors = (
+            MentorProfile.objects
+            .filter(id__in=mentor_ids, is_approved=True, application_status='approved')
+            .only('id', *[f for f in DOCUMENT_FIELDS if f != 'skills'])
+            .prefetch_related('skills')
+        )
+        existing = {doc.mentor_id: doc for doc in MentorSearchDocument.objects.filter(mentor_id__in=mentor_ids)}
+
+        to_create, to_update = [], []
+        for mentor in mentors:
+            values = build_document(mentor)
+            doc = existing.pop(mentor.id, None)
+            if doc is None:
+                to_create.append(MentorSearchDocument(mentor_id=mentor.id, **values))
+            elif any(getattr(doc, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(doc, field, value)
+                to_update.append(doc)
+
+        if to_create:
+            MentorSearchDocument.objects.bulk_create(to_create, batch_size=500)
+        if to_update:
+            MentorSearchDocument.objects.bulk_update(to_update, DOCUMENT_FIELDS + ['updated_at'], batch_size=500)
+        if existing:
+            # Remaining documents belong to mentors that are no longer approved (or deleted)
+            MentorSearchDocument.objects.filter(mentor_id__in=existing.keys()).delete()
+
+
+def rebuild_search_index(batch_size=500):
+    """Rebuild every search document from scratch. Returns the number of documents written."""
+    with transaction.atomic():
+        MentorSearchDocument.objects.all().delete()
+        mentors = (
+            MentorProfile.objects
+            .filter(is_approved=True, application_status='approved')
+            .order_by('id')
+            .prefetch_related('skills')
+        )
+        written = 0
+        batch = []
+        for mentor in mentors.iterator(chunk_size=batch_size):
+            batch.append(MentorSearchDocument(mentor_id=mentor.id, **build_document(mentor)))
+            if len(batch) >= batch_size:
+                written += len(MentorSearchDocument.objects.bulk_create(batch))
+                batch = []
+        if batch:
+            written += len(MentorSearchDocument.objects.bulk_create(batch))
+    return written
+
+
+def search_mentors(queryset, query):
+    """Filter a MentorProfile queryset to full-text matches of `query`, ranked by relevance.
+
+    The match runs as an indexed subquery over the document table, so there is no join
+    against skills and no DISTINCT. Adds a `search_rank` annotation (higher is better)
+    and orders by it, newest mentor first on ties.
+    """
+    terms = _search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    mentor_table = MentorProfile._meta.db_table
+    vendor = connection.vendor
+
+    if vendor == 'postgresql':
+        # Prefix match on every term, e.g. "pyth djan" -> 'pyth:* & djan:*'
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        matches = RawSQL(
+            "SELECT mentor_id FROM main_mentorsearchdocument "
+            "WHERE search_vector @@ to_tsquery('english', %s)",
+            [tsquery],
+        )
+        rank = RawSQL(
+            "SELECT ts_rank_cd(d.search_vector, to_tsquery('english', %s)) "
+            f"FROM main_mentorsearchdocument d WHERE d.mentor_id = {mentor_table}.id",
+            [tsquery],
+            output_field=FloatField(),
+        )
+    elif vendor == 'sqlite' and _has_fts5():
+        match = ' '.join(f'"{term}"*' for term in terms)
+        matches = RawSQL(
+            f"SELECT d.mentor_id FROM {FTS_TABLE} f "
+            "JOIN main_mentorsearchdocument d ON d.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s",
+            [match],
+        )
+        # bm25() is lower-is-better; negate so every backend sorts rank descending
+        rank = RawSQL(
+            f"SELECT -bm25({FTS_TABLE}, {FTS5_WEIGHTS}) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = "
+            f"(SELECT id FROM main_mentorsearchdocument WHERE mentor_id = {mentor_table}.id)",
+            [match],
+            output_field=FloatField(),
+        )
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(full_name__icontains=term) |
+                Q(headline__icontains=term) |
+                Q(bio__icontains=term) |
+                Q(skills__icontains=term) |
+                Q(available_for__icontains=term)
+            )
+        matches = MentorSearchDocument.objects.filter(condition).values('mentor_id')
+        return queryset.filter(id__in=matches).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        ).order_by('-created_at')
+
+    return queryset.filter(id__in=matches).annotate(search_rank=rank).order_by(
+        F('search_rank').desc(nulls_last=True), '-created_at'
+    )
@@ -0,0 +1,259 @@
+"""
+Signal handlers for the main app.
+Keeps denormalized data (mentor rating aggregates, mentor search documents, skill
+posting lists, cached free slots, quiz answer keys) in sync with the rows it is derived from.
+"""
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from .metrics import invalidate_counters
+from .rollups import mark_dirty
+from .models import MentorProfile, MentorFeedback, Skill, Session, SlotHold, Question, Option
+from .answer_keys import invalidate_answer_key
+from .search import refresh_search_documents
+from .slots import invalidate_mentor_slots
+from .skill_index import (
+    add_mentors_to_skills, remove_mentors_from_skills, reset_skill_postings, sync_mentor_postings,
+)
+
+
+@receiver(post_save, sender=MentorFeedback)
+def update_mentor_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    """Apply a new or edited feedback rating to the mentor's stored aggregates."""
+    if raw:
+        # Fixture loading; run `manage.py rebuild_mentor_ratings` afterwards
+        return
+
+    if created:
+        MentorProfile.apply_rating_change(instance.mentor_id, added=instance.rating)
+        return
+
+    old_rating = getattr(instance, '_loaded_rating', None)
+    old_mentor_id = getattr(instance, '_loaded_mentor_id', None)
+    if old_rating is None or old_mentor_id is None:
+        # Saved from an instance we didn't load, so the previous rating is unknown
+        MentorProfile.rebuild_rating_aggregates(mentor_ids=[instance.mentor_id])
+        return
+
+    if old_mentor_id != instance.mentor_id:
+        MentorProfile.apply_rating_change(old_mentor_id, removed=old_rating)
+        MentorProfile.apply_rating_change(instance.mentor_id, added=instance.rating)
+    elif old_rating != instance.rating:
+        MentorProfile.apply_rating_change(instance.mentor_id, added=instance.rating, removed=old_rating)
+
+
+@receiver(post_delete, sender=MentorFeedback)
+def update_mentor_rating_on_delete(sender, instance, **kwargs):
+    """Remove a deleted feedback's rating from the mentor's stored aggregates."""
+    # Use the persisted rating in case the instance was modified before deletion
+    rating = getattr(instance, '_loaded_rating', None) or instance.rating
+    mentor_id = getattr(instance, '_loaded_mentor_id', None) or instance.mentor_id
+    MentorProfile.apply_rating_change(mentor_id, removed=rating)
+
+
+# -----------------------------
+# Mentor search documents and skill posting lists
+# -----------------------------
+
+@receiver(post_save, sender=MentorProfile)
+def refresh_mentor_indexes_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        # Fixture loading; run `manage.py rebuild_search_index` / `rebuild_skill_index` afterwards
+        return
+    refresh_search_documents([instance.pk])
+
+    # Approval changes add or remove the mentor from every posting list it belongs to;
+    # skill changes are handled by the m2m_changed receiver below, so other edits
+    # (bio, rate, availability) leave the posting lists alone. A new mentor has no
+    # skills yet, and an instance we didn't load has an unknown previous state.
+    availability = (instance.is_approved, instance.application_status)
+    if not created and getattr(instance, '_loaded_availability', None) != availability:
+        sync_mentor_postings([instance.pk])
+    instance._loaded_availability = availability
+
+
+@receiver(pre_delete, sender=MentorProfile)
+def remember_mentor_skills(sender, instance, **kwargs):
+    # The through rows are cascade-deleted without m2m_changed, so note the affected skills
+    instance._deleted_skill_ids = list(instance.skills.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=MentorProfile)
+def remove_deleted_mentor_from_postings(sender, instance, **kwargs):
+    remove_mentors_from_skills([instance.pk], getattr(instance, '_deleted_skill_ids', []))
+
+
+@receiver(m2m_changed, sender=MentorProfile.skills.through)
+def refresh_mentor_indexes_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # mentor.skills.add/remove/set/clear; pk_set holds skill ids
+        if action == 'pre_clear':
+            instance._cleared_skill_ids = list(instance.skills.values_list('id', flat=True))
+        elif action == 'post_clear':
+            remove_mentors_from_skills([instance.pk], getattr(instance, '_cleared_skill_ids', []))
+        elif action == 'post_add':
+            add_mentors_to_skills([instance.pk], pk_set or [])
+        elif action == 'post_remove':
+            remove_mentors_from_skills([instance.pk], pk_set or [])
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_search_documents([instance.pk])
+        return
+
+    # skill.mentors.add/remove/clear; pk_set holds mentor ids
+    if action == 'pre_clear':
+        instance._cleared_mentor_ids = list(instance.mentors.values_list('id', flat=True))
+    elif action == 'post_clear':
+        reset_skill_postings(instance.pk)
+        refresh_search_documents(getattr(instance, '_cleared_mentor_ids', []))
+    elif action == 'post_add':
+        add_mentors_to_skills(pk_set or [], [instance.pk])
+        refresh_search_documents(pk_set or [])
+    elif action == 'post_remove':
+        remove_mentors_from_skills(pk_set or [], [instance.pk])
+        refresh_search_documents(pk_set or [])
+
+
+@receiver(post_save, sender=Skill)
+def refresh_indexes_on_skill_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        # New skills start with an empty posting list so they show up as facets
+        reset_skill_postings(instance.pk)
+        return
+    refresh_search_documents(instance.mentors.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Skill)
+def remember_skill_mentors(sender, instance, **kwargs):
+    # The through rows are cascade-deleted without m2m_changed, so note who is affected
+    instance._affected_mentor_ids = list(instance.mentors.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Skill)
+def refresh_search_documents_on_skill_delete(sender, instance, **kwargs):
+    # The skill's posting list is removed by the CASCADE
+    refresh_search_documents(getattr(instance, '_affected_mentor_ids', []))
+
+
+# -----------------------------
+# Cached free slots
+# -----------------------------
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def invalidate_slots_on_session_change(sender, instance, **kwargs):
+    mentor_id = instance.mentor_id
+    invalidate_mentor_slots(mentor_id)
+    # Again after commit, in case another request re-cached the pre-booking slots meanwhile
+    transaction.on_commit(lambda: invalidate_mentor_slots(mentor_id))
+
+
+@receiver(post_save, sender=MentorProfile)
+def invalidate_slots_on_mentor_save(sender, instance, raw=False, **kwargs):
+    # availability and session_duration both shape the slot list
+    invalidate_mentor_slots(instance.pk)
+
+
+@receiver(post_save, sender=SlotHold)
+def invalidate_slots_on_hold(sender, instance, **kwargs):
+    # No delete receiver on purpose: slot lists holding a hold are only cached until it
+    # expires, and skipping it keeps the sweeper's queryset.delete() a single query.
+    mentor_id = instance.mentor_id
+    invalidate_mentor_slots(mentor_id)
+    transaction.on_commit(lambda: invalidate_mentor_slots(mentor_id))
+
+
+# -----------------------------
+# Admin dashboard counters
+# -----------------------------
+
+def _invalidate_counters_now_and_on_commit():
+    invalidate_counters()
+    # Again after commit, so a dashboard load during the transaction can't re-cache old counts
+    transaction.on_commit(invalidate_counters)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Skill)
+def invalidate_counters_on_create(sender, instance, created, **kwargs):
+    # Ordinary saves (e.g. last_login on every sign-in) don't change any counter
+    if created:
+        _invalidate_counters_now_and_on_commit()
+
+
+@receiver(post_save, sender=MentorProfile)
+def invalidate_counters_on_mentor_save(sender, instance, **kwargs):
+    # Any save may be an application status change
+    _invalidate_counters_now_and_on_commit()
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=MentorProfile)
+@receiver(post_delete, sender=Skill)
+def invalidate_counters_on_delete(sender, instance, **kwargs):
+    _invalidate_counters_now_and_on_commit()
+
+
+# -----------------------------
+# Reporting rollups
+# -----------------------------
+
+@receiver(post_save, sender=Session)
+def flag_rollup_on_reschedule(sender, instance, created, raw=False, **kwargs):
+    # The rollup finds changed sessions by updated_at, which only leads it to the
+    # new day; the day (or mentor) the session moved away from is flagged here
+    old_key = getattr(instance, '_loaded_rollup_key', None)
+    new_key = (instance.mentor_id, instance.session_date)
+    if created or raw or old_key is None or old_key == new_key:
+        return
+    mark_dirty([old_key])
+    instance._loaded_rollup_key = new_key
+
+
+@receiver(post_delete, sender=Session)
+def flag_rollup_on_session_delete(sender, instance, **kwargs):
+    mark_dirty([(instance.mentor_id, instance.session_date)])
+
+
+@receiver(post_delete, sender=MentorFeedback)
+def flag_rollup_on_feedback_delete(sender, instance, **kwargs):
+    key = Session.objects.filter(id=instance.session_id).values_list('mentor_id', 'session_date').first()
+    if key:
+        mark_dirty([key])
+
+
+# -----------------------------
+# Quiz answer keys
+# -----------------------------
+
+def _invalidate_answer_keys(category_ids):
+    # No second pass on commit as for the slot cache: the version is bumped in the
+    # database, so requests outside the transaction keep using the old key until it commits
+    for category_id in {category_id for category_id in category_ids if category_id is not None}:
+        invalidate_answer_key(category_id)
+
+
+@receiver(post_save, sender=Question)
+def invalidate_answer_key_on_question_save(sender, instance, **kwargs):
+    old_category_id = getattr(instance, '_loaded_category_id', None)
+    _invalidate_answer_keys([instance.category_id, old_category_id])
+    instance._loaded_category_id = instance.category_id
+
+
+@receiver(post_delete, sender=Question)
+def invalidate_answer_key_on_question_delete(sender, instance, **kwargs):
+    _invalidate_answer_keys([instance.category_id])
+
+
+@receiver(post_save, sender=Option)
+@receiver(post_delete, sender=Option)
+def invalidate_answer_key_on_option_change(sender, instance, **kwargs):
+    # Includes the option formsets of the add/edit question views. Looked up rather
+    # than read from instance.question, which may be a stale copy; options
+    # cascade-deleted with their question are covered by the question's post_delete.
+    category_id = Question.objects.filter(id=instance.question_id).values_list('category_id', flat=True).first()
+    _invalidate_answer_keys([category_id])
@@ -0,0 +1,148 @@
+"""
+Skill Index Module
+Inverted skill -> approved-mentor-id index used by find_mentors for multi-skill
+AND/OR filtering and per-skill facet counts without touching the skills join table.
+
+Posting lists live in SkillPostingList (one row per skill) and are updated
+incrementally from main/signals.py.
+"""
+
+from django.db import transaction
+
+from .models import MentorProfile, Skill, SkillPostingList
+
+MentorSkill = MentorProfile.skills.through
+
+
+def _update_postings(skill_ids, add=(), remove=()):
+    """Add and/or remove mentor ids from the posting lists of the given skills."""
+    skill_ids = set(skill_ids)
+    add, remove = set(add), set(remove)
+    if not skill_ids or not (add or remove):
+        return
+
+    with transaction.atomic():
+        # Skills created before the index existed may not have a row yet
+        SkillPostingList.objects.bulk_create(
+            [SkillPostingList(skill_id=skill_id) for skill_id in skill_ids],
+            ignore_conflicts=True,
+        )
+        changed = []
+        for posting in SkillPostingList.objects.select_for_update().filter(skill_id__in=skill_ids):
+            current = set(posting.mentor_ids)
+            updated = (current | add) - remove
+            if updated != current:
+                posting.mentor_ids = sorted(updated)
+                posting.mentor_count = len(updated)
+                changed.append(posting)
+        if changed:
+            SkillPostingList.objects.bulk_update(changed, ['mentor_ids', 'mentor_count', 'updated_at'])
+
+
+def add_mentors_to_skills(mentor_ids, skill_ids):
+    """Index the approved mentors among `mentor_ids` under every skill in `skill_ids`."""
+    approved = MentorProfile.objects.filter(
+        id__in=set(mentor_ids), is_approved=True, application_status='approved'
+    ).values_list('id', flat=True)
+    _update_postings(skill_ids, add=approved)
+
+
+def remove_mentors_from_skills(mentor_ids, skill_ids):
+    _update_postings(skill_ids, remove=mentor_ids)
+
+
+def sync_mentor_postings(mentor_ids):
+    """Bring the given mentors' index entries in line with their approval status and skills."""
+    mentor_ids = set(mentor_ids)
+    if not mentor_ids:
+        return
+    approved = set(MentorProfile.objects.filter(
+        id__in=mentor_ids, is_approved=True, application_status='approved'
+    ).values_list('id', flat=True))
+
+    add, remove = {}, {}
+    for mentor_id, skill_id in MentorSkill.objects.filter(mentorprofile_id__in=mentor_ids).values_list('mentorprofile_id', 'skill_id'):
+        target = add if mentor_id in approved else remove
+        target.setdefault(skill_id, set()).add(mentor_id)
+
+    with transaction.atomic():
+        for skill_id in add.keys() | remove.keys():
+            _update_postings([skill_id], add=add.get(skill_id, ()), remove=remove.get(skill_id, ()))
+
+
+def create_skill_postings(skill_ids):
+    """Empty posting lists for bulk-created skills, which skip the post_save handler."""
+    SkillPostingList.objects.bulk_create(
+        [SkillPostingList(skill_id=skill_id) for skill_id in skill_ids],
+        ignore_conflicts=True,
+    )
+
+
+def reset_skill_postings(skill_id):
+    """Empty a skill's posting list (skill.mentors.clear())."""
+    SkillPostingList.objects.update_or_create(skill_id=skill_id, defaults={'mentor_ids': [], 'mentor_count': 0})
+
+
+def rebuild_skill_index():
+    """Rebuild every posting list from the skills join table. Returns the number of skills indexed."""
+    postings = {skill_id: set() for skill_id in Skill.objects.values_list('id', flat=True)}
+    memberships = MentorSkill.objects.filter(
+        mentorprofile__is_approved=True, mentorprofile__application_status='approved'
+    ).values_list('skill_id', 'mentorprofile_id')
+    for skill_id, mentor_id in memberships.iterator(chunk_size=2000):
+        postings[skill_id].add(mentor_id)
+
+    with transaction.atomic():
+        SkillPostingList.objects.all().delete()
+        SkillPostingList.objects.bulk_create([
+            SkillPostingList(skill_id=skill_id, mentor_ids=sorted(ids), mentor_count=len(ids))
+            for skill_id, ids in postings.items()
+        ], batch_size=500)
+    return len(postings)
+
+
+# -----------------------------
+# Query side
+# -----------------------------
+
+def load_skill_postings():
+    """Return {lower-cased skill name: (skill name, frozenset of mentor ids)} in one query."""
+    return {
+        name.lower(): (name, frozenset(mentor_ids))
+        for name, mentor_ids in SkillPostingList.objects.values_list('skill__name', 'mentor_ids')
+    }
+
+
+def match_skills(postings, skill_names, mode='all'):
+    """Return the set of mentor ids that have all (mode='all') or any (mode='any') of the skills.
+
+    Skill names match case-insensitively; an unknown skill matches no mentors.
+    """
+    sets = [postings.get(name.strip().lower(), (None, frozenset()))[1] for name in skill_names]
+    if not sets:
+        return set()
+    if mode == 'any':
+        return set().union(*sets)
+    # Intersect smallest-first so the working set shrinks as fast as possible
+    sets.sort(key=len)
+    result = set(sets[0])
+    for ids in sets[1:]:
+        if not result:
+            break
+        result &= ids
+    return result
+
+
+def skill_facets(postings, result_ids=None, selected=()):
+    """Per-skill mentor counts for the current result set, ordered by skill name.
+
+    `result_ids=None` means the unfiltered listing (all approved mentors), where the
+    count is simply the posting list length.
+    """
+    selected = {name.strip().lower() for name in selected}
+    facets = []
+    for key, (name, ids) in postings.items():
+        count = len(ids) if result_ids is None else len(ids & result_ids)
+        facets.append({'name': name, 'count': count, 'selected': key in selected})
+    facets.sort(key=lambda facet: facet['name'].lower())
+    return facets
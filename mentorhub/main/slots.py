@@ -0,0 +1,321 @@
+"""
+Slot Engine Module
+Expands MentorProfile.availability into bookable time slots and subtracts busy time.
+
+availability format (weekday -> list of entries):
+    {'mon': ['09:00', '11:00'], 'wed': ['14:00-17:00']}
+A plain 'HH:MM' entry is one slot of session_duration minutes starting then; a
+'HH:MM-HH:MM' entry is a window filled with back-to-back session_duration slots.
+
+Busy time is every pending/confirmed Session plus every live SlotHold, treated as
+the interval [start, start + duration_minutes), so a 90-minute booking blocks every
+slot it overlaps rather than only the one with the same start time.
+
+Computed slots are cached per mentor and date range. Each mentor has a version
+number in the cache that is bumped (see invalidate_mentor_slots) when a session is
+booked/changed, a hold is placed or the mentor's availability changes, which orphans
+old entries. Lists that include a hold are cached only until that hold expires.
+"""
+
+import time as _time
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Session, SlotHold
+
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+# Session statuses that occupy the mentor's calendar
+BUSY_STATUSES = ['pending', 'confirmed']
+
+DEFAULT_HORIZON_DAYS = 14
+
+
+def _cache_timeout():
+    return getattr(settings, 'SLOT_CACHE_TIMEOUT', 600)
+
+
+class Slot(namedtuple('Slot', ['date', 'time', 'duration'])):
+    """A bookable slot: local date, local start time and length in minutes."""
+    __slots__ = ()
+
+    @property
+    def start(self):
+        return datetime.combine(self.date, self.time)
+
+    @property
+    def end(self):
+        return self.start + timedelta(minutes=self.duration)
+
+    @property
+    def start_aware(self):
+        return timezone.make_aware(self.start)
+
+
+# -----------------------------
+# Availability parsing
+# -----------------------------
+
+def _parse_time(value):
+    return datetime.strptime(value.strip(), '%H:%M').time()
+
+
+def parse_availability(availability, duration):
+    """Return {weekday index: sorted list of slot start times} for an availability dict.
+
+    Unknown weekdays and malformed entries are skipped rather than raising, since the
+    field is free-form JSON edited by hand in the admin.
+    """
+    schedule = {}
+    if not isinstance(availability, dict) or not duration:
+        return schedule
+
+    for day, entries in availability.items():
+        key = str(day).strip().lower()[:3]
+        if key not in WEEKDAYS:
+            continue
+        if isinstance(entries, str):
+            entries = [entries]
+        starts = set()
+        for entry in entries or []:
+            try:
+                if '-' in str(entry):
+                    first, last = str(entry).split('-', 1)
+                    window_start = datetime.combine(datetime.min.date(), _parse_time(first))
+                    window_end = datetime.combine(datetime.min.date(), _parse_time(last))
+                    cursor = window_start
+                    while cursor + timedelta(minutes=duration) <= window_end:
+                        starts.add(cursor.time())
+                        cursor += timedelta(minutes=duration)
+                else:
+                    starts.add(_parse_time(str(entry)))
+            except ValueError:
+                continue
+        if starts:
+            schedule.setdefault(WEEKDAYS.index(key), set()).update(starts)
+    return {day: sorted(starts) for day, starts in schedule.items()}
+
+
+def expand_availability(mentor, start_date, end_date):
+    """All candidate slots from the mentor's weekly availability between two dates (inclusive)."""
+    duration = mentor.session_duration or 60
+    schedule = parse_availability(mentor.availability, duration)
+    slots = []
+    day = start_date
+    while day <= end_date:
+        for start in schedule.get(day.weekday(), []):
+            slots.append(Slot(day, start, duration))
+        day += timedelta(days=1)
+    return slots
+
+
+# -----------------------------
+# Busy intervals
+# -----------------------------
+
+def busy_intervals(mentor_ids, start_date, end_date, with_hold_expiry=False):
+    """Return {mentor_id: sorted [(start, end), ...]} of booked and held time.
+
+    One query for sessions and one for live holds, however many mentors. The range
+    is widened by a day at the front so sessions that start late the previous
+    evening and run past midnight still block early slots. With
+    `with_hold_expiry=True` also returns {mentor_id: earliest hold expiry}.
+    """
+    mentor_ids = list(mentor_ids)
+    busy = {mentor_id: [] for mentor_id in mentor_ids}
+    date_range = {
+        'mentor_id__in': mentor_ids,
+        'session_date__gte': start_date - timedelta(days=1),
+        'session_date__lte': end_date,
+    }
+    sessions = Session.objects.filter(status__in=BUSY_STATUSES, **date_range).order_by().values_list(
+        'mentor_id', 'session_date', 'session_time', 'duration_minutes'
+    )
+    holds = SlotHold.objects.filter(expires_at__gt=timezone.now(), **date_range).order_by().values_list(
+        'mentor_id', 'session_date', 'session_time', 'duration_minutes', 'expires_at'
+    )
+
+    hold_expiry = {}
+    for mentor_id, session_date, session_time, duration in sessions:
+        start = datetime.combine(session_date, session_time)
+        busy[mentor_id].append((start, start + timedelta(minutes=duration or 0)))
+    for mentor_id, session_date, session_time, duration, expires_at in holds:
+        start = datetime.combine(session_date, session_time)
+        busy[mentor_id].append((start, start + timedelta(minutes=duration or 0)))
+        if mentor_id not in hold_expiry or expires_at < hold_expiry[mentor_id]:
+            hold_expiry[mentor_id] = expires_at
+    for intervals in busy.values():
+        intervals.sort()
+    if with_hold_expiry:
+        return busy, hold_expiry
+    return busy
+
+
+def overlaps(start, end, intervals):
+    """True when [start, end) overlaps any interval in a start-sorted list."""
+    # Only intervals that start before `end` can overlap; scan back from there
+    index = bisect_left(intervals, (end,))
+    for busy_start, busy_end in reversed(intervals[:index]):
+        if busy_end > start:
+            return True
+        # Intervals are sorted by start, not end, so a long earlier booking may still
+        # reach into this slot; keep scanning but stop once we're a full day back.
+        if start - busy_start > timedelta(days=1):
+            break
+    return False
+
+
+def subtract_busy(slots, intervals):
+    return [slot for slot in slots if not overlaps(slot.start, slot.end, intervals)]
+
+
+# -----------------------------
+# Cache versioning
+# -----------------------------
+
+def _version_key(mentor_id):
+    return f'slots:version:{mentor_id}'
+
+
+def _slots_key(mentor_id, version, start_date, end_date):
+    return f'slots:{mentor_id}:{version}:{start_date.isoformat()}:{end_date.isoformat()}'
+
+
+def _get_versions(mentor_ids):
+    keys = {mentor_id: _version_key(mentor_id) for mentor_id in mentor_ids}
+    found = cache.get_many(keys.values())
+    versions = {}
+    missing = {}
+    for mentor_id, key in keys.items():
+        if key in found:
+            versions[mentor_id] = found[key]
+        else:
+            # Seed from the clock so a version evicted from the cache can never come
+            # back with a number that still has stale slot entries attached to it.
+            missing[key] = versions[mentor_id] = int(_time.time() * 1000)
+    if missing:
+        cache.set_many(missing, None)
+    return versions
+
+
+def invalidate_mentor_slots(mentor_id):
+    """Drop every cached slot list for a mentor (bookings, cancellations, availability edits)."""
+    key = _version_key(mentor_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(_time.time() * 1000), None)
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def free_slots_for_mentors(mentors, start_date=None, end_date=None):
+    """Return {mentor_id: [Slot, ...]} of open future slots for many mentors.
+
+    Cached mentors cost one cache round-trip in total; the rest share a single
+    Session query. Slots that have already started are filtered out at read time,
+    so cached lists stay correct as the day goes on.
+    """
+    mentors = list(mentors)
+    if start_date is None:
+        start_date = timezone.localdate()
+    if end_date is None:
+        end_date = start_date + timedelta(days=DEFAULT_HORIZON_DAYS - 1)
+
+    versions = _get_versions([m.id for m in mentors])
+    keys = {m.id: _slots_key(m.id, versions[m.id], start_date, end_date) for m in mentors}
+    cached = cache.get_many(keys.values())
+
+    result = {}
+    misses = []
+    for mentor in mentors:
+        if keys[mentor.id] in cached:
+            result[mentor.id] = cached[keys[mentor.id]]
+        else:
+            misses.append(mentor)
+
+    if misses:
+        busy, hold_expiry = busy_intervals([m.id for m in misses], start_date, end_date, with_hold_expiry=True)
+        fresh = {}
+        now = timezone.now()
+        for mentor in misses:
+            slots = subtract_busy(expand_availability(mentor, start_date, end_date), busy[mentor.id])
+            result[mentor.id] = slots
+            if mentor.id in hold_expiry:
+                # Re-open the held slot as soon as the hold lapses
+                timeout = min(_cache_timeout(), max(int((hold_expiry[mentor.id] - now).total_seconds()) + 1, 1))
+                cache.set(keys[mentor.id], slots, timeout)
+            else:
+                fresh[keys[mentor.id]] = slots
+        if fresh:
+            cache.set_many(fresh, _cache_timeout())
+
+    now = timezone.localtime().replace(tzinfo=None)
+    return {
+        mentor_id: [slot for slot in slots if slot.start > now]
+        for mentor_id, slots in result.items()
+    }
+
+
+def free_slots(mentor, start_date=None, end_date=None):
+    """Open future slots for a single mentor."""
+    return free_slots_for_mentors([mentor], start_date, end_date)[mentor.id]
+
+
+def next_available_slots(mentors, days=DEFAULT_HORIZON_DAYS):
+    """Return {mentor_id: first open Slot or None} for a "next available" badge."""
+    start_date = timezone.localdate()
+    slots = free_slots_for_mentors(mentors, start_date, start_date + timedelta(days=days - 1))
+    return {mentor_id: (mentor_slots[0] if mentor_slots else None) for mentor_id, mentor_slots in slots.items()}
+
+
+def is_time_free(mentor, session_date, session_time, duration_minutes, exclude_session_id=None, exclude_hold_id=None):
+    """Overlap-aware check that no pending/confirmed session or live hold collides with the requested time."""
+    start = datetime.combine(session_date, session_time)
+    end = start + timedelta(minutes=duration_minutes)
+    date_range = {
+        'mentor': mentor,
+        'session_date__gte': session_date - timedelta(days=1),
+        'session_date__lte': end.date(),
+    }
+    sessions = Session.objects.filter(status__in=BUSY_STATUSES, **date_range)
+    holds = SlotHold.objects.filter(expires_at__gt=timezone.now(), **date_range)
+    if exclude_session_id:
+        sessions = sessions.exclude(id=exclude_session_id)
+    if exclude_hold_id:
+        holds = holds.exclude(id=exclude_hold_id)
+    rows = list(sessions.values_list('session_date', 'session_time', 'duration_minutes'))
+    rows += list(holds.values_list('session_date', 'session_time', 'duration_minutes'))
+    intervals = sorted(
+        (datetime.combine(d, t), datetime.combine(d, t) + timedelta(minutes=m or 0))
+        for d, t, m in rows
+    )
+    return not overlaps(start, end, intervals)
+
+
+def fits_availability(mentor, session_date, session_time, duration_minutes):
+    """Whether a booking starts at one of the mentor's advertised slots and ends inside their availability.
+
+    A booking longer than one slot must be covered by the back-to-back slots after
+    it, so it can't run past the end of the mentor's window. Mentors without any
+    availability configured accept any time, matching the behaviour before
+    availability was enforced.
+    """
+    slot_minutes = mentor.session_duration or 60
+    schedule = parse_availability(mentor.availability, slot_minutes)
+    if not schedule:
+        return True
+    cursor = datetime.combine(session_date, session_time)
+    end = cursor + timedelta(minutes=duration_minutes or slot_minutes)
+    while cursor < end:
+        if cursor.time() not in schedule.get(cursor.weekday(), []):
+            return False
+        cursor += timedelta(minutes=slot_minutes)
+    return True
@@ -0,0 +1,136 @@
+"""
+Background Tasks
+Handlers for jobs queued with main.jobs.enqueue(). Each receives the job payload as
+keyword arguments and raises to have the job retried.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db.models import Q
+from django.utils import timezone
+
+from .google_meet_helper import BATCH_LIMIT, create_meet_links, update_calendar_event, cancel_calendar_event
+from .jobs import task, enqueue
+from .models import Job, Session
+
+
+@task('send_email')
+def send_email(subject, message, recipient_list, from_email=None):
+    send_mail(
+        subject,
+        message,
+        from_email or settings.DEFAULT_FROM_EMAIL,
+        recipient_list,
+        fail_silently=False,
+    )
+
+
+@task('dispatch_email_outbox')
+def dispatch_email_outbox():
+    """Drain the email outbox; schedules itself again for messages waiting on a retry."""
+    from .emails import dispatch_outbox, next_retry_at
+
+    dispatch_outbox()
+    retry_at = next_retry_at()
+    if retry_at is not None and not Job.objects.filter(task='dispatch_email_outbox', status='queued').exists():
+        enqueue('dispatch_email_outbox', delay=max(retry_at - timezone.now(), timedelta(seconds=1)))
+
+
+@task('send_session_emails')
+def send_session_emails(session_id, kind):
+    """Render emails for a session at send time, e.g. once its meeting link exists."""
+    from .emails import SESSION_EMAILS, queue_emails, session_scope
+
+    session = Session.objects.select_related('mentor', 'mentor__user', 'mentee').filter(id=session_id).first()
+    if session is None:
+        return
+    # Scoped to the session's saved state, so a retried job doesn't email twice
+    queue_emails(SESSION_EMAILS[kind](session), scope=session_scope(session))
+
+
+def _missing_link(queryset):
+    return queryset.filter(status='confirmed').filter(
+        Q(meeting_link__isnull=True) | Q(meeting_link='')
+    ).filter(Q(admin_provided_link__isnull=True) | Q(admin_provided_link=''))
+
+
+def _queued_link_session_ids():
+    """Sessions whose generate_meeting_link job is waiting or running."""
+    return {
+        session_id for session_id in Job.objects.filter(
+            task='generate_meeting_link', status__in=('queued', 'running'),
+        ).values_list('payload__session_id', flat=True)
+        if session_id is not None
+    }
+
+
+def generate_pending_meeting_links(session_ids, limit=BATCH_LIMIT):
+    """Create Meet links for those of `session_ids` still without one, in one Calendar batch.
+
+    Confirmations made in quick succession queue one job each; whichever runs first
+    picks up all of the queued sessions, and the rest find their link already there.
+    Only sessions from today on are sent, so a stale job never creates an event (and
+    invitations) for a session that is already over.
+    """
+    sessions = list(
+        _missing_link(Session.objects.select_related('mentor', 'mentor__user', 'mentee'))
+        .filter(id__in=session_ids, session_date__gte=timezone.localdate())
+        .order_by('updated_at')[:limit]
+    )
+    if not sessions:
+        return 0
+    links = create_meet_links(sessions)
+    for session in sessions:
+        # Conditional update, so a link set meanwhile (e.g. by an admin) isn't overwritten
+        _missing_link(Session.objects.filter(id=session.id)).update(
+            meeting_link=links[session.id],
+            calendar_event_id=session.calendar_event_id,
+            calendar_provider=session.calendar_provider,
+            calendar_synced_at=session.calendar_synced_at,
+            updated_at=timezone.now(),
+        )
+    return len(sessions)
+
+
+@task('generate_meeting_link')
+def generate_meeting_link(session_id, notify=None):
+    """Create the Google Meet link for a confirmed session, then queue the `notify` emails."""
+    if _missing_link(Session.objects.filter(id=session_id)).exists():
+        generate_pending_meeting_links(_queued_link_session_ids() | {session_id})
+    if notify:
+        send_session_emails(session_id, notify)
+
+
+@task('update_calendar_event')
+def update_session_calendar_event(session_id):
+    """Move a rescheduled session's calendar event to its new time."""
+    session = Session.objects.filter(id=session_id).exclude(calendar_event_id='').first()
+    if session is not None and update_calendar_event(session):
+        Session.objects.filter(id=session_id).update(calendar_synced_at=session.calendar_synced_at)
+
+
+@task('cancel_calendar_event')
+def cancel_session_calendar_event(session_id):
+    """Delete a cancelled session's calendar event; raises (and retries) while Calendar is down."""
+    session = Session.objects.filter(id=session_id, status='cancelled').exclude(calendar_event_id='').first()
+    if session is not None and cancel_calendar_event(session):
+        # The Meet link died with the event, so re-confirming creates a new one
+        Session.objects.filter(id=session_id).update(
+            calendar_event_id='',
+            calendar_event_generation=session.calendar_event_generation,
+            meeting_link='',
+            calendar_synced_at=session.calendar_synced_at,
+        )
+
+
+def queue_meeting_link(session_id, notify=None):
+    """Queue Meet link creation (then the `notify` emails) for a just-confirmed session.
+
+    The job waits MEET_LINK_BATCH_SECONDS so confirmations made in a burst are sent
+    to Calendar as one batch.
+    """
+    window = getattr(settings, 'MEET_LINK_BATCH_SECONDS', 2)
+    delay = timedelta(seconds=window) if window and not getattr(settings, 'JOBS_RUN_INLINE', False) else None
+    enqueue('generate_meeting_link', delay=delay, session_id=session_id, notify=notify)
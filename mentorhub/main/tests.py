@@ -1,3 +1,1359 @@
-from django.test import TestCase
+import csv
+import importlib
+import io
+import json
+import threading
+import time as _time
+from contextlib import redirect_stdout
+from unittest import mock
+from datetime import date, time, timedelta
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.http import QueryDict
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import emails, question_bank
+from .answer_keys import get_answer_key
+from .booking import BookingError, HoldExpired, SlotUnavailable, confirm_hold, create_hold
+from .google_meet_helper import (
+    LocalCalendarBackend, calendar_breaker, create_meet_links, get_calendar_backend, reset_calendar_backend, stable_event_id,
+)
+from .grading import grade, record_attempt, selections_from_post
+from .metrics import daily_trends, dashboard_counters, rollup_daily_stats
+from .mentor_import import run_import
+from .models import (
+    AttemptAnswer, Category, CategoryBestScore, CategoryScoreBucket, ContactMessage, Job, MentorDailyStats,
+    MentorFeedback, MentorProfile, MentorSearchDocument, Option,
+    OutboxEmail, Question, QuestionStats, Session, Skill, SkillPostingList, SlotHold, TestAttempt,
+)
+from .pagination import LAST_PAGE, CursorPaginator
+from .question_stats import SUM_FIELDS, run_question_stats
+from .querybudget import QueryBudgetExceeded, assert_query_budget
+from .rollups import report, run_rollup
+from .sampling import _shares, sample_question_ids
+from .search import refresh_search_documents, search_mentors
+from .skill_index import load_skill_postings, match_skills, rebuild_skill_index
+from .tasks import generate_meeting_link
+
+
+def make_mentor(name, user=None, skills=(), approved=True):
+    mentor = MentorProfile.objects.create(
+        user=user, full_name=name, headline='Senior Django Developer', bio=f'{name} writes Python',
+        years_of_experience=5, hourly_rate=50, available_for='Code Review',
+        is_approved=approved, application_status='approved' if approved else 'pending',
+    )
+    if skills:
+        mentor.skills.set(skills)
+    return mentor
+
+
+def make_category(name, questions=5, options=4, marks=1, **fields):
+    """A category whose questions each have `options` options, the first one correct."""
+    category = Category.objects.create(name=name, **fields)
+    for number in range(questions):
+        question = Question.objects.create(category=category, text=f'{name} question {number}', marks=marks)
+        Option.objects.bulk_create([
+            Option(question=question, text=f'Option {index}', is_correct=index == 0) for index in range(options)
+        ])
+    return category
+
+
+def answer_post(category, correct=True, attempt=None):
+    """POST data for take_test answering every question (or the served ones) right or wrong."""
+    data = {'attempt_id': str(attempt.id)} if attempt is not None else {}
+    questions = Question.objects.filter(category=category).prefetch_related('options')
+    if attempt is not None:
+        questions = questions.filter(id__in=attempt.served_question_ids)
+    for question in questions:
+        options = sorted(question.options.all(), key=lambda option: option.id)
+        data[f'q_{question.id}'] = str(options[0 if correct else 1].id)
+    return data
+
+
+# -----------------------------
+# Query budgets (main/query_budgets.py)
+# -----------------------------
+
+@override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(TestCase):
+    """Each budgeted view stays within its budget, with enough rows that an N+1 would show."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentee = User.objects.create_user('mentee', 'mentee@example.com', 'pass')
+        cls.mentor_user = User.objects.create_user('mentor', 'mentor@example.com', 'pass')
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pass', is_staff=True, is_superuser=True)
+        skills = [Skill.objects.create(name=name) for name in ('Python', 'Django', 'Rust')]
+        cls.mentor = make_mentor('Alice', user=cls.mentor_user, skills=skills[:2])
+        for number in range(12):
+            make_mentor(f'Mentor {number}', skills=skills[number % 3:])
+
+        today = timezone.localdate()
+        for number in range(30):
+            status = ('confirmed', 'pending', 'completed', 'cancelled')[number % 4]
+            offset = timedelta(days=number + 1)
+            Session.objects.create(
+                mentor=cls.mentor, mentee=cls.mentee, status=status,
+                session_date=today + offset if status in ('confirmed', 'pending') else today - offset,
+                session_time=time(9 + number % 8),
+            )
+        cls.category = make_category('Python Basics', questions=20)
+
+    def setUp(self):
+        # Cold caches are the expensive case
+        cache.clear()
+
+    def get(self, url_name, url, user):
+        self.client.force_login(user)
+        with assert_query_budget(url_name):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_public_pages(self):
+        self.get('find_mentors', reverse('find_mentors'), self.mentee)
+        self.get('find_mentors', reverse('find_mentors') + '?skill=python&skill=django', self.mentee)
+        self.get('quiz_categories', reverse('quiz_categories'), self.mentee)
+
+    def test_dashboards(self):
+        self.get('mentee_dashboard', reverse('mentee_dashboard'), self.mentee)
+        self.get('mentor_dashboard', reverse('mentor_dashboard'), self.mentor_user)
+
+    def test_admin_dashboard(self):
+        self.get('admin_dashboard', reverse('admin_dashboard'), self.staff)
+        # Served from the cached counters the second time
+        self.get('admin_dashboard', reverse('admin_dashboard'), self.staff)
+
+    def test_take_test_and_result(self):
+        url = reverse('take_test', args=[self.category.id])
+        self.get('take_test', url, self.mentee)
+        data = answer_post(self.category)
+        with assert_query_budget('take_test'):
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+        attempt = TestAttempt.objects.get(user=self.mentee, category=self.category)
+        self.assertEqual((attempt.score, attempt.total_marks), (20, 20))
+        response = self.get('test_result', reverse('test_result', args=[attempt.id]), self.mentee)
+        self.assertEqual(len(response.context['answers']), 20)
+
+    def test_take_test_submit_with_cold_answer_key(self):
+        # The key was invalidated (or evicted) between serving and submitting the test
+        self.client.force_login(self.mentee)
+        data = answer_post(self.category, correct=False)
+        with assert_query_budget('take_test'):
+            response = self.client.post(reverse('take_test', args=[self.category.id]), data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(TestAttempt.objects.get(user=self.mentee).score, 0)
+
+    def test_budget_violation_fails(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with assert_query_budget(budget=1):
+                list(User.objects.all())
+                list(Session.objects.all())
+
+    def test_n_plus_one_fails(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with assert_query_budget(budget=None):
+                for session in Session.objects.all()[:5]:
+                    session.mentor.full_name
+
+
+# -----------------------------
+# Mentor rating aggregates (MentorProfile.rating_*)
+# -----------------------------
+
+class RatingAggregateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = make_mentor('Alice')
+        cls.bob = make_mentor('Bob')
+        cls.mentee = User.objects.create_user('mentee', 'mentee@example.com', 'pass')
+
+    def feedback(self, mentor, rating, day):
+        session = Session.objects.create(
+            mentor=mentor, mentee=self.mentee, status='completed', session_date=date(2030, 1, day), session_time=time(9),
+        )
+        return MentorFeedback.objects.create(mentor=mentor, mentee=self.mentee, session=session, rating=rating)
+
+    def aggregates(self, mentor):
+        mentor = MentorProfile.objects.get(pk=mentor.pk)
+        return mentor.rating_count, mentor.rating_sum, mentor.average_rating, mentor.rating_distribution
+
+    def test_aggregates_follow_feedback_changes(self):
+        self.feedback(self.alice, 5, 1)
+        second = self.feedback(self.alice, 3, 2)
+        self.assertEqual(self.aggregates(self.alice), (2, 8, 4.0, [(5, 1), (4, 0), (3, 1), (2, 0), (1, 0)]))
+
+        edited = MentorFeedback.objects.get(pk=second.pk)
+        edited.rating = 1
+        edited.save()
+        self.assertEqual(self.aggregates(self.alice)[:3], (2, 6, 3.0))
+
+        # Moved to another mentor, then deleted
+        edited.mentor = self.bob
+        edited.save()
+        self.assertEqual(self.aggregates(self.alice)[:3], (1, 5, 5.0))
+        self.assertEqual(self.aggregates(self.bob)[:3], (1, 1, 1.0))
+        MentorFeedback.objects.get(pk=second.pk).delete()
+        self.assertEqual(self.aggregates(self.bob)[:3], (0, 0, 0))
+
+        incremental = [self.aggregates(self.alice), self.aggregates(self.bob)]
+        MentorProfile.rebuild_rating_aggregates()
+        self.assertEqual([self.aggregates(self.alice), self.aggregates(self.bob)], incremental)
+
+
+# -----------------------------
+# Mentor search (main/search.py)
+# -----------------------------
+
+class MentorSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.kubernetes = Skill.objects.create(name='Kubernetes')
+        cls.alice = make_mentor('Alice')
+        cls.bob = make_mentor('Bob')
+        cls.carol = make_mentor('Carol', approved=False, skills=[cls.kubernetes])
+
+    def search(self, query):
+        approved = MentorProfile.objects.filter(is_approved=True, application_status='approved')
+        return list(search_mentors(approved, query).values_list('full_name', flat=True))
+
+    def test_refresh_keeps_one_document_per_approved_mentor(self):
+        MentorSearchDocument.objects.all().delete()
+        refresh_search_documents([self.alice.id, self.bob.id, self.carol.id])
+        self.assertEqual(
+            sorted(MentorSearchDocument.objects.values_list('full_name', flat=True)), ['Alice', 'Bob'],
+        )
+        MentorProfile.objects.filter(id=self.bob.id).update(headline='Rust consultant', is_approved=False)
+        MentorProfile.objects.filter(id=self.alice.id).update(headline='Rust consultant')
+        refresh_search_documents([self.alice.id, self.bob.id])
+        document = MentorSearchDocument.objects.get()
+        self.assertEqual((document.mentor_id, document.headline), (self.alice.id, 'Rust consultant'))
+
+    def test_search_follows_skill_add_remove_and_clear(self):
+        self.assertEqual(self.search('kubernetes'), [])
+        self.alice.skills.add(self.kubernetes)
+        self.assertEqual(self.search('kubernetes'), ['Alice'])
+        self.kubernetes.mentors.add(self.bob)
+        self.assertEqual(sorted(self.search('kube')), ['Alice', 'Bob'])
+        self.alice.skills.remove(self.kubernetes)
+        self.assertEqual(self.search('kubernetes'), ['Bob'])
+        self.kubernetes.mentors.clear()
+        self.assertEqual(self.search('kubernetes'), [])
+
+    def test_every_term_must_match_and_name_matches_rank_first(self):
+        self.alice.skills.add(self.kubernetes)
+        self.bob.bio = 'Ran Kubernetes clusters for Alice'
+        self.bob.save()
+        self.assertEqual(self.search('kubernetes'), ['Alice', 'Bob'])
+        self.assertEqual(self.search('kubernetes clusters'), ['Bob'])
+        self.assertEqual(self.search('  '), [])
+
+    def test_find_mentors_search(self):
+        self.alice.skills.add(self.kubernetes)
+        response = self.client.get(reverse('find_mentors'), {'search': 'kubernetes'})
+        self.assertEqual([mentor.full_name for mentor in response.context['mentors']], ['Alice'])
+
+
+# -----------------------------
+# Skill posting lists (main/skill_index.py)
+# -----------------------------
+
+class SkillIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.python, cls.django, cls.go = (Skill.objects.create(name=name) for name in ('Python', 'Django', 'Go'))
+        cls.alice = make_mentor('Alice', skills=[cls.python, cls.django])
+        cls.bob = make_mentor('Bob', skills=[cls.python, cls.go])
+        cls.carol = make_mentor('Carol', skills=[cls.python], approved=False)
+
+    def postings(self):
+        return dict(SkillPostingList.objects.values_list('skill__name', 'mentor_ids'))
+
+    def test_postings_follow_skill_changes_and_approval(self):
+        self.assertEqual(self.postings(), {'Python': [self.alice.id, self.bob.id], 'Django': [self.alice.id], 'Go': [self.bob.id]})
+        self.bob.skills.remove(self.python)
+        self.django.mentors.add(self.bob)
+        self.assertEqual(self.postings()['Python'], [self.alice.id])
+        self.assertEqual(self.postings()['Django'], [self.alice.id, self.bob.id])
+        self.carol.is_approved, self.carol.application_status = True, 'approved'
+        self.carol.save()
+        self.assertEqual(self.postings()['Python'], [self.alice.id, self.carol.id])
+        self.alice.skills.clear()
+        self.assertEqual(self.postings()['Python'], [self.carol.id])
+        self.alice.delete()
+        self.assertEqual(self.postings()['Django'], [self.bob.id])
+        # The incremental updates agree with a rebuild from the join table
+        incremental = self.postings()
+        rebuild_skill_index()
+        self.assertEqual(self.postings(), incremental)
+
+    def test_match_all_or_any(self):
+        postings = load_skill_postings()
+        self.assertEqual(match_skills(postings, ['python', 'DJANGO']), {self.alice.id})
+        self.assertEqual(match_skills(postings, ['django', 'go'], mode='any'), {self.alice.id, self.bob.id})
+        self.assertEqual(match_skills(postings, ['python', 'cobol']), set())
+
+    def test_find_mentors_skill_filter_and_facets(self):
+        url = reverse('find_mentors')
+        response = self.client.get(url, {'skill': ['Python', 'Go']})
+        self.assertEqual([mentor.full_name for mentor in response.context['mentors']], ['Bob'])
+        facets = {facet['name']: facet['count'] for facet in response.context['skill_facets']}
+        self.assertEqual(facets, {'Django': 0, 'Go': 1, 'Python': 1})
+        response = self.client.get(url, {'skill': ['Django', 'Go'], 'match': 'any'})
+        self.assertEqual(sorted(mentor.full_name for mentor in response.context['mentors']), ['Alice', 'Bob'])
+
+
+# -----------------------------
+# Keyset pagination (main/pagination.py)
+# -----------------------------
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        mentee = User.objects.create_user('mentee', 'mentee@example.com', 'pass')
+        mentor = make_mentor('Alice')
+        start = date(2030, 1, 1)
+        # Several sessions share a date so the ordering needs its pk tiebreaker
+        for number in range(23):
+            Session.objects.create(
+                mentor=mentor, mentee=mentee, status='completed',
+                session_date=start + timedelta(days=number // 3), session_time=time(9 + number % 3),
+            )
+        cls.ordering = ('-session_date', '-session_time')
+        cls.expected = list(Session.objects.order_by(*cls.ordering, '-id').values_list('id', flat=True))
+
+    def paginator(self):
+        return CursorPaginator(Session.objects.all(), 5, self.ordering, count='exact')
+
+    def test_walks_every_row_once_in_order(self):
+        page = self.paginator().get_page()
+        seen = [session.id for session in page]
+        while page.has_next():
+            page = self.paginator().get_page(page.next_page_number())
+            seen += [session.id for session in page]
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(page.number, 5)
+        self.assertEqual(page.paginator.num_pages, 5)
+
+    def test_previous_token_returns_the_page_before(self):
+        first = self.paginator().get_page()
+        second = self.paginator().get_page(first.next_page_number())
+        back = self.paginator().get_page(second.previous_page_number())
+        self.assertEqual([s.id for s in back], [s.id for s in first])
+        self.assertEqual(back.number, 1)
+        self.assertFalse(back.has_previous())
+
+    def test_last_page(self):
+        page = self.paginator().get_page(LAST_PAGE)
+        self.assertEqual([s.id for s in page], self.expected[-5:])
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+
+    def test_bad_tokens_fall_back_to_the_first_page(self):
+        token = self.paginator().get_page().next_page_number()
+        for bad in ('3', token[:-2] + 'xx', 'garbage'):
+            page = self.paginator().get_page(bad)
+            self.assertEqual([s.id for s in page], self.expected[:5])
+
+    def test_rows_added_meanwhile_do_not_shift_later_pages(self):
+        first = self.paginator().get_page()
+        Session.objects.create(
+            mentor=MentorProfile.objects.get(), mentee=User.objects.get(), status='completed',
+            session_date=date(2040, 1, 1), session_time=time(9),
+        )
+        second = self.paginator().get_page(first.next_page_number())
+        self.assertEqual([s.id for s in second], self.expected[5:10])
+
+
+    def test_sub_millisecond_datetimes_lose_no_rows(self):
+        MentorProfile.objects.bulk_create([
+            MentorProfile(full_name=f'Mentor {number}', headline='Developer', bio='Python', years_of_experience=1, hourly_rate=10)
+            for number in range(40)
+        ])
+        # All within one millisecond, which a millisecond cursor can't tell apart
+        base = timezone.now().replace(microsecond=0)
+        mentors = list(MentorProfile.objects.order_by('id'))
+        for number, mentor in enumerate(mentors):
+            mentor.created_at = base + timedelta(microseconds=(number * 7) % 40)
+        MentorProfile.objects.bulk_update(mentors, ['created_at'])
+        expected = list(MentorProfile.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        paginator = CursorPaginator(MentorProfile.objects.all(), 7, ('-created_at',))
+        page = paginator.get_page()
+        seen = [mentor.id for mentor in page]
+        while page.has_next():
+            page = paginator.get_page(page.next_page_number())
+            seen += [mentor.id for mentor in page]
+        self.assertEqual(seen, expected)
+
+# -----------------------------
+# Booking (main/booking.py)
+# -----------------------------
+
+class BookingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentor = make_mentor('Alice')
+        cls.first = User.objects.create_user('first', 'first@example.com', 'pass')
+        cls.second = User.objects.create_user('second', 'second@example.com', 'pass')
+        cls.day = date(2030, 3, 4)
+
+    def setUp(self):
+        cache.clear()
+
+    def book(self, mentee, start, minutes=60):
+        return confirm_hold(create_hold(self.mentor, mentee, self.day, start, minutes))
+
+    def test_overlapping_booking_is_rejected(self):
+        self.book(self.first, time(9), minutes=90)
+        # Starts inside the 90-minute session, not at the same time
+        with self.assertRaises(SlotUnavailable):
+            self.book(self.second, time(10))
+        with self.assertRaises(SlotUnavailable):
+            self.book(self.second, time(8, 30))
+        # Back to back is fine
+        self.book(self.second, time(10, 30))
+        self.assertEqual(Session.objects.filter(mentor=self.mentor).count(), 2)
+
+    def test_cancelled_session_frees_its_time(self):
+        session = self.book(self.first, time(9))
+        session.status = 'cancelled'
+        session.save()
+        rebooked = self.book(self.second, time(9))
+        self.assertEqual(rebooked.status, 'pending')
+
+    def test_hold_blocks_the_time_until_confirmed(self):
+        hold = create_hold(self.mentor, self.first, self.day, time(9), 60)
+        with self.assertRaises(SlotUnavailable):
+            create_hold(self.mentor, self.second, self.day, time(9, 30), 60)
+        session = confirm_hold(hold)
+        self.assertEqual((session.mentee, session.payment_status), (self.first, 'completed'))
+        self.assertFalse(SlotHold.objects.exists())
+        with self.assertRaises(SlotUnavailable):
+            self.book(self.second, time(9))
+
+    def test_lapsed_hold_cannot_be_confirmed_once_the_time_is_taken(self):
+        hold = create_hold(self.mentor, self.first, self.day, time(9), 60)
+        SlotHold.objects.filter(pk=hold.pk).update(expires_at=timezone.now() - timedelta(minutes=1))
+        self.book(self.second, time(9))
+        with self.assertRaises(HoldExpired):
+            confirm_hold(SlotHold.objects.get(pk=hold.pk))
+
+    def test_sweep_removes_lapsed_holds_and_leaves_unpaid_sessions_alone(self):
+        hold = create_hold(self.mentor, self.first, self.day, time(9), 60)
+        SlotHold.objects.filter(pk=hold.pk).update(expires_at=timezone.now() - timedelta(minutes=1))
+        # As created in the Django admin: pending, unpaid and never held
+        session = Session.objects.create(mentor=self.mentor, mentee=self.second, session_date=self.day, session_time=time(11))
+        Session.objects.filter(pk=session.pk).update(created_at=timezone.now() - timedelta(days=2))
+        call_command('expire_slot_holds', stdout=io.StringIO())
+        self.assertFalse(SlotHold.objects.exists())
+        session.refresh_from_db()
+        self.assertEqual((session.status, session.payment_status), ('pending', 'pending'))
+
+    def test_database_rejects_a_second_active_session_at_the_same_start(self):
+        self.book(self.first, time(9))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            # Bypasses the booking lock and overlap check
+            Session.objects.create(mentor=self.mentor, mentee=self.second, session_date=self.day, session_time=time(9))
+
+    def test_outside_availability_is_rejected(self):
+        self.mentor.availability = {'mon': ['09:00']}
+        self.mentor.save()
+        self.assertEqual(self.day.weekday(), 0)
+        with self.assertRaises(SlotUnavailable):
+            self.book(self.first, time(10))
+        self.book(self.first, time(9))
+
+
+
+    def test_booking_may_not_run_past_the_availability_window(self):
+        self.mentor.availability = {'mon': ['09:00-12:00'], 'tue': ['15:00']}
+        self.mentor.session_duration = 60
+        self.mentor.save()
+        # 11:00-12:30 starts on a slot but ends after the window closes
+        with self.assertRaises(SlotUnavailable):
+            self.book(self.first, time(11), minutes=90)
+        with self.assertRaises(SlotUnavailable):
+            create_hold(self.mentor, self.first, self.day + timedelta(days=1), time(15), 90)
+        self.book(self.first, time(10), minutes=90)
+        self.book(self.second, time(9), minutes=60)
+
+class ConcurrentBookingTests(TransactionTestCase):
+    def test_parallel_holds_on_one_slot_book_it_once(self):
+        mentor = make_mentor('Alice')
+        mentees = [User.objects.create_user(f'mentee{number}', f'mentee{number}@example.com', 'pass') for number in range(8)]
+        day = date(2030, 3, 4)
+        barrier = threading.Barrier(len(mentees))
+        results = []
+        lock = threading.Lock()
+
+        def attempt(index):
+            try:
+                barrier.wait()
+                # Half of them overlap the slot rather than collide with it exactly
+                outcome = create_hold(mentor, mentees[index], day, time(9, 30 * (index % 2)), 60)
+            except Exception as e:
+                outcome = e
+            finally:
+                connection.close()
+            with lock:
+                results.append(outcome)
+
+        threads = [threading.Thread(target=attempt, args=(index,)) for index in range(len(mentees))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        holds = [result for result in results if isinstance(result, SlotHold)]
+        self.assertEqual(len(holds), 1, results)
+        self.assertTrue(all(isinstance(result, (SlotHold, BookingError)) for result in results), results)
+        self.assertEqual(SlotHold.objects.count(), 1)
+        confirm_hold(holds[0])
+        self.assertEqual(Session.objects.filter(mentor=mentor).count(), 1)
+
+# -----------------------------
+# Reporting rollups (main/metrics.py, main/rollups.py)
+# -----------------------------
+
+class DailyTrendTests(TestCase):
+    def test_dashboard_trends_match_the_report_for_the_same_days(self):
+        mentee = User.objects.create_user('mentee', 'mentee@example.com', 'pass')
+        mentor = make_mentor('Alice')
+        today = timezone.localdate()
+        # Booked today for days spread over the last two weeks and the next one
+        for number, status in enumerate(['completed', 'cancelled', 'confirmed', 'pending'] * 5):
+            Session.objects.create(
+                mentor=mentor, mentee=mentee, status=status, amount_paid=10 + number,
+                session_date=today - timedelta(days=13 - number), session_time=time(9),
+            )
+        run_rollup()
+        rollup_daily_stats(today - timedelta(days=13), today)
+
+        trends = daily_trends(days=7)
+        week = report(today - timedelta(days=6), today)['totals']
+        self.assertEqual(trends['current']['sessions'], week['sessions_total'])
+        self.assertEqual(trends['current']['sessions_cancelled'], week['sessions_cancelled'])
+        self.assertEqual(trends['current']['revenue'], week['amount_paid'])
+        self.assertEqual(sum(day['sessions'] for day in trends['days']), week['sessions_total'])
+        earlier = report(today - timedelta(days=13), today - timedelta(days=7))['totals']
+        self.assertEqual(trends['previous']['sessions'], earlier['sessions_total'])
+        self.assertEqual(trends['current']['new_users'], 1)
+
+
+class DashboardCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_counters_are_cached_until_a_counted_row_changes(self):
+        make_mentor('Alice')
+        counters = dashboard_counters()
+        self.assertEqual((counters['total_users'], counters['total_mentors'], counters['approved_mentors']), (0, 1, 1))
+        # Writes that skip the signals are only seen once the cached copy goes
+        Skill.objects.bulk_create([Skill(name='Python')])
+        with self.assertNumQueries(0):
+            self.assertEqual(dashboard_counters()['total_skills'], 0)
+        User.objects.create_user('mentee', 'mentee@example.com', 'pass')
+        self.assertEqual((dashboard_counters()['total_users'], dashboard_counters()['total_skills']), (1, 1))
+        mentor = MentorProfile.objects.get()
+        mentor.application_status = 'rejected'
+        mentor.save()
+        self.assertEqual((dashboard_counters()['approved_mentors'], dashboard_counters()['rejected_mentors']), (0, 1))
+
+
+class MentorRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentee = User.objects.create_user('mentee', 'mentee@example.com', 'pass')
+        cls.mentor = make_mentor('Alice')
+        cls.day, cls.other_day, cls.new_day = date(2030, 1, 7), date(2030, 1, 8), date(2030, 1, 9)
+
+    def session(self, day, status, amount, hour=9):
+        return Session.objects.create(
+            mentor=self.mentor, mentee=self.mentee, status=status, amount_paid=amount,
+            session_date=day, session_time=time(hour),
+        )
+
+    def stats(self, day):
+        row = MentorDailyStats.objects.filter(mentor=self.mentor, date=day).first()
+        return row and (row.sessions_confirmed, row.sessions_completed, row.amount_paid)
+
+    def test_second_run_honours_the_high_water_mark_and_reschedules_recompute_the_old_day(self):
+        first = self.session(self.day, 'completed', 10)
+        moved = self.session(self.day, 'confirmed', 20, hour=11)
+        self.session(self.other_day, 'confirmed', 5)
+        # Changed well before the run, so the mark's overlap window doesn't cover them
+        Session.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(run_rollup(), (2, 2, 0))
+        self.assertEqual(self.stats(self.day), (1, 1, 20 + 10))
+        self.assertEqual(run_rollup(), (0, 0, 0))
+
+        moved = Session.objects.get(pk=moved.pk)
+        moved.session_date = self.new_day
+        moved.save()
+        self.assertEqual(run_rollup()[:2], (2, 2))
+        self.assertEqual(self.stats(self.day), (0, 1, 10))
+        self.assertEqual(self.stats(self.new_day), (1, 0, 20))
+        self.assertEqual(self.stats(self.other_day), (1, 0, 5))
+
+        # A day whose last session moved away loses its row
+        first = Session.objects.get(pk=first.pk)
+        first.session_date = self.new_day
+        first.save()
+        self.assertEqual(run_rollup()[2], 1)
+        self.assertIsNone(self.stats(self.day))
+        self.assertEqual(self.stats(self.new_day), (1, 1, 30))
+
+
+# -----------------------------
+# Staff exports (main/exports.py)
+# -----------------------------
+
+class StaffExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pass', is_staff=True)
+        mentee = User.objects.create_user('mentee', 'mentee@example.com', 'pass')
+        alice, formula = make_mentor('Alice'), make_mentor('=HYPERLINK("http://evil")')
+        for day, status, mentor in (
+            (1, 'confirmed', alice), (2, 'cancelled', alice), (3, 'confirmed', formula), (3, 'confirmed', alice),
+        ):
+            Session.objects.create(
+                mentor=mentor, mentee=mentee, status=status, amount_paid=25,
+                session_date=date(2030, 1, day), session_time=time(10),
+            )
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def export(self, **params):
+        response = self.client.get(reverse('admin_export', args=['sessions']), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def expected_ids(self, **filters):
+        return list(
+            Session.objects.filter(**filters).order_by('-session_date', '-session_time', '-id').values_list('id', flat=True)
+        )
+
+    def test_csv_rows_match_the_filtered_queryset(self):
+        rows = list(csv.DictReader(io.StringIO(self.export(status='confirmed'))))
+        self.assertEqual([int(row['id']) for row in rows], self.expected_ids(status='confirmed'))
+        self.assertEqual({row['status'] for row in rows}, {'confirmed'})
+        # Formula-looking cells are quoted so spreadsheets show them as text
+        self.assertIn("'=HYPERLINK(\"http://evil\")", {row['mentor'] for row in rows})
+
+        rows = list(csv.DictReader(io.StringIO(self.export(q='alice', start='2030-01-02'))))
+        self.assertEqual(
+            [int(row['id']) for row in rows],
+            self.expected_ids(mentor__full_name='Alice', session_date__gte=date(2030, 1, 2)),
+        )
+
+    def test_ndjson_rows_match_the_filtered_queryset(self):
+        rows = [json.loads(line) for line in self.export(format='ndjson', status='confirmed').splitlines()]
+        self.assertEqual([row['id'] for row in rows], self.expected_ids(status='confirmed'))
+        first = Session.objects.get(pk=rows[0]['id'])
+        self.assertEqual(
+            (rows[0]['session_date'], rows[0]['mentor'], rows[0]['amount_paid']),
+            (first.session_date.isoformat(), first.mentor.full_name, '25.00'),
+        )
+
+    def test_staff_only(self):
+        self.client.logout()
+        response = self.client.get(reverse('admin_export', args=['sessions']))
+        self.assertNotEqual(response.status_code, 200)
+
+
+class ContactInboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pass', is_staff=True)
+        cls.messages = [
+            ContactMessage.objects.create(name=name, email=f'{name.lower()}@example.com', subject=subject, message='Hello')
+            for name, subject in (('Ann', 'Pricing'), ('Bob', 'Refund'), ('Cat', 'Pricing question'))
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def inbox_ids(self, **params):
+        page = self.client.get(reverse('contact_messages'), params).context['contact_messages']
+        return {message.id for message in page}
+
+    def export_ids(self, **params):
+        response = self.client.get(reverse('admin_export', args=['contact-messages']), {'format': 'ndjson', **params})
+        return {json.loads(line)['id'] for line in b''.join(response.streaming_content).decode().splitlines()}
+
+    def test_mark_read_and_the_export_follows_the_inbox_filters(self):
+        ann, bob, cat = self.messages
+        response = self.client.post(
+            reverse('admin_inbox_mark', args=['contact-messages']),
+            {'ids': [ann.id, cat.id], 'action': 'read', 'next': 'state=read'},
+        )
+        self.assertRedirects(response, reverse('contact_messages') + '?state=read')
+        for params, expected in (
+            ({}, {bob.id}),
+            ({'state': 'read'}, {ann.id, cat.id}),
+            ({'state': 'all', 'q': 'pricing'}, {ann.id, cat.id}),
+            ({'state': 'read', 'q': 'cat@'}, {cat.id}),
+        ):
+            self.assertEqual(self.inbox_ids(**params), expected)
+            self.assertEqual(self.export_ids(**params), expected)
+
+        self.client.post(reverse('admin_inbox_mark', args=['contact-messages']), {'ids': [ann.id], 'action': 'unread'})
+        self.assertEqual(self.inbox_ids(), {ann.id, bob.id})
+
+
+# -----------------------------
+# Mentor CSV import (main/mentor_import.py)
+# -----------------------------
+
+MENTOR_CSV_HEADER = 'full_name,headline,bio,years_of_experience,hourly_rate,available_for,skills,application_status\n'
+
+
+class MentorImportTests(TestCase):
+    def csv(self, *rows):
+        return (MENTOR_CSV_HEADER + ''.join(row + '\n' for row in rows)).splitlines(keepends=True)
+
+    def test_imports_mentors_with_skills_and_indexes_them(self):
+        Skill.objects.create(name='Python')
+        result = run_import(self.csv(
+            'Alice,Django dev,Bio,5,50,both,python;Django;PYTHON,approved',
+            'Bob,Rust dev,Bio,3,40,mentorship,Rust,pending',
+        ))
+        self.assertEqual((result.imported, result.errors), (2, []))
+        self.assertEqual(sorted(result.created_skills), ['Django', 'Rust'])
+        alice = MentorProfile.objects.get(full_name='Alice')
+        self.assertTrue(alice.is_approved)
+        self.assertEqual(sorted(alice.skills.values_list('name', flat=True)), ['Django', 'Python'])
+        # Only approved mentors are indexed and searchable
+        python = SkillPostingList.objects.get(skill__name='Python')
+        self.assertEqual(python.mentor_ids, [alice.id])
+        self.assertEqual(SkillPostingList.objects.get(skill__name='Rust').mentor_ids, [])
+        self.assertEqual(list(MentorSearchDocument.objects.values_list('mentor_id', flat=True)), [alice.id])
+
+    def test_invalid_rows_stop_the_import(self):
+        result = run_import(self.csv(
+            'Alice,Django dev,Bio,5,50,both,Python,approved',
+            'Bob,,Bio,lots,40,mentorship,Rust,unknown',
+        ))
+        self.assertEqual(result.imported, 0)
+        self.assertEqual([line for line, _ in result.errors], [3])
+        self.assertFalse(MentorProfile.objects.exists())
+        self.assertFalse(Skill.objects.exists())
+
+    def test_skip_invalid_imports_the_valid_rows(self):
+        result = run_import(self.csv(
+            'Alice,Django dev,Bio,5,50,both,Python,approved',
+            'Bob,Rust dev,Bio,lots,40,mentorship,Rust,pending',
+        ), skip_invalid=True)
+        self.assertEqual(result.imported, 1)
+        self.assertEqual(list(MentorProfile.objects.values_list('full_name', flat=True)), ['Alice'])
+
+    def test_dry_run_writes_nothing(self):
+        result = run_import(self.csv('Alice,Django dev,Bio,5,50,both,Python,approved'), dry_run=True)
+        self.assertEqual((result.rows, result.imported, result.errors), (1, 0, []))
+        self.assertFalse(MentorProfile.objects.exists())
+
+    def test_missing_columns(self):
+        result = run_import(['full_name,bio\n', 'Alice,Bio\n'])
+        self.assertEqual(result.errors, [(1, 'missing column(s): headline, years_of_experience, hourly_rate, available_for')])
+
+
+# -----------------------------
+# Question bank import and export (main/question_bank.py)
+# -----------------------------
+
+class QuestionBankTests(TestCase):
+    def bank(self, *questions):
+        return json.dumps({'questions': list(questions)})
+
+    def question(self, text='What is 2 + 2?', correct=(True, False), marks=1):
+        return {
+            'text': text, 'marks': marks,
+            'options': [{'text': f'Option {n}', 'is_correct': flag} for n, flag in enumerate(correct)],
+        }
+
+    def test_json_and_csv_round_trip(self):
+        source = make_category('Source', questions=3, options=4, marks=2)
+        exported_json = question_bank.export_json(source)
+        rows = io.StringIO()
+        csv.writer(rows).writerows(question_bank.export_csv_rows(source))
+
+        for fmt, text in (('json', exported_json), ('csv', rows.getvalue())):
+            target = Category.objects.create(name=f'Target {fmt}')
+            result = question_bank.run_import(target, text, fmt)
+            self.assertEqual((result.imported, result.errors), (3, []))
+            self.assertEqual(question_bank.export_json(target), exported_json.replace('"Source"', f'"Target {fmt}"'))
+
+    def test_string_flags_are_rejected(self):
+        category = Category.objects.create(name='Python')
+        for flag in ('false', '0', 'yes', None, 2):
+            result = question_bank.run_import(category, self.bank(self.question(correct=(True, flag))), 'json')
+            self.assertEqual(result.imported, 0)
+            self.assertEqual(len(result.errors), 1, flag)
+            self.assertIn('is_correct must be true or false', result.errors[0][1])
+        self.assertFalse(Question.objects.exists())
+
+    def test_zero_and_one_are_accepted(self):
+        category = Category.objects.create(name='Python')
+        result = question_bank.run_import(category, self.bank(self.question(correct=(1, 0))), 'json')
+        self.assertEqual(result.imported, 1)
+        self.assertEqual(list(Option.objects.order_by('id').values_list('is_correct', flat=True)), [True, False])
+
+    def test_one_invalid_question_imports_nothing(self):
+        category = Category.objects.create(name='Python')
+        result = question_bank.run_import(category, self.bank(
+            self.question(),
+            self.question(text='No right answer', correct=(False, False)),
+            self.question(text='One option', correct=(True,)),
+        ), 'json')
+        self.assertEqual(result.errors, [(2, 'no option is marked correct'), (3, 'a question needs at least two options')])
+        self.assertFalse(Question.objects.exists())
+
+    def test_import_drops_the_cached_answer_key(self):
+        category = make_category('Python', questions=2)
+        self.assertEqual(len(get_answer_key(category.id).key), 2)
+        question_bank.run_import(category, self.bank(self.question()), 'json')
+        self.assertEqual(len(get_answer_key(category.id).key), 3)
+
+    def test_csv_correct_column_must_name_an_option(self):
+        category = Category.objects.create(name='Python')
+        result = question_bank.run_import(category, 'text,marks,correct,option_1,option_2\nQ,1,3,A,B\n', 'csv')
+        self.assertEqual(result.errors, [(2, '"correct" refers to option 3, which has no column')])
+
+
+
+class QuestionBankViewTests(TestCase):
+    """admin_category_export and admin_category_import."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pass', is_staff=True)
+        cls.source = make_category('Source', questions=3, options=3, marks=2)
+        # A question with two right answers and a comma in its text
+        question = Question.objects.create(category=cls.source, text='Pick both, please', marks=4)
+        Option.objects.bulk_create([
+            Option(question=question, text='A', is_correct=True),
+            Option(question=question, text='B', is_correct=True),
+            Option(question=question, text='C'),
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def contents(self, category):
+        return [
+            (question.text, question.marks, [(o.text, o.is_correct) for o in sorted(question.options.all(), key=lambda o: o.id)])
+            for question in Question.objects.filter(category=category).order_by('id').prefetch_related('options')
+        ]
+
+    def upload(self, category, name, content):
+        return self.client.post(
+            reverse('admin_category_import', args=[category.id]),
+            {'file': SimpleUploadedFile(name, content.encode('utf-8'))},
+        )
+
+    def test_export_then_import_into_a_new_category(self):
+        for fmt in ('json', 'csv'):
+            response = self.client.get(reverse('admin_category_export', args=[self.source.id]), {'format': fmt})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(f'source-questions.{fmt}', response['Content-Disposition'])
+            target = Category.objects.create(name=f'Target {fmt}')
+            response = self.upload(target, f'bank.{fmt}', response.content.decode('utf-8'))
+            self.assertRedirects(response, reverse('admin_category_detail', args=[target.id]))
+            self.assertEqual(self.contents(target), self.contents(self.source))
+
+    def test_malformed_rows_leave_the_category_unchanged(self):
+        target = make_category('Target', questions=1)
+        before = self.contents(target)
+        banks = {
+            'bank.csv': 'text,marks,correct,option_1,option_2\nFine,1,1,A,B\nNo answer,1,,A,B\nBad marks,x,1,A,B\n',
+            'bank.json': json.dumps({'questions': [
+                {'text': 'Fine', 'marks': 1, 'options': [{'text': 'A', 'is_correct': True}, {'text': 'B', 'is_correct': False}]},
+                {'text': 'One option', 'marks': 1, 'options': [{'text': 'A', 'is_correct': True}]},
+            ]}),
+            'broken.json': '{"questions": [',
+        }
+        for name, content in banks.items():
+            response = self.upload(target, name, content)
+            self.assertEqual(response.status_code, 200, name)
+            self.assertTrue(response.context['errors'], name)
+            self.assertEqual(self.contents(target), before, name)
+
+# -----------------------------
+# Grading (main/grading.py)
+# -----------------------------
+
+class GradingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('mentee', 'mentee@example.com', 'pass')
+        cls.category = Category.objects.create(name='Python')
+        cls.single = Question.objects.create(category=cls.category, text='Single', marks=2)
+        cls.multi = Question.objects.create(category=cls.category, text='Multi', marks=3)
+        cls.s_right, cls.s_wrong = Option.objects.bulk_create([
+            Option(question=cls.single, text='Right', is_correct=True),
+            Option(question=cls.single, text='Wrong'),
+        ])
+        cls.m_a, cls.m_b, cls.m_c = Option.objects.bulk_create([
+            Option(question=cls.multi, text='A', is_correct=True),
+            Option(question=cls.multi, text='B', is_correct=True),
+            Option(question=cls.multi, text='C'),
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def grade(self, selections, question_ids=None):
+        return grade(get_answer_key(self.category.id), selections, question_ids)
+
+    def test_a_question_scores_only_with_exactly_its_correct_options(self):
+        cases = [
+            ({self.m_a.id, self.m_b.id}, True),
+            ({self.m_a.id}, False),
+            ({self.m_a.id, self.m_b.id, self.m_c.id}, False),
+            (set(), False),
+        ]
+        for chosen, expected in cases:
+            answers, score, total = self.grade({self.single.id: {self.s_right.id}, self.multi.id: chosen})
+            self.assertEqual([answer.is_correct for answer in answers], [True, expected])
+            self.assertEqual((score, total), (2 + (3 if expected else 0), 5))
+
+    def test_editing_an_option_drops_the_compiled_key(self):
+        stale = Category.objects.get(id=self.category.id)
+        self.assertEqual(self.grade({self.single.id: {self.s_right.id}})[1], 2)
+        Option.objects.filter(id=self.s_right.id).update(is_correct=False)
+        self.s_wrong.is_correct = True
+        self.s_wrong.save()
+        self.assertEqual(self.grade({self.single.id: {self.s_wrong.id}})[1], 2)
+        # Saving a copy loaded before the edit must not bring the old version back
+        stale.save()
+        self.assertEqual(self.grade({self.single.id: {self.s_right.id}})[1], 0)
+
+    def test_options_of_other_questions_are_ignored(self):
+        answers, score, _ = self.grade({self.single.id: {self.s_right.id, self.m_c.id}})
+        self.assertEqual(answers[0].selected, [self.s_right.id])
+        self.assertEqual(score, 2)
+
+    def test_only_served_questions_are_graded(self):
+        answers, score, total = self.grade({self.multi.id: {self.m_a.id, self.m_b.id}}, [self.multi.id, 999999])
+        self.assertEqual([answer.question_id for answer in answers], [self.multi.id])
+        self.assertEqual((score, total), (3, 3))
+
+    def test_selections_from_post_ignores_junk(self):
+        post = QueryDict(mutable=True)
+        post.setlist(f'q_{self.multi.id}', [str(self.m_a.id), 'x', str(self.m_b.id)])
+        self.assertEqual(
+            selections_from_post(post, [self.single.id, self.multi.id]),
+            {self.single.id: set(), self.multi.id: {self.m_a.id, self.m_b.id}},
+        )
+
+    def test_record_attempt_stores_every_answer_and_selection(self):
+        answers, score, total = self.grade({self.single.id: {self.s_wrong.id}, self.multi.id: {self.m_a.id, self.m_b.id}})
+        attempt = record_attempt(self.user, self.category, answers, score, total)
+        attempt.refresh_from_db()
+        self.assertEqual((attempt.completed, attempt.score, attempt.total_marks), (True, 3, 5))
+        stored = {answer.question_id: answer for answer in attempt.answers.prefetch_related('selected_options')}
+        self.assertEqual(stored[self.single.id].selected_option_id, self.s_wrong.id)
+        self.assertFalse(stored[self.single.id].is_correct)
+        self.assertEqual({o.id for o in stored[self.multi.id].selected_options.all()}, {self.m_a.id, self.m_b.id})
+        self.assertEqual(stored[self.multi.id].marks_awarded, 3)
+        self.assertEqual(CategoryBestScore.objects.get(user=self.user).attempt_id, attempt.id)
+
+    def test_completed_attempt_is_not_recorded_twice(self):
+        attempt = TestAttempt.objects.create(user=self.user, category=self.category)
+        answers, score, total = self.grade({})
+        self.assertIsNotNone(record_attempt(self.user, self.category, answers, score, total, attempt=attempt))
+        self.assertIsNone(record_attempt(self.user, self.category, answers, score, total, attempt=attempt))
+        self.assertEqual(AttemptAnswer.objects.filter(attempt=attempt).count(), 2)
+        self.assertEqual(sum(CategoryScoreBucket.objects.values_list('attempts', flat=True)), 1)
+
+
+# -----------------------------
+# Question sampling (main/sampling.py)
+# -----------------------------
+
+class SamplingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentee = User.objects.create_user('mentee', 'mentee@example.com', 'pass')
+        # Pool of 9: six 1-mark and three 3-mark questions
+        cls.category = make_category('Python', questions=6, sample_size=3, stratify_by_marks=True)
+        for number in range(3):
+            question = Question.objects.create(category=cls.category, text=f'Hard question {number}', marks=3)
+            Option.objects.bulk_create([
+                Option(question=question, text='Right', is_correct=True), Option(question=question, text='Wrong'),
+            ])
+
+    def setUp(self):
+        cache.clear()
+
+    def answer_key(self):
+        return get_answer_key(self.category.id)
+
+    def test_a_sample_is_reproducible_from_its_seed(self):
+        answer_key = self.answer_key()
+        for stratify in (False, True):
+            sample = sample_question_ids(answer_key, 4, seed=12345, stratify_by_marks=stratify)
+            self.assertEqual(sample, sample_question_ids(answer_key, 4, seed=12345, stratify_by_marks=stratify))
+            self.assertEqual(len(set(sample)), 4)
+            self.assertTrue(set(sample) <= set(answer_key.key))
+        samples = {tuple(sample_question_ids(answer_key, 4, seed)) for seed in range(20)}
+        self.assertGreater(len(samples), 1)
+
+    def test_a_sample_as_large_as_the_pool_serves_everything(self):
+        answer_key = self.answer_key()
+        self.assertEqual(sample_question_ids(answer_key, 9, seed=1), sorted(answer_key.key))
+        self.assertEqual(sample_question_ids(answer_key, None, seed=1), sorted(answer_key.key))
+
+    def test_stratified_samples_keep_the_mix_of_marks(self):
+        answer_key = self.answer_key()
+        for seed in range(50):
+            sample = sample_question_ids(answer_key, 3, seed, stratify_by_marks=True)
+            self.assertEqual(sorted(answer_key.key[question_id][0] for question_id in sample), [1, 1, 3])
+
+    def test_shares_use_the_largest_remainder(self):
+        self.assertEqual(_shares({1: 5, 2: 3, 3: 2}, 4), {1: 2, 2: 1, 3: 1})
+        self.assertEqual(_shares({1: 1, 2: 1}, 1), {1: 1, 2: 0})
+        self.assertEqual(sum(_shares({1: 7, 2: 5, 5: 1}, 6).values()), 6)
+
+    def test_reloading_the_test_page_serves_the_same_attempt(self):
+        self.client.force_login(self.mentee)
+        url = reverse('take_test', args=[self.category.id])
+        first = self.client.get(url)
+        second = self.client.get(url)
+        self.assertEqual(first.context['attempt'].id, second.context['attempt'].id)
+        self.assertEqual(
+            [q['id'] for q in first.context['questions']], [q['id'] for q in second.context['questions']],
+        )
+        self.assertEqual([q['id'] for q in first.context['questions']], first.context['attempt'].served_question_ids)
+        self.assertEqual(TestAttempt.objects.count(), 1)
+
+    def test_only_served_questions_are_graded_and_a_second_submit_is_ignored(self):
+        self.client.force_login(self.mentee)
+        url = reverse('take_test', args=[self.category.id])
+        attempt = self.client.get(url).context['attempt']
+        data = answer_post(self.category, attempt=attempt)
+        self.assertRedirects(self.client.post(url, data), reverse('test_result', args=[attempt.id]))
+        attempt.refresh_from_db()
+        self.assertTrue(attempt.completed)
+        self.assertEqual((attempt.score, attempt.total_marks), (5, 5))
+        self.assertEqual(
+            sorted(attempt.answers.values_list('question_id', flat=True)), sorted(attempt.served_question_ids),
+        )
+
+        self.assertRedirects(self.client.post(url, data), reverse('test_result', args=[attempt.id]))
+        self.assertEqual(TestAttempt.objects.count(), 1)
+        self.assertEqual(AttemptAnswer.objects.count(), 3)
+        self.assertEqual(sum(CategoryScoreBucket.objects.values_list('attempts', flat=True)), 1)
+
+        # The finished attempt isn't reused; the next visit draws a new sample
+        self.assertNotEqual(self.client.get(url).context['attempt'].id, attempt.id)
+
+    def test_a_submit_without_its_attempt_is_not_graded_against_the_pool(self):
+        self.client.force_login(self.mentee)
+        url = reverse('take_test', args=[self.category.id])
+        self.assertRedirects(self.client.post(url, answer_post(self.category)), url)
+        self.assertFalse(TestAttempt.objects.filter(completed=True).exists())
+        self.assertEqual(AttemptAnswer.objects.count(), 0)
+
+
+# -----------------------------
+# Question item analysis (main/question_stats.py)
+# -----------------------------
+
+class QuestionStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = make_category('Python', questions=4, options=3, marks=2)
+        cls.options = {
+            question.id: sorted(option.id for option in question.options.all())
+            for question in Question.objects.filter(category=cls.category).prefetch_related('options')
+        }
+
+    def take_tests(self, count, offset=0):
+        answer_key = get_answer_key(self.category.id)
+        for number in range(offset, offset + count):
+            user = User.objects.create_user(f'mentee{number}', f'mentee{number}@example.com', 'pass')
+            # A spread of scores and choices: question i is answered with option (number * (i + 1)) % 3
+            selections = {
+                question_id: {options[(number * (i + 1)) % len(options)]}
+                for i, (question_id, options) in enumerate(sorted(self.options.items()))
+            }
+            answers, score, total = grade(answer_key, selections)
+            record_attempt(user, self.category, answers, score, total)
+
+    def snapshot(self):
+        return {
+            stats.question_id: (
+                [getattr(stats, field) for field in SUM_FIELDS], stats.option_counts, stats.p_value, stats.discrimination,
+            )
+            for stats in QuestionStats.objects.all()
+        }
+
+    def assertSameStats(self, first, second):
+        self.assertEqual(first.keys(), second.keys())
+        for question_id, (sums, option_counts, p_value, discrimination) in first.items():
+            other_sums, other_counts, other_p, other_discrimination = second[question_id]
+            self.assertEqual(sums[:4], other_sums[:4])
+            for value, other in zip(sums[4:], other_sums[4:]):
+                self.assertAlmostEqual(value, other)
+            self.assertEqual(option_counts, other_counts)
+            self.assertAlmostEqual(p_value, other_p)
+            if discrimination is None:
+                self.assertIsNone(other_discrimination)
+            else:
+                self.assertAlmostEqual(discrimination, other_discrimination, places=3)
+
+    def test_incremental_runs_match_a_rebuild(self):
+        self.take_tests(7)
+        self.assertEqual(run_question_stats(chunk_size=3), (7, 28))
+        self.take_tests(6, offset=7)
+        self.assertEqual(run_question_stats(chunk_size=4), (6, 24))
+        self.assertEqual(run_question_stats(), (0, 0))
+        incremental = self.snapshot()
+
+        self.assertEqual(run_question_stats(rebuild=True), (13, 52))
+        self.assertSameStats(incremental, self.snapshot())
+        self.assertEqual(sum(sums[0] for sums, *_ in incremental.values()), 52)
+        self.assertTrue(any(discrimination is not None for *_, discrimination in incremental.values()))
+
+
+# -----------------------------
+# Google Calendar events (main/google_meet_helper.py, main/tasks.py)
+# -----------------------------
+
+class CountingCalendarBackend(LocalCalendarBackend):
+    builds = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        CountingCalendarBackend.builds += 1
+
+
+@override_settings(GOOGLE_CALENDAR_BACKEND='fake')
+class CalendarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentor = make_mentor('Alice', user=User.objects.create_user('alice', 'alice@example.com', 'pass'))
+        cls.mentee = User.objects.create_user('mentee', 'mentee@example.com', 'pass')
+
+    def setUp(self):
+        cache.clear()
+        reset_calendar_backend()
+        self.addCleanup(reset_calendar_backend)
+
+    def confirmed_session(self, days_ahead=1, **fields):
+        return Session.objects.create(
+            mentor=self.mentor, mentee=self.mentee, status='confirmed',
+            session_date=timezone.localdate() + timedelta(days=days_ahead), session_time=time(10), **fields,
+        )
+
+    def test_link_job_leaves_past_and_unqueued_sessions_alone(self):
+        session = self.confirmed_session()
+        past = self.confirmed_session(days_ahead=-3)
+        legacy = self.confirmed_session(days_ahead=2)
+        # A stale job for the past session is still waiting in the queue
+        Job.objects.create(task='generate_meeting_link', payload={'session_id': past.id})
+
+        generate_meeting_link(session.id)
+
+        session.refresh_from_db()
+        self.assertTrue(session.meeting_link.startswith('https://meet.google.com/'))
+        self.assertEqual(session.calendar_provider, 'fake')
+        self.assertEqual(list(get_calendar_backend().events), [session.calendar_event_id])
+        for untouched in (past, legacy):
+            untouched.refresh_from_db()
+            self.assertEqual((untouched.meeting_link or '', untouched.calendar_event_id), ('', ''))
+
+    @override_settings(JOBS_RUN_INLINE=True, MEET_LINK_BATCH_SECONDS=0)
+    def test_confirming_a_session_creates_one_event(self):
+        session = Session.objects.create(
+            mentor=self.mentor, mentee=self.mentee, session_date=timezone.localdate() + timedelta(days=1), session_time=time(10),
+        )
+        self.client.force_login(self.mentor.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('mentor_session_accept', args=[session.id]))
+        session.refresh_from_db()
+        backend = get_calendar_backend()
+        self.assertEqual(session.status, 'confirmed')
+        self.assertEqual(list(backend.events), [stable_event_id(session)])
+        self.assertEqual(session.calendar_event_id, stable_event_id(session))
+
+        # A retried job finds the link; a repeated insert gets the same event back
+        generate_meeting_link(session.id)
+        self.assertEqual(create_meet_links([session]), {session.id: session.meeting_link})
+        self.assertEqual(len(backend.events), 1)
+
+    @override_settings(GOOGLE_CALENDAR_BACKEND='main.tests.CountingCalendarBackend')
+    def test_backend_is_built_once(self):
+        CountingCalendarBackend.builds = 0
+        first, second = self.confirmed_session(days_ahead=1), self.confirmed_session(days_ahead=2)
+        generate_meeting_link(first.id)
+        generate_meeting_link(second.id)
+        self.assertIs(get_calendar_backend(), get_calendar_backend())
+        self.assertEqual(CountingCalendarBackend.builds, 1)
+        self.assertEqual(len(get_calendar_backend().events), 2)
+
+
+    @override_settings(GOOGLE_CALENDAR_BREAKER_THRESHOLD=2, GOOGLE_CALENDAR_BREAKER_RESET_SECONDS=30)
+    def test_breaker_opens_after_the_threshold_and_closes_after_the_reset(self):
+        session = self.confirmed_session()
+        backend = get_calendar_backend()
+        backend.fail_with = OSError('Calendar timed out')
+        with redirect_stdout(io.StringIO()):
+            for _ in range(2):
+                self.assertIn('/codementor-', create_meet_links([session])[session.id])
+            self.assertTrue(calendar_breaker().is_open)
+            self.assertEqual(backend.requests, 2)
+
+            # Open: straight to the fallback link without calling Calendar
+            backend.fail_with = None
+            self.assertIn('/codementor-', create_meet_links([session])[session.id])
+            self.assertEqual(backend.requests, 2)
+
+            # After the reset period a trial call goes through and closes the circuit
+            with mock.patch('main.google_meet_helper.time.time', return_value=_time.time() + 31):
+                link = create_meet_links([session])[session.id]
+        self.assertNotIn('/codementor-', link)
+        self.assertEqual(backend.requests, 3)
+        self.assertFalse(calendar_breaker().is_open)
+        self.assertEqual(create_meet_links([session])[session.id], link)
+
+
+class CalendarEventMigrationTests(TestCase):
+    """The data migration that moved '[Calendar Event ID: ...]' markers out of meeting_notes."""
+
+    migration = importlib.import_module('main.migrations.0020_session_calendar_event')
+
+    def test_split_event_markers(self):
+        split = self.migration.split_event_markers
+        self.assertEqual(split('Bring your questions'), ([], 'Bring your questions'))
+        self.assertEqual(split(None), ([], None))
+        self.assertEqual(split('[Calendar Event ID: abc123]'), (['abc123'], None))
+        self.assertEqual(split('\n[Calendar Event ID: abc123]'), (['abc123'], None))
+        self.assertEqual(
+            split('Bring your questions\n[Calendar Event ID: abc123]\nAnd the repo link'),
+            (['abc123'], 'Bring your questions\nAnd the repo link'),
+        )
+        self.assertEqual(
+            split('Notes\n[Calendar Event ID: first]\n[Calendar Event ID: second]'), (['first', 'second'], 'Notes'),
+        )
+
+    def test_moves_the_last_event_id_onto_the_session(self):
+        mentor = make_mentor('Alice')
+        mentee = User.objects.create_user('mentee', 'mentee@example.com', 'pass')
+        notes = [
+            'No marker here',
+            'Bring your questions\n[Calendar Event ID: first]\n[Calendar Event ID: second]',
+        ]
+        sessions = [
+            Session.objects.create(
+                mentor=mentor, mentee=mentee, session_date=date(2030, 1, 1 + number), session_time=time(9), meeting_notes=text,
+            )
+            for number, text in enumerate(notes)
+        ]
+        self.migration.move_event_ids_out_of_notes(apps, None)
+        plain, marked = Session.objects.filter(id__in=[s.id for s in sessions]).order_by('session_date')
+        self.assertEqual((plain.meeting_notes, plain.calendar_event_id, plain.calendar_provider), ('No marker here', '', ''))
+        self.assertEqual((marked.meeting_notes, marked.calendar_event_id, marked.calendar_provider), ('Bring your questions', 'second', 'google'))
+        self.assertEqual(marked.calendar_synced_at, marked.updated_at)
+
+# -----------------------------
+# Email outbox (main/emails.py)
+# -----------------------------
+
+class FlakyEmailBackend(locmem.EmailBackend):
+    """locmem backend that counts its connections and refuses the addresses in `refused`."""
+
+    connections = 0
+    refused = set()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        FlakyEmailBackend.connections += 1
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.refused:
+                raise OSError(f'Recipient refused: {message.to}')
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTests(TestCase):
+    def setUp(self):
+        # Pooled connections belong to whatever backend the previous test used
+        emails._pool = None
+        self.addCleanup(setattr, emails, '_pool', None)
+        FlakyEmailBackend.connections = 0
+        FlakyEmailBackend.refused = set()
+
+    def email(self, number, address=None):
+        return (f'Subject {number}', f'Body {number}', [address or f'user{number}@example.com'])
+
+    def test_one_message_per_dedup_key(self):
+        self.assertEqual(emails.queue_emails([self.email(1), self.email(2)], scope='session:1:a'), 2)
+        # A retried job queues the same emails again
+        emails.queue_emails([self.email(1), self.email(2)], scope='session:1:a')
+        # The same email for a later state of the session is a new message
+        emails.queue_emails([self.email(1)], scope='session:1:b')
+        self.assertEqual(emails.dispatch_outbox(), (3, 0))
+        self.assertEqual(sorted(message.subject for message in mail.outbox), ['Subject 1', 'Subject 1', 'Subject 2'])
+        self.assertEqual(emails.dispatch_outbox(), (0, 0))
+        self.assertEqual(len(mail.outbox), 3)
+
+    @override_settings(EMAIL_BACKEND='main.tests.FlakyEmailBackend')
+    def test_batches_share_one_connection(self):
+        emails.queue_emails([self.email(number) for number in range(5)])
+        self.assertEqual(emails.dispatch_outbox(batch_size=2), (5, 0))
+        emails.queue_emails([self.email(5)])
+        self.assertEqual(emails.dispatch_outbox(batch_size=2), (1, 0))
+        self.assertEqual(len(mail.outbox), 6)
+        self.assertEqual(FlakyEmailBackend.connections, 1)
+        self.assertFalse(OutboxEmail.objects.exclude(status='sent').exists())
+
+    @override_settings(EMAIL_BACKEND='main.tests.FlakyEmailBackend')
+    def test_failed_rows_are_retried_not_dropped(self):
+        FlakyEmailBackend.refused = {'bounce@example.com'}
+        emails.queue_emails([self.email(1), self.email(2, 'bounce@example.com'), self.email(3)])
+        self.assertEqual(emails.dispatch_outbox(), (2, 1))
+        self.assertEqual(sorted(message.subject for message in mail.outbox), ['Subject 1', 'Subject 3'])
+        row = OutboxEmail.objects.get(subject='Subject 2')
+        self.assertEqual((row.status, row.attempts), ('pending', 1))
+        self.assertIn('Recipient refused', row.last_error)
+        self.assertGreater(row.next_attempt_at, timezone.now())
+        self.assertEqual(emails.next_retry_at(), row.next_attempt_at)
+
+        # Not due yet; once it is and the server accepts it, it goes out exactly once
+        self.assertEqual(emails.dispatch_outbox(), (0, 0))
+        FlakyEmailBackend.refused = set()
+        OutboxEmail.objects.filter(pk=row.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(emails.dispatch_outbox(), (1, 0))
+        self.assertEqual([message.subject for message in mail.outbox].count('Subject 2'), 1)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ('sent', 2))
+
+    @override_settings(EMAIL_BACKEND='main.tests.FlakyEmailBackend')
+    def test_a_row_that_keeps_failing_is_parked(self):
+        FlakyEmailBackend.refused = {'bounce@example.com'}
+        emails.queue_emails([self.email(1, 'bounce@example.com')])
+        OutboxEmail.objects.update(max_attempts=2)
+        with self.assertLogs('main.emails', 'ERROR'):
+            for _ in range(2):
+                OutboxEmail.objects.update(next_attempt_at=timezone.now())
+                self.assertEqual(emails.dispatch_outbox(), (0, 1))
+        self.assertEqual(OutboxEmail.objects.get().status, 'failed')
+        self.assertIsNone(emails.next_retry_at())
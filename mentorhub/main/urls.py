@@ -22,6 +22,7 @@ urlpatterns = [
 
     # Custom Admin URLs
     path('admin/', views.admin_dashboard, name="admin_dashboard"),
+    path('admin/reports/', views.admin_reports, name="admin_reports"),
     path('admin/mentors/', views.admin_mentors, name="admin_mentors"),
     path('admin/tests/', views.admin_quiz_manage, name='admin_quiz_manage'),
     path('admin/tests/add-category/', views.admin_add_category, name='admin_add_category'),
@@ -29,9 +30,12 @@ urlpatterns = [
     path('admin/tests/<int:category_id>/edit/', views.admin_edit_category, name='admin_edit_category'),
     path('admin/tests/<int:category_id>/delete/', views.admin_delete_category, name='admin_delete_category'),
     path('admin/tests/<int:category_id>/add-question/', views.admin_add_question, name='admin_add_question'),
+    path('admin/tests/<int:category_id>/export/', views.admin_category_export, name='admin_category_export'),
+    path('admin/tests/<int:category_id>/import/', views.admin_category_import, name='admin_category_import'),
     path('admin/tests/question/<int:question_id>/edit/', views.admin_edit_question, name='admin_edit_question'),
     path('admin/tests/question/<int:question_id>/delete/', views.admin_delete_question, name='admin_delete_question'),
     path('admin/mentors/add/', views.admin_mentor_add, name="admin_mentor_add"),
+    path('admin/mentors/import/', views.admin_mentor_import, name="admin_mentor_import"),
     path('admin/mentors/<int:mentor_id>/edit/', views.admin_mentor_edit, name="admin_mentor_edit"),
     path('admin/mentors/<int:mentor_id>/delete/', views.admin_mentor_delete, name="admin_mentor_delete"),
     path('admin/skills/', views.admin_skills, name="admin_skills"),
@@ -39,9 +43,11 @@ urlpatterns = [
     path('admin/skills/edit/<pk>', views.edit_skills, name="edit_skills"),
     path('admin/mentors/mentor_view/<pk>', views.mentor_view, name="mentor_view"),
     path('admin/sessions/', views.admin_sessions, name="admin_sessions"),
+    path('admin/export/<str:dataset>/', views.admin_export, name="admin_export"),
     path('admin/sessions/<int:session_id>/set-status/', views.admin_session_set_status, name="admin_session_set_status"),
     path('hire-developer-data/', views.hire_developer_data_view, name="hire_developer_data"),
     path('contact-messages/',views.contact_messages_view,name="contact_messages"),
+    path('admin/inbox/<str:inbox>/mark/', views.admin_inbox_mark, name="admin_inbox_mark"),
     # Removed approve/reject and skills management routes
     path('admin/users/', views.admin_users, name="admin_users"),
     path('admin/users/<int:user_id>/edit/', views.admin_user_edit, name="admin_user_edit"),
@@ -49,11 +55,13 @@ urlpatterns = [
     
     # Session Booking URLs
     path('book-session/<int:mentor_id>/', views.book_session, name="book_session"),
-    path('payment/<int:session_id>/', views.payment_page, name="payment_page"),
+    path('payment/<int:hold_id>/', views.payment_page, name="payment_page"),
     path('session-confirmation/<int:session_id>/', views.session_confirmation, name="session_confirmation"),
     path('session/<int:session_id>/', views.mentee_session_detail, name="mentee_session_detail"),
     path('mentee-dashboard/', views.mentee_dashboard, name="mentee_dashboard"),
+    path('mentee-dashboard/history/<str:kind>/', views.mentee_session_history, name="mentee_session_history"),
     path('mentor-dashboard/', views.mentor_dashboard, name="mentor_dashboard"),
+    path('mentor-dashboard/history/<str:kind>/', views.mentor_session_history, name="mentor_session_history"),
     path('mentor/session/<int:session_id>/', views.mentor_session_detail, name='mentor_session_detail'),
     path('mentor/session/<int:session_id>/set-status/', views.mentor_session_set_status, name='mentor_session_set_status'),
     path('mentor/session/<int:session_id>/accept/', views.mentor_session_accept, name='mentor_session_accept'),
@@ -64,5 +72,6 @@ urlpatterns = [
     path('quiz/', views.quiz_categories, name='quiz_categories'),
     path('quiz/<int:category_id>/', views.take_test, name='take_test'),
     path('quiz/result/<int:attempt_id>/', views.test_result, name='test_result'),
+    path('quiz/<int:category_id>/leaderboard/', views.quiz_leaderboard, name='quiz_leaderboard'),
    
 ]
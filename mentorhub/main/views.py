@@ -1,26 +1,50 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import HttpResponse
+from django.utils.text import slugify
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.decorators import user_passes_test
-from django.core.mail import send_mail
-from django.conf import settings
 from django.utils.crypto import get_random_string
 from django.utils import timezone
 from datetime import timedelta
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import Q
-from .models import PasswordResetToken, MentorProfile, MenteeProfile, Skill, Session, hire_developer, ContactMessage, MentorFeedback
-from .models import Category, Question, Option, TestAttempt, AttemptAnswer
+from .models import PasswordResetToken, MentorProfile, MenteeProfile, Skill, Session, hire_developer, ContactMessage, MentorFeedback, SlotHold
+from .models import Category, Question, Option, TestAttempt, RollupState
 from .forms import CategoryForm, QuestionForm, OptionFormSet
+from .search import search_mentors
+from .pagination import paginate
+from .metrics import dashboard_counters, daily_trends
+from .exports import stream_export
+from .question_bank import run_import as run_bank_import, export_csv_rows, export_json
+from .mentor_import import run_import as run_mentor_import, REQUIRED_COLUMNS as MENTOR_IMPORT_REQUIRED, OPTIONAL_COLUMNS as MENTOR_IMPORT_OPTIONAL
+from .rollups import report as rollup_report, PERIODS as ROLLUP_PERIODS, ROLLUP_NAME
+from .dashboards import dashboard_sessions, session_history, HISTORY_STATUSES
+from .slots import free_slots, next_available_slots
+from .booking import create_hold, confirm_hold, BookingError
+from .emails import password_reset_email, mentor_status_emails, admin_status_emails, queue_emails, session_scope
+from .jobs import enqueue
+from .tasks import queue_meeting_link
+from .grading import grade, record_attempt, selections_from_post
+from .answer_keys import get_answer_key
+from .sampling import is_sampled, open_attempt, served_questions
+from .question_stats import flags as question_flags, STATS_NAME as QUESTION_STATS_NAME
+from .leaderboards import leaderboard, percentile as attempt_percentile, LEADERBOARD_PAGE_SIZE
+from .skill_index import load_skill_postings, match_skills, skill_facets
 import hashlib
+import codecs
+import csv
 from django import forms
 from django.utils import timezone
 from datetime import datetime, timedelta
 import uuid
 from decimal import Decimal
-from main.forms import HireDeveloperForm, ContactForm,SkillForm
+from main.forms import HireDeveloperForm, ContactForm,SkillForm, PROJECT_TYPE_CHOICES
+from django.urls import reverse
+from urllib.parse import urlencode
 
 # Create your views here.
 
@@ -146,36 +170,22 @@ def forgot_password(request):
                 # Generate reset token
                 token = get_random_string(50)
                 
-                # Create or update reset token
-                reset_token, created = PasswordResetToken.objects.get_or_create(
-                    user=user,
-                    defaults={'token': token}
-                )
-                if not created:
-                    reset_token.token = token
-                    reset_token.used = False
-                    reset_token.created_at = timezone.now()
-                    reset_token.save()
-                
-                # Send email
-                reset_url = f"{request.build_absolute_uri('/')}reset-password/{token}/"
-                try:
-                    send_mail(
-                        'Password Reset Request - CodeMentorHub',
-                        f'Hello {user.first_name or user.username},\n\n'
-                        f'You requested a password reset for your CodeMentorHub account.\n\n'
-                        f'Click the following link to reset your password:\n{reset_url}\n\n'
-                        f'This link will expire in 1 hour.\n\n'
-                        f'If you did not request this password reset, please ignore this email.\n\n'
-                        f'Best regards,\nCodeMentorHub Team',
-                        settings.DEFAULT_FROM_EMAIL,
-                        [user.email],
-                        fail_silently=False,
+                with transaction.atomic():
+                    # Create or update reset token
+                    reset_token, created = PasswordResetToken.objects.get_or_create(
+                        user=user,
+                        defaults={'token': token}
                     )
-                    messages.success(request, f"Password reset link has been sent to {user.email}. Please check your email.")
-                except Exception as e:
-                    # If email sending fails, show the link in the message for development
-                    messages.success(request, f"Password reset link generated. Email sending failed, but you can use this link: {reset_url}")
+                    if not created:
+                        reset_token.token = token
+                        reset_token.used = False
+                        reset_token.created_at = timezone.now()
+                        reset_token.save()
+                    
+                    # Queue the email with the token; the dispatcher retries if SMTP is down
+                    reset_url = f"{request.build_absolute_uri('/')}reset-password/{token}/"
+                    queue_emails([password_reset_email(user, reset_url)])
+                messages.success(request, f"Password reset link has been sent to {user.email}. Please check your email.")
                 
                 return redirect('login')
                 
@@ -303,35 +313,48 @@ def mentor_profile_edit(request):
 
 def find_mentors(request):
     """Public view to find approved mentors"""
-    mentors = MentorProfile.objects.filter(is_approved=True, application_status='approved')
+    # Skills are prefetched for the cards' skill tags (one query per page, not per mentor)
+    mentors = MentorProfile.objects.filter(is_approved=True, application_status='approved').prefetch_related('skills')
+    # One query for every skill's posting list; used for filtering and facet counts
+    postings = load_skill_postings()
+    result_ids = None
     
-    # Search functionality
+    # Search functionality (ranked full-text search over MentorSearchDocument)
     search_query = request.GET.get('search', '')
     if search_query:
-        mentors = mentors.filter(
-            Q(full_name__icontains=search_query) |
-            Q(headline__icontains=search_query) |
-            Q(bio__icontains=search_query) |
-            Q(skills__name__icontains=search_query)
-        ).distinct()
+        mentors = search_mentors(mentors, search_query)
     
-    # Filter by skills
-    skill_filter = request.GET.get('skill')
-    if skill_filter:
-        mentors = mentors.filter(skills__name__icontains=skill_filter)
+    # Filter by skills: ?skill=python&skill=django, all of them by default or any with match=any
+    selected_skills = [s for s in request.GET.getlist('skill') if s.strip()]
+    skill_match = 'any' if request.GET.get('match') == 'any' else 'all'
+    if selected_skills:
+        result_ids = match_skills(postings, selected_skills, skill_match)
+        mentors = mentors.filter(id__in=result_ids)
+    if search_query:
+        result_ids = set(mentors.values_list('id', flat=True))
     
-    # Pagination
-    paginator = Paginator(mentors, 12)
-    page_number = request.GET.get('page')
-    mentors = paginator.get_page(page_number)
+    # Pagination: ranked search results page by offset, the plain listing by keyset
+    if search_query:
+        mentors = Paginator(mentors, 12).get_page(request.GET.get('page'))
+    else:
+        mentors = paginate(request, mentors, 12, ordering=('-created_at',), count=None)
     
-    skills = Skill.objects.all()
+    # "Next available" badge for the mentors on this page, one batched lookup
+    next_slots = next_available_slots(mentors)
+    for mentor in mentors:
+        mentor.next_available_slot = next_slots.get(mentor.id)
+    
+    # Current filters without the page number, for pagination links
+    filter_params = request.GET.copy()
+    filter_params.pop('page', None)
     
     return render(request, 'find_mentors.html', {
         'mentors': mentors,
-        'skills': skills,
+        'skill_facets': skill_facets(postings, result_ids, selected_skills),
         'search_query': search_query,
-        'selected_skill': skill_filter
+        'selected_skills': selected_skills,
+        'skill_match': skill_match,
+        'filter_query': filter_params.urlencode(),
     })
 
 def mentor_detail(request, mentor_id):
@@ -393,21 +416,40 @@ def superuser_required(view_func):
 
 @staff_required
 def admin_dashboard(request):
-    total_users = User.objects.count()
-    total_mentors = MentorProfile.objects.count()
-    pending_mentors = MentorProfile.objects.filter(application_status='pending').count()
-    approved_mentors = MentorProfile.objects.filter(application_status='approved').count()
-    total_skills = Skill.objects.count()
+    # Cached counters (main/metrics.py) and trends from the DailyStats rollup
+    counters = dashboard_counters()
+    trends = daily_trends(days=7)
     recent_feedbacks = MentorFeedback.objects.select_related('mentor', 'mentee', 'session')[:10]
     return render(request, 'admin/dashboard.html', {
-        'total_users': total_users,
-        'total_mentors': total_mentors,
-        'pending_mentors': pending_mentors,
-        'approved_mentors': approved_mentors,
-        'total_skills': total_skills,
+        **counters,
+        'trends': trends,
         'recent_feedbacks': recent_feedbacks,
     })
 
+@staff_required
+def admin_reports(request):
+    """Sessions, revenue and feedback per period, mentor and skill, from the daily rollup."""
+    today = timezone.localdate()
+    try:
+        end = datetime.strptime(request.GET.get('end', ''), '%Y-%m-%d').date()
+    except ValueError:
+        end = today
+    try:
+        start = datetime.strptime(request.GET.get('start', ''), '%Y-%m-%d').date()
+    except ValueError:
+        start = end - timedelta(days=29)
+    period = request.GET.get('period', 'week')
+    if period not in ROLLUP_PERIODS:
+        period = 'week'
+    
+    return render(request, 'admin/reports.html', {
+        'report': rollup_report(start, end, period),
+        'start': start,
+        'end': end,
+        'period': period,
+        'rollup_state': RollupState.objects.filter(name=ROLLUP_NAME).first(),
+    })
+
 @staff_required
 def admin_mentors(request):
     status_filter = request.GET.get('status')
@@ -417,10 +459,8 @@ def admin_mentors(request):
     search = request.GET.get('q', '')
     if search:
         mentors = mentors.filter(Q(full_name__icontains=search) | Q(headline__icontains=search) | Q(user__username__icontains=search))
-    mentors = mentors.select_related('user').prefetch_related('skills').order_by('-created_at')
-    paginator = Paginator(mentors, 20)
-    page = request.GET.get('page')
-    mentors_page = paginator.get_page(page)
+    mentors = mentors.select_related('user').prefetch_related('skills')
+    mentors_page = paginate(request, mentors, 20, ordering=('-created_at',))
     return render(request, 'admin/mentors.html', {'mentors': mentors_page, 'search': search, 'status_filter': status_filter})
 
 @staff_required
@@ -479,13 +519,21 @@ def mentor_view(request,pk):
     return render(request,'admin/mentor_view.html',{'mentor':isinstance})
 
 
+def filter_users(request, users):
+    """Apply the admin user list's ?q= search (shared with the export)."""
+    search = request.GET.get('q', '')
+    if search:
+        users = users.filter(
+            Q(username__icontains=search) | Q(email__icontains=search) |
+            Q(first_name__icontains=search) | Q(last_name__icontains=search)
+        )
+    return users, search
+
 @staff_required
 def admin_users(request):
-    users = User.objects.all().order_by('-date_joined')
-    paginator = Paginator(users, 20)
-    page = request.GET.get('page')
-    users_page = paginator.get_page(page)
-    return render(request, 'admin/users.html', {'users': users_page})
+    users, search = filter_users(request, User.objects.all())
+    users_page = paginate(request, users, 20, ordering=('-date_joined',))
+    return render(request, 'admin/users.html', {'users': users_page, 'search': search})
 
 @staff_required
 def admin_user_edit(request, user_id):
@@ -517,6 +565,37 @@ def admin_user_delete(request, user_id):
         return redirect('admin_users')
     return render(request, 'admin/user_form.html', { 'user_obj': user, 'confirm_delete': True })
 
+@superuser_required
+def admin_mentor_import(request):
+    """Upload a mentors CSV; see main/mentor_import.py for the columns."""
+    result = None
+    error = None
+    dry_run = True
+    if request.method == 'POST':
+        dry_run = bool(request.POST.get('dry_run'))
+        upload = request.FILES.get('file')
+        if not upload:
+            error = 'Choose a CSV file to upload.'
+        else:
+            try:
+                # Decoded line by line as the rows are validated, never read whole
+                result = run_mentor_import(
+                    codecs.iterdecode(upload, 'utf-8-sig'),
+                    dry_run=dry_run,
+                    skip_invalid=bool(request.POST.get('skip_invalid')),
+                )
+            except UnicodeDecodeError:
+                error = 'The file is not UTF-8 encoded.'
+
+    return render(request, 'admin/mentor_import.html', {
+        'result': result,
+        'error': error,
+        'dry_run': dry_run,
+        'errors': result.errors[:200] if result else [],
+        'required_columns': MENTOR_IMPORT_REQUIRED,
+        'optional_columns': MENTOR_IMPORT_OPTIONAL,
+    })
+
 @superuser_required
 def admin_mentor_add(request):
     skills = Skill.objects.all().order_by('name')
@@ -673,56 +752,55 @@ def book_session(request, mentor_id):
             duration_minutes = form.cleaned_data['duration_minutes']
             notes = form.cleaned_data['notes']
             
-            # Check if mentor is available at this time
-            existing_session = Session.objects.filter(
-                mentor=mentor,
-                session_date=session_date,
-                session_time=session_time,
-                status__in=['pending', 'confirmed']
-            ).exists()
-            
-            if existing_session:
-                messages.error(request, "This time slot is already booked. Please choose another time.")
-            else:
-                # Create session
-                session = Session.objects.create(
-                    mentor=mentor,
-                    mentee=request.user,
-                    session_date=session_date,
-                    session_time=session_time,
-                    duration_minutes=duration_minutes,
-                    meeting_notes=notes,
-                    amount_paid=(mentor.hourly_rate * (Decimal(duration_minutes) / Decimal('60'))).quantize(Decimal('0.01')),
-                    payment_status='pending'
+            try:
+                # Locks the mentor, re-checks availability/overlap and reserves the time
+                # for the mentee while they pay
+                hold = create_hold(
+                    mentor,
+                    request.user,
+                    session_date,
+                    session_time,
+                    duration_minutes,
+                    notes=notes,
                 )
-                
-                # Store session ID in session for payment flow
-                request.session['pending_session_id'] = session.id
-                return redirect('payment_page', session_id=session.id)
+            except BookingError as e:
+                messages.error(request, str(e))
+            else:
+                # Store hold ID in session for payment flow
+                request.session['pending_hold_id'] = hold.id
+                return redirect('payment_page', hold_id=hold.id)
     else:
-        form = BookingForm()
+        form = BookingForm(initial={'duration_minutes': mentor.session_duration})
     
     return render(request, 'booking/book_session.html', {
         'mentor': mentor,
-        'form': form
+        'form': form,
+        'available_slots': free_slots(mentor),
     })
 
 @login_required
-def payment_page(request, session_id):
+def payment_page(request, hold_id):
     """Dummy payment page"""
-    session = get_object_or_404(Session, id=session_id, mentee=request.user, payment_status='pending')
+    hold = SlotHold.objects.select_related('mentor').filter(id=hold_id, mentee=request.user).first()
+    if hold is None:
+        # Already paid, or expired and swept by expire_slot_holds
+        messages.error(request, "Your reservation has expired. Please book the session again.")
+        return redirect('find_mentors')
     
     if request.method == 'POST':
-        # Simulate payment success
-        session.payment_status = 'completed'
-        # Do NOT auto-confirm; wait for mentor acceptance
-        # Keep status as 'pending' until mentor accepts
-        session.save()
+        # Simulate payment success; the session is created paid but stays 'pending'
+        # until the mentor accepts
+        try:
+            session = confirm_hold(hold)
+        except BookingError as e:
+            messages.error(request, str(e))
+            return redirect('book_session', mentor_id=hold.mentor_id)
+        request.session.pop('pending_hold_id', None)
         
         messages.success(request, "Payment successful! Your session is awaiting mentor approval.")
         return redirect('session_confirmation', session_id=session.id)
     
-    return render(request, 'booking/payment.html', {'session': session})
+    return render(request, 'booking/payment.html', {'session': hold, 'hold': hold})
 
 @login_required
 def session_confirmation(request, session_id):
@@ -750,41 +828,39 @@ def mentor_session_accept(request, session_id):
         return redirect('mentor_session_detail', session_id=session.id)
 
     session.status = 'confirmed'
-    if not session.meeting_link:
-        session.generate_meeting_link()
     session.save()
 
-    # Notify both parties
-    try:
-        send_session_confirmation_emails(session)
-    except Exception:
-        pass
+    # Create the Meet link and notify both parties in the background; the emails
+    # include the link, so they're sent once it exists
+    queue_meeting_link(session.id, notify='confirmation')
 
     messages.success(request, "Session accepted and confirmed. The mentee has been notified.")
     return redirect('mentor_session_detail', session_id=session.id)
 
 @login_required
 def mentee_dashboard(request):
-    """Mentee dashboard showing upcoming sessions"""
-    upcoming_sessions = Session.objects.filter(
-        mentee=request.user,
-        status__in=['confirmed', 'pending'],
-        session_date__gte=timezone.now().date()
-    ).order_by('session_date', 'session_time')
-    
-    past_sessions = Session.objects.filter(
-        mentee=request.user,
-        status='completed'
-    ).order_by('-session_date', '-session_time')[:10]
-    cancelled_sessions = Session.objects.filter(
-        mentee=request.user,
-        status='cancelled'
-    ).order_by('-session_date', '-session_time')[:10]
+    """Mentee dashboard showing upcoming, recent and cancelled sessions (one query)"""
+    sessions = dashboard_sessions({'mentee': request.user}, related='mentor')
     
     return render(request, 'dashboard/mentee_dashboard.html', {
-        'upcoming_sessions': upcoming_sessions,
-        'past_sessions': past_sessions,
-        'sessions_cancelled': cancelled_sessions
+        'upcoming_sessions': sessions['upcoming'],
+        'upcoming_more': sessions['upcoming_more'],
+        'past_sessions': sessions['past'],
+        'past_more': sessions['past_more'],
+        'sessions_cancelled': sessions['cancelled'],
+        'cancelled_more': sessions['cancelled_more'],
+    })
+
+
+@login_required
+def mentee_session_history(request, kind):
+    """Older completed or cancelled sessions of the mentee, one page at a time"""
+    if kind not in HISTORY_STATUSES:
+        return redirect('mentee_dashboard')
+    return render(request, 'dashboard/session_history.html', {
+        'sessions': session_history(request, {'mentee': request.user}, 'mentor', kind),
+        'kind': kind,
+        'as_mentor': False,
     })
 
 
@@ -834,21 +910,32 @@ def mentor_dashboard(request):
         messages.info(request, "You don't have a mentor profile. Please contact an admin.")
         return redirect('home')
     
-    upcoming_sessions = Session.objects.filter(
-        mentor=mentor_profile,
-        status__in=['confirmed', 'pending'],
-        session_date__gte=timezone.now().date()
-    ).order_by('session_date', 'session_time')
-    
-    past_sessions = Session.objects.filter(
-        mentor=mentor_profile,
-        status='completed'
-    ).order_by('-session_date', '-session_time')
+    sessions = dashboard_sessions({'mentor': mentor_profile}, related='mentee', limits={'cancelled': 0})
     
     return render(request, 'dashboard/mentor_dashboard.html', {
         'mentor_profile': mentor_profile,
-        'upcoming_sessions': upcoming_sessions,
-        'past_sessions': past_sessions
+        'upcoming_sessions': sessions['upcoming'],
+        'upcoming_more': sessions['upcoming_more'],
+        'past_sessions': sessions['past'],
+        'past_more': sessions['past_more'],
+        # Cancelled sessions aren't listed here, only linked to
+        'cancelled_more': sessions['cancelled_more'],
+    })
+
+
+@login_required
+def mentor_session_history(request, kind):
+    """Older completed or cancelled sessions of the mentor, one page at a time"""
+    try:
+        mentor_profile = request.user.mentor_profile
+    except MentorProfile.DoesNotExist:
+        return redirect('home')
+    if kind not in HISTORY_STATUSES:
+        return redirect('mentor_dashboard')
+    return render(request, 'dashboard/session_history.html', {
+        'sessions': session_history(request, {'mentor': mentor_profile}, 'mentee', kind),
+        'kind': kind,
+        'as_mentor': True,
     })
 
 
@@ -895,95 +982,31 @@ def mentor_session_set_status(request, session_id):
         return redirect('mentor_session_detail', session_id=session.id)
 
     old_status = session.status
+    if old_status == action:
+        # Repeated submit; the mentee was already notified
+        messages.info(request, f"Session is already {session.get_status_display().lower()}.")
+        return redirect('mentor_session_detail', session_id=session.id)
+
     session.status = action
     # If cancelled, payment_status might remain as-is; for now we don't alter payment fields
-    session.save()
-
-    # Notify mentee and mentor
-    try:
-        subject = f'Session {session.get_status_display()} - CodeMentorHub'
-        if session.status == 'cancelled':
-            message = (
-                f'Hello {session.mentee.first_name or session.mentee.username},\n\n'
-                f'We’re sorry to inform you that your session with {session.mentor.full_name} on {session.session_date} at {session.session_time} was cancelled by the mentor.\n\n'
-                f'A refund will be credited to your original payment method within 3 business days.\n\n'
-                f'If you have any questions, please contact support.\n\n'
-                f'Best,\nCodeMentorHub Team'
-            )
-        else:
-            message = (
-                f'Hello {session.mentee.first_name or session.mentee.username},\n\n'
-                f'Your session with {session.mentor.full_name} scheduled on {session.session_date} at {session.session_time} has been marked as {session.get_status_display().lower()}.\n\n'
-                f'If you have any questions, please contact the mentor or support.\n\n'
-                f'Best,\nCodeMentorHub Team'
-            )
-
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [session.mentee.email],
-            fail_silently=True,
-        )
-    except Exception:
-        # Fail silently for email sending in development
-        pass
+    with transaction.atomic():
+        session.save()
+        # Notify mentee; the email is committed (or rolled back) with the status change
+        queue_emails(mentor_status_emails(session), scope=session_scope(session))
+        if session.status == 'cancelled' and session.calendar_event_id:
+            # Remove the event (and its invitations) from the attendees' calendars
+            enqueue('cancel_calendar_event', session_id=session.id)
 
     messages.success(request, f"Session marked as {session.get_status_display().lower()}.")
     return redirect('mentor_session_detail', session_id=session.id)
 
-def send_session_confirmation_emails(session):
-    """Send confirmation emails to both mentor and mentee"""
-    try:
-        # Email to mentee
-        send_mail(
-            'Session Booked Successfully - CodeMentorHub',
-            f'Hello {session.mentee.first_name or session.mentee.username},\n\n'
-            f'Your session with {session.mentor.full_name} has been confirmed!\n\n'
-            f'Session Details:\n'
-            f'Date: {session.session_date}\n'
-            f'Time: {session.session_time}\n'
-            f'Duration: {session.duration_minutes} minutes\n'
-            f'Meeting Link: {session.meeting_link}\n\n'
-            f'Please join the meeting 5 minutes before the scheduled time.\n\n'
-            f'Best regards,\nCodeMentorHub Team',
-            settings.DEFAULT_FROM_EMAIL,
-            [session.mentee.email],
-            fail_silently=False,
-        )
-        
-        # Email to mentor (only if mentor has a linked user with email)
-        if getattr(session.mentor, 'user', None) and session.mentor.user and session.mentor.user.email:
-            send_mail(
-                'New Session Booked - CodeMentorHub',
-                f'Hello {session.mentor.full_name},\n\n'
-                f'You have a new session booked with {session.mentee.first_name or session.mentee.username}!\n\n'
-                f'Session Details:\n'
-                f'Date: {session.session_date}\n'
-                f'Time: {session.session_time}\n'
-                f'Duration: {session.duration_minutes} minutes\n'
-                f'Meeting Link: {session.meeting_link}\n\n'
-                f'Please be ready 5 minutes before the scheduled time.\n\n'
-                f'Best regards,\nCodeMentorHub Team',
-                settings.DEFAULT_FROM_EMAIL,
-                [session.mentor.user.email],
-                fail_silently=False,
-            )
-    except Exception as e:
-        print(f"Email sending failed: {e}")
-
-
 # Admin Sessions Management
 
-@staff_required
-def admin_sessions(request):
-    """Admin view to see all booked sessions with user details."""
+def filter_sessions(request, sessions):
+    """Apply the admin session list's ?status= and ?q= filters (shared with the export)."""
     status_filter = request.GET.get('status', '')
     search = request.GET.get('q', '')
     
-    # Get all sessions
-    sessions = Session.objects.select_related('mentor', 'mentor__user', 'mentee').order_by('-session_date', '-session_time')
-    
     # Filter by status
     if status_filter in ['pending', 'confirmed', 'completed', 'cancelled']:
         sessions = sessions.filter(status=status_filter)
@@ -996,11 +1019,17 @@ def admin_sessions(request):
             Q(mentee__email__icontains=search) |
             Q(mentee__first_name__icontains=search)
         )
+    return sessions, status_filter, search
+
+
+@staff_required
+def admin_sessions(request):
+    """Admin view to see all booked sessions with user details."""
+    sessions = Session.objects.select_related('mentor', 'mentor__user', 'mentee')
+    sessions, status_filter, search = filter_sessions(request, sessions)
     
-    # Pagination
-    paginator = Paginator(sessions, 20)
-    page = request.GET.get('page')
-    sessions_page = paginator.get_page(page)
+    # Pagination (keyset when CURSOR_PAGINATION is enabled)
+    sessions_page = paginate(request, sessions, 20, ordering=('-session_date', '-session_time'))
     
     return render(request, 'admin/sessions.html', {
         'sessions': sessions_page,
@@ -1035,83 +1064,23 @@ def admin_session_set_status(request, session_id):
         session.admin_provided_link = meeting_link
         session.link_provided_at = timezone.now()
     
-    # Generate Google Meet link only if no link provided and status is confirmed
-    if session.status == 'confirmed' and not session.admin_provided_link and not session.meeting_link:
-        session.generate_meeting_link()
-    
-    session.save()
+    if old_status == session.status and not meeting_link:
+        # Repeated submit; everyone was already notified
+        messages.info(request, f"Session is already {session.get_status_display()}.")
+        return redirect('admin_sessions')
     
-    # Notify mentee and mentor about status change via email
-    try:
-        if session.mentee.email:
-            subject = f'Session {session.get_status_display()} - CodeMentorHub'
-            
-            if session.status == 'completed':
-                message = (
-                    f'Hello {session.mentee.first_name or session.mentee.username},\n\n'
-                    f'Your session with {session.mentor.full_name} on {session.session_date} at {session.session_time} has been marked as completed.\n\n'
-                    f'Thank you for using CodeMentorHub!\n\n'
-                    f'Best regards,\nCodeMentorHub Team'
-                )
-            elif session.status == 'cancelled':
-                message = (
-                    f'Hello {session.mentee.first_name or session.mentee.username},\n\n'
-                    f'Your session with {session.mentor.full_name} on {session.session_date} at {session.session_time} has been cancelled.\n\n'
-                    f'If you have any questions, please contact support.\n\n'
-                    f'Best regards,\nCodeMentorHub Team'
-                )
-            elif session.status == 'confirmed':
-                # Get the meeting link (either admin-provided or auto-generated)
-                display_link = session.get_meeting_link
-                message = (
-                    f'Hello {session.mentee.first_name or session.mentee.username},\n\n'
-                    f'Your session with {session.mentor.full_name} has been confirmed!\n\n'
-                    f'Session Details:\n'
-                    f'Date: {session.session_date}\n'
-                    f'Time: {session.session_time}\n'
-                    f'Duration: {session.duration_minutes} minutes\n'
-                    f'Meeting Link: {display_link}\n\n'
-                    f'Please join the meeting 5 minutes before the scheduled time.\n\n'
-                    f'Best regards,\nCodeMentorHub Team'
-                )
-            else:
-                message = (
-                    f'Hello {session.mentee.first_name or session.mentee.username},\n\n'
-                    f'Your session with {session.mentor.full_name} on {session.session_date} at {session.session_time} status has been updated to {session.get_status_display()}.\n\n'
-                    f'Best regards,\nCodeMentorHub Team'
-                )
-            
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [session.mentee.email],
-                fail_silently=True,
-            )
+    with transaction.atomic():
+        session.save()
         
-        # Send email to mentor as well if confirmed
-        if session.status == 'confirmed' and getattr(session.mentor, 'user', None) and session.mentor.user and session.mentor.user.email:
-            display_link = session.get_meeting_link
-            mentor_message = (
-                f'Hello {session.mentor.full_name},\n\n'
-                f'Your session with {session.mentee.first_name or session.mentee.username} has been confirmed!\n\n'
-                f'Session Details:\n'
-                f'Date: {session.session_date}\n'
-                f'Time: {session.session_time}\n'
-                f'Duration: {session.duration_minutes} minutes\n'
-                f'Meeting Link: {display_link}\n\n'
-                f'Please join the meeting 5 minutes before the scheduled time.\n\n'
-                f'Best regards,\nCodeMentorHub Team'
-            )
-            send_mail(
-                'Session Confirmed - CodeMentorHub',
-                mentor_message,
-                settings.DEFAULT_FROM_EMAIL,
-                [session.mentor.user.email],
-                fail_silently=True,
-            )
-    except Exception:
-        pass
+        # Notify mentee and mentor about status change via email, in the same transaction.
+        # A confirmed session without a link gets its Google Meet link generated first,
+        # in the background.
+        if session.status == 'confirmed' and not session.admin_provided_link and not session.meeting_link:
+            queue_meeting_link(session.id, notify='admin_status')
+        else:
+            queue_emails(admin_status_emails(session), scope=session_scope(session))
+        if session.status == 'cancelled' and session.calendar_event_id:
+            enqueue('cancel_calendar_event', session_id=session.id)
     
     messages.success(request, f"Session marked as {session.get_status_display()}. All parties have been notified.")
     return redirect('admin_sessions')
@@ -1132,15 +1101,160 @@ def hire_developer_view(request):
     return render(request, 'hire_developer.html', { 'form': form })
 
 
+INBOX_STATES = ['unread', 'read', 'all']
+
+
+def _filter_inbox_state(request, queryset):
+    state = request.GET.get('state', 'unread')
+    if state not in INBOX_STATES:
+        state = 'unread'
+    if state == 'unread':
+        # Served from the partial index on unread rows
+        queryset = queryset.filter(read_at__isnull=True)
+    elif state == 'read':
+        queryset = queryset.filter(read_at__isnull=False)
+    return queryset, state
+
+
+def filter_hire_requests(request, requests):
+    """Apply the hire request inbox's filters (shared with the export).
+
+    ?state=unread|read|all, ?q= text search, ?project_type= and a
+    ?deadline_from= / ?deadline_to= range (YYYY-MM-DD).
+    """
+    requests, state = _filter_inbox_state(request, requests)
+    filters = {'state': state, 'q': request.GET.get('q', '').strip(), 'project_type': '', 'deadline_from': '', 'deadline_to': ''}
+    if filters['q']:
+        search = filters['q']
+        requests = requests.filter(
+            Q(name__icontains=search) | Q(email__icontains=search) |
+            Q(project_heading__icontains=search) | Q(project_details__icontains=search) |
+            Q(message__icontains=search)
+        )
+    project_type = request.GET.get('project_type', '')
+    if project_type in dict(PROJECT_TYPE_CHOICES):
+        requests = requests.filter(project_type=project_type)
+        filters['project_type'] = project_type
+    for param, lookup in (('deadline_from', 'deadline__gte'), ('deadline_to', 'deadline__lte')):
+        try:
+            day = datetime.strptime(request.GET.get(param, ''), '%Y-%m-%d').date()
+        except ValueError:
+            continue
+        requests = requests.filter(**{lookup: day})
+        filters[param] = day.isoformat()
+    return requests, filters
+
+def filter_contact_messages(request, contact_messages):
+    """Apply the contact inbox's ?state=unread|read|all and ?q= filters (shared with the export)."""
+    contact_messages, state = _filter_inbox_state(request, contact_messages)
+    filters = {'state': state, 'q': request.GET.get('q', '').strip()}
+    if filters['q']:
+        search = filters['q']
+        contact_messages = contact_messages.filter(
+            Q(name__icontains=search) | Q(email__icontains=search) |
+            Q(subject__icontains=search) | Q(message__icontains=search)
+        )
+    return contact_messages, filters
+
+def _inbox_query(filters):
+    """The current filters as a query string, for pagination and export links."""
+    return urlencode({key: value for key, value in filters.items() if value})
+
 @staff_required
 def hire_developer_data_view(request):
-    data=hire_developer.objects.all()
-    return render(request, 'admin/hire_developer_data.html',{'data':data})
+    data, filters = filter_hire_requests(request, hire_developer.objects.all())
+    page = paginate(request, data, 25, ordering=('-created_at',))
+    return render(request, 'admin/hire_developer_data.html', {
+        'data': page,
+        'filters': filters,
+        'filter_query': _inbox_query(filters),
+        'project_types': PROJECT_TYPE_CHOICES,
+    })
 
 @staff_required
 def contact_messages_view(request):
-    messages = ContactMessage.objects.all()
-    return render(request, 'admin/contact_messages.html', {'messages': messages})
+    contact_messages, filters = filter_contact_messages(request, ContactMessage.objects.all())
+    page = paginate(request, contact_messages, 25, ordering=('-created_at',))
+    return render(request, 'admin/contact_messages.html', {
+        'contact_messages': page,
+        'filters': filters,
+        'filter_query': _inbox_query(filters),
+    })
+
+INBOXES = {
+    'hire-requests': (hire_developer, 'hire_developer_data'),
+    'contact-messages': (ContactMessage, 'contact_messages'),
+}
+
+@staff_required
+def admin_inbox_mark(request, inbox):
+    """Mark the POSTed ids of an inbox read (action=read) or unread (action=unread) in one UPDATE."""
+    if request.method != 'POST' or inbox not in INBOXES:
+        return redirect('admin_dashboard')
+    model, list_view = INBOXES[inbox]
+    ids = [int(i) for i in request.POST.getlist('ids') if i.isdigit()]
+    if request.POST.get('action') == 'unread':
+        model.objects.filter(id__in=ids).update(read_at=None)
+    else:
+        model.objects.filter(id__in=ids, read_at__isnull=True).update(read_at=timezone.now())
+    next_query = request.POST.get('next', '')
+    return redirect(reverse(list_view) + (f'?{next_query}' if next_query else ''))
+
+
+# Streaming exports: dataset -> (base queryset, filter, ordering, columns)
+EXPORTS = {
+    'sessions': (
+        lambda: Session.objects.all(), filter_sessions, ('-session_date', '-session_time', '-id'), [
+            ('id', 'id'), ('session_date', 'session_date'), ('session_time', 'session_time'),
+            ('duration_minutes', 'duration_minutes'), ('status', 'status'),
+            ('mentor_id', 'mentor_id'), ('mentor', 'mentor__full_name'),
+            ('mentee_id', 'mentee_id'), ('mentee_username', 'mentee__username'), ('mentee_email', 'mentee__email'),
+            ('amount_paid', 'amount_paid'), ('payment_status', 'payment_status'),
+            ('meeting_link', 'meeting_link'), ('created_at', 'created_at'),
+        ],
+    ),
+    'users': (
+        lambda: User.objects.all(), filter_users, ('-date_joined', '-id'), [
+            ('id', 'id'), ('username', 'username'), ('email', 'email'),
+            ('first_name', 'first_name'), ('last_name', 'last_name'),
+            ('is_staff', 'is_staff'), ('is_active', 'is_active'),
+            ('date_joined', 'date_joined'), ('last_login', 'last_login'),
+        ],
+    ),
+    'hire-requests': (
+        lambda: hire_developer.objects.all(), filter_hire_requests, ('-created_at', '-id'), [
+            ('id', 'id'), ('created_at', 'created_at'), ('read_at', 'read_at'), ('name', 'name'), ('email', 'email'), ('phone', 'number'),
+            ('project_type', 'project_type'), ('project_heading', 'project_heading'),
+            ('project_details', 'project_details'), ('message', 'message'), ('deadline', 'deadline'),
+        ],
+    ),
+    'contact-messages': (
+        lambda: ContactMessage.objects.all(), filter_contact_messages, ('-created_at', '-id'), [
+            ('id', 'id'), ('created_at', 'created_at'), ('read_at', 'read_at'), ('name', 'name'), ('email', 'email'),
+            ('subject', 'subject'), ('message', 'message'),
+        ],
+    ),
+}
+
+
+@staff_required
+def admin_export(request, dataset):
+    """Stream a staff list as ?format=csv (default) or ndjson, with the list view's filters.
+
+    Sessions can also be limited to a session_date range with ?start= and ?end= (YYYY-MM-DD).
+    """
+    if dataset not in EXPORTS:
+        messages.error(request, "Unknown export.")
+        return redirect('admin_dashboard')
+    base, apply_filters, ordering, columns = EXPORTS[dataset]
+    queryset = apply_filters(request, base())[0]
+    if dataset == 'sessions':
+        for param, lookup in (('start', 'session_date__gte'), ('end', 'session_date__lte')):
+            try:
+                queryset = queryset.filter(**{lookup: datetime.strptime(request.GET.get(param, ''), '%Y-%m-%d').date()})
+            except ValueError:
+                pass
+    return stream_export(queryset.order_by(*ordering), columns, dataset, request.GET.get('format', 'csv'))
 
 
 @staff_required
@@ -1166,8 +1280,69 @@ def admin_add_category(request):
 @staff_required
 def admin_category_detail(request, category_id):
     category = get_object_or_404(Category, id=category_id)
-    questions = category.questions.all()
-    return render(request, 'admin/quiz_category_detail.html', {'category': category, 'questions': questions})
+    questions = list(category.questions.select_related('stats').prefetch_related('options').order_by('id'))
+    for q in questions:
+        # Item analysis from `manage.py rollup_question_stats` (main/question_stats.py)
+        q.question_stats = getattr(q, 'stats', None)
+        q.stat_flags = question_flags(q.question_stats)
+        q.option_rates = [
+            (opt, q.question_stats.option_rate(opt.id) if q.question_stats else None)
+            for opt in q.options.all()
+        ]
+    return render(request, 'admin/quiz_category_detail.html', {
+        'category': category,
+        'questions': questions,
+        'stats_state': RollupState.objects.filter(name=QUESTION_STATS_NAME).first(),
+    })
+
+
+@staff_required
+def admin_category_export(request, category_id):
+    """Download the category's questions and options as JSON or CSV (main/question_bank.py)."""
+    category = get_object_or_404(Category, id=category_id)
+    fmt = request.GET.get('format', 'json')
+    if fmt == 'csv':
+        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        csv.writer(response).writerows(export_csv_rows(category))
+    else:
+        fmt = 'json'
+        response = HttpResponse(export_json(category), content_type='application/json; charset=utf-8')
+    filename = slugify(category.name) or f'category-{category.id}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}-questions.{fmt}"'
+    return response
+
+
+@staff_required
+def admin_category_import(request, category_id):
+    """Upload a JSON or CSV question bank into the category; nothing is saved unless every question is valid."""
+    category = get_object_or_404(Category, id=category_id)
+    result = None
+    error = None
+    dry_run = False
+    if request.method == 'POST':
+        dry_run = bool(request.POST.get('dry_run'))
+        upload = request.FILES.get('file')
+        if not upload:
+            error = 'Choose a JSON or CSV file to upload.'
+        else:
+            fmt = 'csv' if upload.name.lower().endswith('.csv') else 'json'
+            try:
+                text = upload.read().decode('utf-8-sig')
+            except UnicodeDecodeError:
+                error = 'The file is not UTF-8 encoded.'
+            else:
+                result = run_bank_import(category, text, fmt, dry_run=dry_run)
+                if result.imported:
+                    messages.success(request, f'Imported {result.imported} question(s).')
+                    return redirect('admin_category_detail', category_id=category.id)
+
+    return render(request, 'admin/quiz_import.html', {
+        'category': category,
+        'result': result,
+        'error': error,
+        'dry_run': dry_run,
+        'errors': result.errors[:200] if result else [],
+    })
 
 
 @staff_required
@@ -1221,58 +1396,62 @@ def quiz_categories(request):
 @login_required
 def take_test(request, category_id):
     category = get_object_or_404(Category, id=category_id)
-    questions = category.questions.prefetch_related('options').all()
+    # Questions, options and correct answers come from the cached answer key
+    answer_key = get_answer_key(category.id, category.answer_key_version)
 
     if request.method == 'POST':
-        # Create attempt record
-        total_marks = sum(q.marks for q in questions)
-        attempt = TestAttempt.objects.create(user=request.user, category=category, total_marks=total_marks)
-        score = 0
-
-        for q in questions:
-            field_name = f"q_{q.id}"
-            selected_option_ids = request.POST.getlist(field_name)
-            
-            all_options = list(q.options.all())
-            correct_option_ids = [opt.id for opt in all_options if opt.is_correct]
-            
-            user_set = {int(oid) for oid in selected_option_ids}
-            correct_set = set(correct_option_ids)
-            is_correct = (user_set == correct_set)
-            
-            marks_awarded = q.marks if is_correct else 0
-            selected_options_list = [opt for opt in all_options if opt.id in user_set]
-            
-            # First element for legacy selected_option compatibility
-            legacy_option = selected_options_list[0] if selected_options_list else None
-            
-            answer = AttemptAnswer.objects.create(
-                attempt=attempt,
-                question=q,
-                selected_option=legacy_option,
-                is_correct=is_correct,
-                marks_awarded=marks_awarded
-            )
-            if selected_options_list:
-                answer.selected_options.set(selected_options_list)
-            
-            score += marks_awarded
-
-        attempt.score = score
-        attempt.completed = True
-        attempt.completed_at = timezone.now()
-        attempt.save()
-
-        return redirect('test_result', attempt_id=attempt.id)
-
-    return render(request, 'quiz/take_test.html', {'category': category, 'questions': questions})
+        attempt = None
+        question_ids = None
+        attempt_id = request.POST.get('attempt_id', '')
+        if attempt_id.isdigit():
+            # A sampled test: grade only the questions that were served
+            attempt = TestAttempt.objects.filter(id=attempt_id, user=request.user, category=category).first()
+            if attempt is None:
+                messages.error(request, 'That test attempt was not found. Please start again.')
+                return redirect('take_test', category_id=category.id)
+            if attempt.completed:
+                return redirect('test_result', attempt_id=attempt.id)
+            question_ids = attempt.served_question_ids
+        elif is_sampled(category, answer_key):
+            # Only the served sample may be graded, never the whole pool
+            messages.error(request, 'Your test session was not found. Please answer the questions below.')
+            return redirect('take_test', category_id=category.id)
+
+        # Graded in memory, then stored in a fixed number of queries
+        selections = selections_from_post(request.POST, answer_key.question_ids if question_ids is None else question_ids)
+        answers, score, total_marks = grade(answer_key, selections, question_ids)
+        completed = record_attempt(request.user, category, answers, score, total_marks, attempt=attempt)
+        return redirect('test_result', attempt_id=(completed or attempt).id)
+
+    attempt = None
+    questions = answer_key.questions
+    if is_sampled(category, answer_key):
+        attempt = open_attempt(request.user, category, answer_key)
+        questions = served_questions(answer_key, attempt.served_question_ids)
+
+    return render(request, 'quiz/take_test.html', {'category': category, 'questions': questions, 'attempt': attempt})
 
 
 @login_required
 def test_result(request, attempt_id):
-    attempt = get_object_or_404(TestAttempt, id=attempt_id, user=request.user)
+    attempt = get_object_or_404(TestAttempt, id=attempt_id, user=request.user, completed=True)
     answers = attempt.answers.select_related('question', 'selected_option').prefetch_related('selected_options', 'question__options').all()
-    return render(request, 'quiz/result.html', {'attempt': attempt, 'answers': answers})
+    return render(request, 'quiz/result.html', {
+        'attempt': attempt,
+        'answers': answers,
+        # Both read the maintained leaderboard tables, not TestAttempt
+        'percentile': attempt_percentile(attempt),
+        'leaders': leaderboard(attempt.category_id),
+    })
+
+
+@login_required
+def quiz_leaderboard(request, category_id):
+    category = get_object_or_404(Category, id=category_id)
+    return render(request, 'quiz/leaderboard.html', {
+        'category': category,
+        'leaders': leaderboard(category.id, limit=LEADERBOARD_PAGE_SIZE),
+    })
 
 
 # Delete Category View
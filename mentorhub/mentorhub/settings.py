@@ -13,6 +13,7 @@ SECRET_KEY = 'DyP3nL4XDf3Jt40PSUCVcx5TJJ09USTQMvshcXnGyQg-tf_afPb7vGYw4tW8E01XNE
 
 from pathlib import Path
 import os
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -54,6 +55,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'main.querybudget.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'mentorhub.urls'
@@ -155,6 +157,59 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')  # your Gmail address
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')  # your Gmail App Password
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER or 'noreply@codementorhub.com')
 
+# Google Meet & Calendar API (see main/google_meet_helper.py)
+GOOGLE_CALENDAR_API_ENABLED = os.environ.get('GOOGLE_CALENDAR_API_ENABLED', '').lower() in ('1', 'true', 'yes')
+GOOGLE_CALENDAR_ID = os.environ.get('GOOGLE_CALENDAR_ID', 'primary')
+GOOGLE_SERVICE_ACCOUNT_FILE = os.environ.get('GOOGLE_SERVICE_ACCOUNT_FILE', str(BASE_DIR / 'service-account.json'))
+# 'google', 'fake' (in-process stand-in, no network) or a dotted path to a backend class
+GOOGLE_CALENDAR_BACKEND = os.environ.get('GOOGLE_CALENDAR_BACKEND', 'google')
+# Confirmations within this many seconds share one Calendar batch request; after
+# GOOGLE_CALENDAR_BREAKER_THRESHOLD consecutive API failures links use the fallback
+# for GOOGLE_CALENDAR_BREAKER_RESET_SECONDS
+MEET_LINK_BATCH_SECONDS = 2
+GOOGLE_CALENDAR_TIMEOUT = 10
+GOOGLE_CALENDAR_BREAKER_THRESHOLD = 5
+GOOGLE_CALENDAR_BREAKER_RESET_SECONDS = 60
+# Optional local copy of the calendar v3 discovery document; defaults to the one
+# bundled with google-api-python-client
+GOOGLE_CALENDAR_DISCOVERY_FILE = os.environ.get('GOOGLE_CALENDAR_DISCOVERY_FILE', '')
+
+# Migration 0016 adds a PostgreSQL exclusion constraint against overlapping active
+# sessions; set SESSION_OVERLAP_CONSTRAINT=0 to migrate without it (main/booking.py
+# still checks overlaps)
+SESSION_OVERLAP_CONSTRAINT = os.environ.get('SESSION_OVERLAP_CONSTRAINT', '1').lower() in ('1', 'true', 'yes')
+
+# Keyset (cursor) pagination for the mentor, session and user listings (see main/pagination.py)
+CURSOR_PAGINATION = os.environ.get('CURSOR_PAGINATION', '').lower() in ('1', 'true', 'yes')
+
+# Notification emails go through an outbox (main/emails.py) and are sent over at most
+# this many concurrent, reused SMTP connections per worker process.
+EMAIL_POOL_SIZE = int(os.environ.get('EMAIL_POOL_SIZE', '2'))
+
+# Background jobs (see main/jobs.py). Run workers with `manage.py run_workers`; set
+# JOBS_RUN_INLINE=1 to run jobs in the request instead, e.g. in local development.
+JOBS_RUN_INLINE = os.environ.get('JOBS_RUN_INLINE', '').lower() in ('1', 'true', 'yes')
+
+# With REDIS_URL set, every worker process shares one cache (the Calendar circuit
+# breaker, admin counters, cached slots); otherwise Django's default per-process
+# LocMemCache is used and each worker keeps its own copy
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# Seconds the admin dashboard's counters are cached (dropped early on relevant changes)
+ADMIN_COUNTERS_TTL = 60
+
+# Per-view query budgets and N+1 detection (main/querybudget.py, budgets in
+# main/query_budgets.py): logged in development, fatal under `manage.py test`
+QUERY_BUDGET_ENABLED = DEBUG or 'test' in sys.argv[1:2]
+QUERY_BUDGET_STRICT = 'test' in sys.argv[1:2]
+
 # Login/Logout URLs (for password reset redirects)
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'